@@ -3,16 +3,61 @@
 #include "Board.hpp"
 #include <vector>
 #include <utility>
+#include <string>
 
 namespace reversi {
 
-class AI {
+// ProbCut check for one search depth: the deep score is predicted from a shallow search as
+// a * shallow + b with residual spread sigma (fitted offline, see python/fit_probcut.py)
+struct ProbCutCheck {
+    int shallow;   // 0 disables the check at this depth
+    double a;
+    double b;
+    double sigma;
+};
+
+template <int N>
+class SizedAI {
 public:
-    static Move getBestMove(const Board& board, Player player, int depth);
+    using Board = SizedBoard<N>;
+    static constexpr int kMaxProbCutDepth = 16;
+
+    // outScore, if given, receives the search score of the best move from player's point of view.
+    // selective enables ProbCut forward pruning, trading exactness for depth.
+    static Move getBestMove(const Board& board, Player player, int depth, int* outScore = nullptr, bool selective = false);
+
+    // The k best root moves with exact scores, best first, from a single root search:
+    // each root move is searched with alpha set to the k-th best score so far
+    static std::vector<std::pair<Move, int>> getTopMoves(const Board& board, Player player, int depth, int k);
+
+    // Evaluation weights are process-wide, one set per board size; change them only while no search is running
+    static void setWeights(const int* squares, int mobility);   // squares: kSize * kSize values, row-major
+    static void getWeights(int* squares, int* mobility);
+    static bool loadWeights(const std::string& path);          // kSize * kSize square weights then mobility; '#' starts a comment
+
+    // ProbCut parameters are process-wide too, shared by all sizes but fitted on and used for 8x8 only;
+    // other sizes always search full width. The file holds the cut threshold t (in sigmas),
+    // then one "depth shallow a b sigma" line per checked depth; '#' starts a comment.
+    static void setProbCut(double threshold, const ProbCutCheck* checks); // kMaxProbCutDepth + 1 entries, by depth
+    static bool loadProbCut(const std::string& path);
+    static void getProbCut(double* threshold, ProbCutCheck* checks);      // either may be null
 
 private:
-    static int minimax(Board board, int depth, int alpha, int beta, Player maximizingPlayer, Player currentPlayer);
+    // Consults the shared transposition table (when attached) around searchNode
+    static int minimax(Board board, int depth, int alpha, int beta, Player maximizingPlayer, Player currentPlayer,
+                       bool selective = false);
+    static int searchNode(const Board& board, int depth, int alpha, int beta, Player maximizingPlayer,
+                          Player currentPlayer, bool selective);
+    static bool probCut(const Board& board, int depth, int alpha, int beta, Player maximizingPlayer,
+                        Player currentPlayer, int& outScore);
     static int evaluate(const Board& board, Player player);
 };
 
+using AI = SizedAI<8>;
+
+extern template class SizedAI<4>;
+extern template class SizedAI<6>;
+extern template class SizedAI<8>;
+extern template class SizedAI<10>;
+
 } // namespace reversi
@@ -0,0 +1,75 @@
+#pragma once
+
+#include "Kernels.hpp"
+
+#include <cstdint>
+#include <type_traits>
+#ifdef _MSC_VER
+#include <intrin.h>
+#endif
+
+namespace reversi {
+
+// 128 squares for boards above 8x8, with the integer operators the board code uses on masks;
+// lo holds squares 0-63
+struct Bits128 {
+    uint64_t lo;
+    uint64_t hi;
+
+    constexpr Bits128(uint64_t low = 0, uint64_t high = 0) : lo(low), hi(high) {}
+
+    constexpr explicit operator bool() const { return (lo | hi) != 0; }
+    constexpr Bits128 operator~() const { return {~lo, ~hi}; }
+    friend constexpr Bits128 operator&(Bits128 a, Bits128 b) { return {a.lo & b.lo, a.hi & b.hi}; }
+    friend constexpr Bits128 operator|(Bits128 a, Bits128 b) { return {a.lo | b.lo, a.hi | b.hi}; }
+    friend constexpr Bits128 operator^(Bits128 a, Bits128 b) { return {a.lo ^ b.lo, a.hi ^ b.hi}; }
+    friend constexpr bool operator==(Bits128 a, Bits128 b) { return a.lo == b.lo && a.hi == b.hi; }
+    friend constexpr bool operator!=(Bits128 a, Bits128 b) { return !(a == b); }
+    constexpr Bits128& operator&=(Bits128 b) { return *this = *this & b; }
+    constexpr Bits128& operator|=(Bits128 b) { return *this = *this | b; }
+    constexpr Bits128& operator^=(Bits128 b) { return *this = *this ^ b; }
+
+    friend constexpr Bits128 operator<<(Bits128 a, int s) {
+        if (s == 0) return a;
+        if (s >= 64) return {0, a.lo << (s - 64)};
+        return {a.lo << s, (a.hi << s) | (a.lo >> (64 - s))};
+    }
+    friend constexpr Bits128 operator>>(Bits128 a, int s) {
+        if (s == 0) return a;
+        if (s >= 64) return {a.hi >> (s - 64), 0};
+        return {(a.lo >> s) | (a.hi << (64 - s)), a.hi >> s};
+    }
+    // Only for m & (m - 1), which clears the lowest set square
+    friend constexpr Bits128 operator-(Bits128 a, uint64_t b) {
+        return {a.lo - b, a.hi - (a.lo < b ? 1 : 0)};
+    }
+};
+
+// One bit per square (row * N + col) of an N x N board: a plain uint64_t up to 8x8
+template <int N>
+using SquareMask = std::conditional_t<(N * N <= 64), uint64_t, Bits128>;
+
+inline int lowestSquare(uint64_t mask) {
+#ifdef _MSC_VER
+    unsigned long index;
+    _BitScanForward64(&index, mask);
+    return static_cast<int>(index);
+#else
+    return __builtin_ctzll(mask);
+#endif
+}
+
+inline int lowestSquare(const Bits128& mask) {
+    return mask.lo ? lowestSquare(mask.lo) : 64 + lowestSquare(mask.hi);
+}
+
+inline int popcount(uint64_t mask) { return kernels::popcount(mask); }
+
+inline int popcount(const Bits128& mask) { return kernels::popcount(mask.lo) + kernels::popcount(mask.hi); }
+
+// 64-bit word i of a mask, low squares first
+inline uint64_t maskWord(uint64_t mask, int i) { return i == 0 ? mask : 0; }
+
+inline uint64_t maskWord(const Bits128& mask, int i) { return i == 0 ? mask.lo : mask.hi; }
+
+} // namespace reversi
@@ -1,5 +1,7 @@
 #pragma once
 
+#include "Bits.hpp"
+
 #include <array>
 #include <vector>
 #include <cstdint>
@@ -15,23 +17,51 @@ struct Move {
     int col;
 };
 
-class Board {
+template <typename Mask>
+struct SizedMovePreview {
+    Move move;
+    Mask flips;   // bit (row * kSize + col) set for every disc the move flips
+    int flipCount;
+};
+
+using MovePreview = SizedMovePreview<uint64_t>;
+
+// Board sizes compiled into the core; every size has its own engine, and the 8x8 one
+// (Board, the default) keeps the dispatched bitboard kernels
+constexpr int kBoardSizes[] = {4, 6, 8, 10};
+
+template <int N>
+class SizedBoard {
 public:
-    static constexpr int kSize = 8;
+    static constexpr int kSize = N;
+    static_assert(N >= 4 && N % 2 == 0 && N * N <= 128, "even sizes from 4x4 to 10x10");
+    using Mask = SquareMask<N>;
+    using Preview = SizedMovePreview<Mask>;
 
-    Board();
+    SizedBoard();
 
     Cell getCell(int row, int col) const;
     void setCell(int row, int col, Cell value);
 
     std::vector<Move> getValidMoves(Player player) const;
+    // Bit (row * kSize + col) set for every legal move, from the dispatched bitboard kernel on 8x8
+    Mask moveMask(Player player) const;
+    int mobility(Player player) const;
     bool isValidMove(Player player, int row, int col) const;
     bool applyMove(Player player, int row, int col);
 
+    Mask flipMask(Player player, int row, int col) const;
+    // Place a disc and flip a precomputed mask without validation, and the exact inverse
+    void applyFlips(Player player, int row, int col, Mask flips);
+    void undoFlips(Player player, int row, int col, Mask flips);
+    std::vector<Preview> getMovePreviews(Player player) const;
+
     std::pair<int, int> getScore() const;
     bool hasAnyValidMove(Player player) const;
 
     const std::array<Cell, kSize * kSize>& data() const { return cells; }
+    // Bit (row * kSize + col) set for every disc of the given colour
+    Mask bitboard(Cell color) const;
 
     void reset();
 
@@ -40,9 +70,15 @@ private:
 
     bool willFlipInDirection(Player player, int row, int col, int dRow, int dCol) const;
     int applyDirection(Player player, int row, int col, int dRow, int dCol);
+    Mask flipsInDirection(Player player, int row, int col, int dRow, int dCol) const;
     static bool inBounds(int row, int col);
 };
 
-} // namespace reversi
+using Board = SizedBoard<8>;
 
+extern template class SizedBoard<4>;
+extern template class SizedBoard<6>;
+extern template class SizedBoard<8>;
+extern template class SizedBoard<10>;
 
+} // namespace reversi
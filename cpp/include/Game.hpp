@@ -1,33 +1,82 @@
 #pragma once
 
 #include "Board.hpp"
+#include <cstddef>
+#include <variant>
 
 namespace reversi {
 
 enum class GameResult : int8_t { Ongoing = 0, BlackWins = 1, WhiteWins = -1, Draw = 2 };
 
-class Game {
+// One played step; enough to undo or redo it without replaying the game
+template <typename Mask>
+struct SizedHistoryEntry {
+    Move move;            // {-1, -1} for a pass
+    Mask flips;
+    Player player;
+    bool passedBefore;    // previousPlayerPassed before the step
+    bool passedAfter;     // and after it, worked out once when the step is recorded
+    uint64_t hashBefore;
+};
+
+using HistoryEntry = SizedHistoryEntry<uint64_t>;
+
+template <int N>
+class SizedGame {
 public:
-    Game();
+    static constexpr int kSize = N;
+    using Board = SizedBoard<N>;
+    using HistoryEntry = SizedHistoryEntry<typename Board::Mask>;
 
-    Move getBestMove(int depth) const;
+    SizedGame();
+
+    Move getBestMove(int depth, int* outScore = nullptr, bool selective = false) const;
+    std::vector<std::pair<Move, int>> getTopMoves(int depth, int k) const;
 
     const Board& getBoard() const { return board; }
     Player currentPlayer() const { return playerToMove; }
 
     std::vector<Move> validMoves() const { return board.getValidMoves(playerToMove); }
+    std::vector<typename Board::Preview> movePreviews() const { return board.getMovePreviews(playerToMove); }
     bool makeMove(int row, int col);
     void passTurn();
     GameResult result() const;
     std::pair<int, int> score() const { return board.getScore(); }
     void reset();
 
+    bool undo();
+    bool redo();
+    bool gotoPly(int target);
+    int ply() const { return static_cast<int>(plyIndex); }
+    const std::vector<HistoryEntry>& history() const { return moves; }
+    uint64_t hash() const { return positionHash; }
+
 private:
     Board board;
     Player playerToMove{Player::Black};
     bool previousPlayerPassed{false};
+
+    // Played steps; entries past plyIndex are the redo tail
+    std::vector<HistoryEntry> moves;
+    std::size_t plyIndex{0};
+    uint64_t positionHash{0};
+
+    void record(Move move, typename Board::Mask flips);
+    void apply(const HistoryEntry& entry);
+    static uint64_t computeHash(const Board& board, Player toMove);
 };
 
-} // namespace reversi
+using Game = SizedGame<8>;
+
+extern template class SizedGame<4>;
+extern template class SizedGame<6>;
+extern template class SizedGame<8>;
+extern template class SizedGame<10>;
 
+// A game of any compiled size, as held by a C API handle; default-constructs to 8x8
+using AnyGame = std::variant<Game, SizedGame<4>, SizedGame<6>, SizedGame<10>>;
 
+// Nullptr for a size not in kBoardSizes
+AnyGame* newGame(int size);
+
+} // namespace reversi
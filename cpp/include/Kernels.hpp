@@ -0,0 +1,47 @@
+#pragma once
+
+#include <cstdint>
+
+namespace reversi {
+namespace kernels {
+
+// Bitboard kernels: bit (row * 8 + col) is one square of the 8x8 board.
+// The implementation is picked once at load time from the CPU's features
+// (AVX2, POPCNT, or a portable fallback); REVERSI_KERNEL=generic|popcnt|avx2 caps the choice.
+
+// Legal moves of the side owning `own`
+uint64_t moves(uint64_t own, uint64_t opp);
+int popcount(uint64_t x);
+const char* name();
+
+// The same shift kernel for other board sizes (bit row * N + col), on any mask type with the
+// integer operators; not dispatched, since only 8x8 is hot
+template <int N, typename Mask>
+constexpr Mask squaresFrom(int firstCol, int lastCol) {
+    Mask m = 0;
+    for (int r = 0; r < N; ++r) {
+        for (int c = firstCol; c <= lastCol; ++c) m |= Mask{1} << (r * N + c);
+    }
+    return m;
+}
+
+template <int N, typename Mask>
+Mask sizedMoves(Mask own, Mask opp) {
+    constexpr Mask kBoard = squaresFrom<N, Mask>(0, N - 1);
+    constexpr Mask kInnerCols = squaresFrom<N, Mask>(1, N - 2);
+    auto direction = [own](int shift, Mask o) {
+        Mask left = o & (own << shift);
+        Mask right = o & (own >> shift);
+        for (int i = 0; i < N - 3; ++i) {
+            left |= o & (left << shift);
+            right |= o & (right >> shift);
+        }
+        return (left << shift) | (right >> shift);
+    };
+    Mask inner = opp & kInnerCols;
+    Mask moves = direction(1, inner) | direction(N, opp) | direction(N - 1, inner) | direction(N + 1, inner);
+    return moves & ~(own | opp) & kBoard;
+}
+
+} // namespace kernels
+} // namespace reversi
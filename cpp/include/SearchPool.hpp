@@ -0,0 +1,85 @@
+#pragma once
+
+#include "Game.hpp"
+
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace reversi {
+
+// Worker threads owned by the core, shared by every batch in the process, so a caller can
+// keep hundreds of searches in flight without a thread of its own per game.
+class ThreadPool {
+public:
+    static ThreadPool& instance();
+
+    // 0 picks one thread per hardware thread; queued tasks finish on the old threads first
+    void resize(int threads);
+    int size();
+    void submit(std::function<void()> task);
+
+private:
+    ThreadPool() = default;
+    void start(int threads);
+    void stop();
+    void run();
+
+    std::mutex mutex;
+    std::condition_variable ready;
+    std::deque<std::function<void()>> tasks;
+    std::vector<std::thread> workers;
+    bool stopping{false};
+};
+
+struct SearchRequest {
+    const AnyGame* game;
+    int depth;
+    bool selective;
+};
+
+// Called on a pool thread as each search finishes, before its result can be polled
+using SearchCallback = void (*)(void* user, int index, int move, int score);
+
+// One search per request, scheduled on the pool as soon as the batch is built. Finished
+// searches queue up in completion order. A game must not change until its result is out.
+class SearchBatch {
+public:
+    SearchBatch(std::vector<SearchRequest> requests, SearchCallback callback = nullptr, void* user = nullptr);
+    ~SearchBatch();  // waits for searches still running
+
+    SearchBatch(const SearchBatch&) = delete;
+    SearchBatch& operator=(const SearchBatch&) = delete;
+
+    // Takes up to max finished results not yet returned, waiting up to timeoutMs for the
+    // first one (negative waits until one finishes); returns how many were written
+    int poll(int* outIndices, int* outMoves, int* outScores, int max, int timeoutMs);
+    void wait();
+    int pending();  // not yet finished
+    int size() const { return static_cast<int>(requests.size()); }
+    // Only meaningful once wait() has returned
+    int move(int index) const { return results[index].move; }
+    int score(int index) const { return results[index].score; }
+
+private:
+    struct Result {
+        int move;
+        int score;
+    };
+
+    void search(int index);
+
+    std::vector<SearchRequest> requests;
+    std::vector<Result> results;
+    SearchCallback callback;
+    void* user;
+    std::mutex mutex;
+    std::condition_variable finished;
+    std::deque<int> done;
+    int remaining;
+};
+
+} // namespace reversi
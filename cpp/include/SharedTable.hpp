@@ -0,0 +1,32 @@
+#pragma once
+
+#include <cstdint>
+#include <string>
+
+namespace reversi {
+namespace tt {
+
+// Transposition table in a named shared-memory segment, so engine processes on one machine
+// share search results. Entries are two 64-bit words written without locks; the first holds
+// key ^ data, so a torn or foreign entry fails the check and reads as a miss.
+// The table is process-wide: attach or detach only while no search is running.
+
+enum Bound : uint8_t { kNone = 0, kLower = 1, kUpper = 2, kExact = 3 };
+
+// Creates the segment if no process has yet, otherwise maps the existing one (its size wins)
+bool attach(const std::string& name, int megabytes);
+void detach();
+bool attached();
+// Removes the name; processes still attached keep their mapping (no-op on Windows,
+// where the segment goes away with the last process)
+bool remove(const std::string& name);
+
+// score is from the side to move's point of view; only entries searched to exactly
+// this depth are returned, so results match a search without the table
+bool probe(uint64_t key, int depth, int& score, Bound& bound);
+void store(uint64_t key, int depth, int score, Bound bound);
+
+void stats(uint64_t* probes, uint64_t* hits, uint64_t* stores);
+
+} // namespace tt
+} // namespace reversi
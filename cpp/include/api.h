@@ -16,7 +16,8 @@
 extern "C" {
 #endif
 
-typedef void* reversi_handle; // opaque pointer to Game
+typedef void* reversi_handle; // opaque pointer to a game of one of the compiled board sizes
+typedef void* search_batch_handle; // opaque pointer to a batch of searches in flight
 
 typedef enum {
     CELL_EMPTY = 0,
@@ -29,6 +30,11 @@ typedef enum {
     PLAYER_WHITE = -1
 } player_t;
 
+typedef enum {
+    SEARCH_FULL_WIDTH = 0,
+    SEARCH_PROBCUT = 1    // selective forward pruning; deeper for the same time, not exact
+} search_flags_t;
+
 typedef enum {
     RESULT_ONGOING = 0,
     RESULT_BLACK = 1,
@@ -36,15 +42,27 @@ typedef enum {
     RESULT_DRAW = 2
 } result_t;
 
+// Squares are row*size+col on the handle's own board; create_game() boards are 8x8
 REVERSI_API reversi_handle create_game();
+REVERSI_API reversi_handle create_game_sized(int size); // 4, 6, 8 or 10; NULL for any other size
 REVERSI_API void destroy_game(reversi_handle h);
+REVERSI_API reversi_handle clone_game(reversi_handle h); // new handle with the same position and history
+REVERSI_API int copy_game(reversi_handle dst, reversi_handle src); // returns 0 if the board sizes differ
 
-REVERSI_API int get_board_size(); // always 8
+REVERSI_API int get_board_size(); // size of create_game() boards, always 8
+REVERSI_API int get_game_size(reversi_handle h);
 REVERSI_API cell_t get_cell(reversi_handle h, int row, int col);
-REVERSI_API void get_board(reversi_handle h, int8_t* out64);
+REVERSI_API void get_board(reversi_handle h, int8_t* out64); // size*size cells
+REVERSI_API void get_bitboards(reversi_handle h, uint64_t* out_black, uint64_t* out_white); // bit row*size+col; squares 0-63 only
+REVERSI_API void get_bitboards_wide(reversi_handle h, uint64_t* out_black2, uint64_t* out_white2); // two words each, low first
 
 REVERSI_API player_t current_player(reversi_handle h);
-REVERSI_API int get_valid_moves(reversi_handle h, int* out_moves, int max_moves); // returns count; moves as row*8+col
+REVERSI_API int get_valid_moves(reversi_handle h, int* out_moves, int max_moves); // returns count; moves as row*size+col
+// Fills moves (row*size+col), flip masks (bit row*size+col per flipped disc) and flip counts
+// for every legal move of the side to move; returns the number of legal moves
+REVERSI_API int get_move_previews(reversi_handle h, int* out_moves, uint64_t* out_masks, int* out_counts, int max_moves);
+// The same with two mask words per move (low first), for boards above 8x8
+REVERSI_API int get_move_previews_wide(reversi_handle h, int* out_moves, uint64_t* out_masks2, int* out_counts, int max_moves);
 REVERSI_API int make_move(reversi_handle h, int row, int col); // returns 1 if move made
 REVERSI_API void pass_turn(reversi_handle h);
 
@@ -53,6 +71,54 @@ REVERSI_API result_t get_result(reversi_handle h);
 REVERSI_API void reset_game(reversi_handle h);
 
 REVERSI_API int get_best_move(reversi_handle h, int depth); // Returns row * size + col, or -1
+REVERSI_API int get_top_moves(reversi_handle h, int k, int depth, int* out_moves, int* out_scores); // k best moves, best first; returns count
+REVERSI_API int get_best_move_score(reversi_handle h, int depth, int* out_score); // same, plus the search score for the side to move
+REVERSI_API int search_best_move(reversi_handle h, int depth, int flags, int* out_score); // get_best_move_score with search_flags_t
+
+// Move history: each step is undone/redone from its stored flips, without replaying the game
+REVERSI_API int undo_move(reversi_handle h); // returns 1 if a step was undone
+REVERSI_API int redo_move(reversi_handle h); // returns 1 if a step was redone
+REVERSI_API int goto_ply(reversi_handle h, int ply); // returns 1 if ply is within the history
+REVERSI_API int get_ply(reversi_handle h);
+REVERSI_API int get_history(reversi_handle h, int* out_moves, int max_moves); // returns length incl. redo tail; row*size+col, -1 for a pass
+REVERSI_API uint64_t get_position_hash(reversi_handle h);
+
+// Evaluation weights of 8x8 games, shared by every such handle in the process; other sizes keep
+// their built-in weights
+REVERSI_API void set_eval_weights(const int* squares64, int mobility); // squares as row*8+col
+REVERSI_API void get_eval_weights(int* out_squares64, int* out_mobility);
+REVERSI_API int load_eval_weights(const char* path); // returns 1 if the file was read and applied
+REVERSI_API int load_probcut_params(const char* path); // ProbCut fit written by fit_probcut.py (8x8 only); returns 1 if applied
+// Active ProbCut parameters: the threshold, then shallow, a, b, sigma per depth from 0 (up to max_depths
+// depths); returns the number of depths the core checks
+REVERSI_API int get_probcut_params(double* out_threshold, double* out_checks, int max_depths);
+
+REVERSI_API const char* get_cpu_kernel(); // bitboard kernel picked for this CPU: "avx2", "popcnt" or "generic"
+
+// Shared transposition table: a named shared-memory segment searched through by every process
+// that attaches the same name. Process-wide; attach or detach only while no search is running.
+REVERSI_API int shared_tt_attach(const char* name, int megabytes); // creates the segment if needed; returns 1 if attached
+REVERSI_API void shared_tt_detach();
+REVERSI_API int shared_tt_remove(const char* name); // unlinks the name; attached processes keep their mapping
+REVERSI_API void shared_tt_stats(uint64_t* out_probes, uint64_t* out_hits, uint64_t* out_stores); // this process's lookups
+
+// Batched searches on a thread pool owned by the core. Each game is searched to its own depth;
+// a game must appear at most once and stay untouched until its result has been returned.
+typedef void (*search_done_fn)(void* user, int index, int move, int score); // runs on a pool thread
+REVERSI_API void set_search_threads(int threads); // 0 = one per hardware thread (the default)
+REVERSI_API int get_search_threads();
+// Blocks until every game is searched; moves as row*size+col or -1, scores for each side to move
+REVERSI_API int search_batch(const reversi_handle* games, const int* depths, int count, int flags,
+                             int* out_moves, int* out_scores);
+// Starts the searches and returns at once; results come back through poll and/or on_done (may be NULL)
+REVERSI_API search_batch_handle search_batch_submit(const reversi_handle* games, const int* depths, int count,
+                                                    int flags, search_done_fn on_done, void* user);
+// Finished results not yet returned, in completion order; waits up to timeout_ms (-1 = until one
+// finishes) and returns the count written, 0 once everything has been returned
+REVERSI_API int search_batch_poll(search_batch_handle b, int* out_indices, int* out_moves, int* out_scores,
+                                  int max_results, int timeout_ms);
+REVERSI_API int search_batch_pending(search_batch_handle b); // searches not yet finished
+REVERSI_API void search_batch_free(search_batch_handle b); // waits for searches still running
 
 #ifdef __cplusplus
 }
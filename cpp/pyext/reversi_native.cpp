@@ -0,0 +1,396 @@
+// CPython extension with the hot ReversiCore methods, so a call costs one C function call
+// instead of ctypes argument marshalling. It does not link the core: services/core.py hands
+// it the entry points of the library it already loaded, so weights, the shared table and the
+// search pool stay one per process.
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include "api.h"
+
+namespace {
+
+struct Api {
+    decltype(&::get_game_size) get_game_size;
+    decltype(&::get_cell) get_cell;
+    decltype(&::get_board) get_board;
+    decltype(&::get_bitboards) get_bitboards;
+    decltype(&::current_player) current_player;
+    decltype(&::get_valid_moves) get_valid_moves;
+    decltype(&::get_move_previews) get_move_previews;
+    decltype(&::make_move) make_move;
+    decltype(&::pass_turn) pass_turn;
+    decltype(&::get_score) get_score;
+    decltype(&::get_result) get_result;
+    decltype(&::reset_game) reset_game;
+    decltype(&::get_top_moves) get_top_moves;
+    decltype(&::search_best_move) search_best_move;
+    decltype(&::undo_move) undo_move;
+    decltype(&::redo_move) redo_move;
+    decltype(&::goto_ply) goto_ply;
+    decltype(&::get_ply) get_ply;
+    decltype(&::get_history) get_history;
+    decltype(&::get_position_hash) get_position_hash;
+};
+
+Api api;
+bool bound = false;
+
+constexpr int kMaxMoves = 64;
+constexpr int kMaxHistory = 128;
+
+// Boards up to 8x8, whose masks fit one word; larger boards stay on ctypes
+struct GameObject {
+    PyObject_HEAD
+    reversi_handle handle;
+    int size;
+};
+
+reversi_handle handleOf(PyObject* self) {
+    reversi_handle h = reinterpret_cast<GameObject*>(self)->handle;
+    if (!h) PyErr_SetString(PyExc_ValueError, "game is closed");
+    return h;
+}
+
+PyObject* square(PyObject* self, int v) {
+    int size = reinterpret_cast<GameObject*>(self)->size;
+    return Py_BuildValue("(ii)", v / size, v % size);
+}
+
+PyObject* moveOrNone(PyObject* self, int v) {
+    return v < 0 ? Py_BuildValue("(ii)", -1, -1) : square(self, v);
+}
+
+bool intArgs(PyObject* const* args, Py_ssize_t nargs, Py_ssize_t expected, int* out) {
+    if (nargs != expected) {
+        PyErr_Format(PyExc_TypeError, "expected %zd arguments, got %zd", expected, nargs);
+        return false;
+    }
+    for (Py_ssize_t i = 0; i < nargs; ++i) {
+        long v = PyLong_AsLong(args[i]);
+        if (v == -1 && PyErr_Occurred()) return false;
+        out[i] = static_cast<int>(v);
+    }
+    return true;
+}
+
+int Game_init(PyObject* self, PyObject* args, PyObject*) {
+    unsigned long long handle = 0;
+    if (!PyArg_ParseTuple(args, "K", &handle)) return -1;
+    if (!bound) {
+        PyErr_SetString(PyExc_RuntimeError, "bind() the core library first");
+        return -1;
+    }
+    auto h = reinterpret_cast<reversi_handle>(static_cast<uintptr_t>(handle));
+    int size = api.get_game_size(h);
+    if (size * size > kMaxMoves) {
+        PyErr_Format(PyExc_ValueError, "a %dx%d board is larger than this module supports", size, size);
+        return -1;
+    }
+    reinterpret_cast<GameObject*>(self)->handle = h;
+    reinterpret_cast<GameObject*>(self)->size = size;
+    return 0;
+}
+
+PyObject* Game_detach(PyObject* self, PyObject*) {
+    reinterpret_cast<GameObject*>(self)->handle = nullptr;
+    Py_RETURN_NONE;
+}
+
+PyObject* Game_get_board(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    int8_t cells[kMaxMoves];
+    api.get_board(h, cells);
+    int size = reinterpret_cast<GameObject*>(self)->size;
+    int n = size * size;
+    PyObject* board = PyList_New(n);
+    if (!board) return nullptr;
+    for (int i = 0; i < n; ++i) PyList_SET_ITEM(board, i, PyLong_FromLong(cells[i]));
+    return board;
+}
+
+PyObject* Game_get_cell(PyObject* self, PyObject* const* args, Py_ssize_t nargs) {
+    int rc[2];
+    reversi_handle h = handleOf(self);
+    if (!h || !intArgs(args, nargs, 2, rc)) return nullptr;
+    return PyLong_FromLong(api.get_cell(h, rc[0], rc[1]));
+}
+
+PyObject* Game_current_player(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    return PyLong_FromLong(api.current_player(h));
+}
+
+PyObject* Game_valid_moves(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    int moves[kMaxMoves];
+    int n = api.get_valid_moves(h, moves, kMaxMoves);
+    PyObject* out = PyList_New(n);
+    if (!out) return nullptr;
+    for (int i = 0; i < n; ++i) PyList_SET_ITEM(out, i, square(self, moves[i]));
+    return out;
+}
+
+PyObject* Game_move_previews(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    int moves[kMaxMoves];
+    uint64_t masks[kMaxMoves];
+    int counts[kMaxMoves];
+    int n = api.get_move_previews(h, moves, masks, counts, kMaxMoves);
+    PyObject* out = PyList_New(n);
+    if (!out) return nullptr;
+    for (int i = 0; i < n; ++i) {
+        PyList_SET_ITEM(out, i, Py_BuildValue("(NKi)", square(self, moves[i]),
+                                              static_cast<unsigned long long>(masks[i]), counts[i]));
+    }
+    return out;
+}
+
+PyObject* Game_make_move(PyObject* self, PyObject* const* args, Py_ssize_t nargs) {
+    int rc[2];
+    reversi_handle h = handleOf(self);
+    if (!h || !intArgs(args, nargs, 2, rc)) return nullptr;
+    return PyBool_FromLong(api.make_move(h, rc[0], rc[1]));
+}
+
+PyObject* Game_pass_turn(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    api.pass_turn(h);
+    Py_RETURN_NONE;
+}
+
+PyObject* Game_score(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    int black = 0, white = 0;
+    api.get_score(h, &black, &white);
+    return Py_BuildValue("(ii)", black, white);
+}
+
+PyObject* Game_result(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    return PyLong_FromLong(api.get_result(h));
+}
+
+PyObject* Game_reset(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    api.reset_game(h);
+    Py_RETURN_NONE;
+}
+
+// Searches release the GIL, as ctypes does, so thread pools of cores keep scaling
+PyObject* Game_get_best_move_score(PyObject* self, PyObject* args, PyObject* kwargs) {
+    static const char* keywords[] = {"depth", "selective", nullptr};
+    int depth = 0;
+    int selective = 0;
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "i|p", const_cast<char**>(keywords), &depth, &selective)) {
+        return nullptr;
+    }
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    int score = 0;
+    int move;
+    Py_BEGIN_ALLOW_THREADS
+    move = api.search_best_move(h, depth, selective ? SEARCH_PROBCUT : SEARCH_FULL_WIDTH, &score);
+    Py_END_ALLOW_THREADS
+    return Py_BuildValue("(Ni)", moveOrNone(self, move), score);
+}
+
+PyObject* Game_get_best_move(PyObject* self, PyObject* args, PyObject* kwargs) {
+    PyObject* result = Game_get_best_move_score(self, args, kwargs);
+    if (!result) return nullptr;
+    PyObject* move = PyTuple_GET_ITEM(result, 0);
+    Py_INCREF(move);
+    Py_DECREF(result);
+    return move;
+}
+
+PyObject* Game_get_top_moves(PyObject* self, PyObject* const* args, Py_ssize_t nargs) {
+    int kd[2];
+    reversi_handle h = handleOf(self);
+    if (!h || !intArgs(args, nargs, 2, kd)) return nullptr;
+    int k = kd[0] < kMaxMoves ? kd[0] : kMaxMoves;
+    if (k <= 0) return PyList_New(0);
+    int moves[kMaxMoves];
+    int scores[kMaxMoves];
+    int n;
+    Py_BEGIN_ALLOW_THREADS
+    n = api.get_top_moves(h, k, kd[1], moves, scores);
+    Py_END_ALLOW_THREADS
+    PyObject* out = PyList_New(n);
+    if (!out) return nullptr;
+    for (int i = 0; i < n; ++i) PyList_SET_ITEM(out, i, Py_BuildValue("(Ni)", square(self, moves[i]), scores[i]));
+    return out;
+}
+
+PyObject* Game_bitboards(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    uint64_t black = 0, white = 0;
+    api.get_bitboards(h, &black, &white);
+    return Py_BuildValue("(KK)", static_cast<unsigned long long>(black), static_cast<unsigned long long>(white));
+}
+
+PyObject* Game_undo_move(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    return PyBool_FromLong(api.undo_move(h));
+}
+
+PyObject* Game_redo_move(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    return PyBool_FromLong(api.redo_move(h));
+}
+
+PyObject* Game_goto_ply(PyObject* self, PyObject* const* args, Py_ssize_t nargs) {
+    int ply;
+    reversi_handle h = handleOf(self);
+    if (!h || !intArgs(args, nargs, 1, &ply)) return nullptr;
+    return PyBool_FromLong(api.goto_ply(h, ply));
+}
+
+PyObject* Game_ply(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    return PyLong_FromLong(api.get_ply(h));
+}
+
+PyObject* Game_history(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    int steps[kMaxHistory];
+    int n = api.get_history(h, steps, kMaxHistory);
+    if (n > kMaxHistory) n = kMaxHistory;
+    PyObject* out = PyList_New(n);
+    if (!out) return nullptr;
+    for (int i = 0; i < n; ++i) {
+        if (steps[i] < 0) {
+            Py_INCREF(Py_None);
+            PyList_SET_ITEM(out, i, Py_None);
+        } else {
+            PyList_SET_ITEM(out, i, square(self, steps[i]));
+        }
+    }
+    return out;
+}
+
+PyObject* Game_position_hash(PyObject* self, PyObject*) {
+    reversi_handle h = handleOf(self);
+    if (!h) return nullptr;
+    return PyLong_FromUnsignedLongLong(api.get_position_hash(h));
+}
+
+#define METHOD(name) reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(name))
+
+PyMethodDef gameMethods[] = {
+    {"detach", Game_detach, METH_NOARGS, "Forgets the handle; later calls raise ValueError"},
+    {"get_board", Game_get_board, METH_NOARGS, nullptr},
+    {"get_cell", METHOD(Game_get_cell), METH_FASTCALL, nullptr},
+    {"current_player", Game_current_player, METH_NOARGS, nullptr},
+    {"valid_moves", Game_valid_moves, METH_NOARGS, nullptr},
+    {"move_previews", Game_move_previews, METH_NOARGS, nullptr},
+    {"make_move", METHOD(Game_make_move), METH_FASTCALL, nullptr},
+    {"pass_turn", Game_pass_turn, METH_NOARGS, nullptr},
+    {"score", Game_score, METH_NOARGS, nullptr},
+    {"result", Game_result, METH_NOARGS, nullptr},
+    {"reset", Game_reset, METH_NOARGS, nullptr},
+    {"get_best_move", METHOD(Game_get_best_move), METH_VARARGS | METH_KEYWORDS, nullptr},
+    {"get_best_move_score", METHOD(Game_get_best_move_score), METH_VARARGS | METH_KEYWORDS, nullptr},
+    {"get_top_moves", METHOD(Game_get_top_moves), METH_FASTCALL, nullptr},
+    {"bitboards", Game_bitboards, METH_NOARGS, nullptr},
+    {"undo_move", Game_undo_move, METH_NOARGS, nullptr},
+    {"redo_move", Game_redo_move, METH_NOARGS, nullptr},
+    {"goto_ply", METHOD(Game_goto_ply), METH_FASTCALL, nullptr},
+    {"ply", Game_ply, METH_NOARGS, nullptr},
+    {"history", Game_history, METH_NOARGS, nullptr},
+    {"position_hash", Game_position_hash, METH_NOARGS, nullptr},
+    {nullptr, nullptr, 0, nullptr},
+};
+
+PyType_Slot gameSlots[] = {
+    {Py_tp_doc, const_cast<char*>("One core game handle, owned by the ReversiCore that created it")},
+    {Py_tp_methods, gameMethods},
+    {Py_tp_init, reinterpret_cast<void*>(Game_init)},
+    {Py_tp_new, reinterpret_cast<void*>(PyType_GenericNew)},
+    {0, nullptr},
+};
+
+PyType_Spec gameSpec = {"_reversi_native.Game", sizeof(GameObject), 0, Py_TPFLAGS_DEFAULT, gameSlots};
+
+template <typename F>
+bool lookup(PyObject* table, const char* name, F& out) {
+    PyObject* address = PyDict_GetItemString(table, name);
+    if (!address) {
+        PyErr_Format(PyExc_KeyError, "missing core entry point %s", name);
+        return false;
+    }
+    void* p = PyLong_AsVoidPtr(address);
+    if (!p) {
+        if (!PyErr_Occurred()) PyErr_Format(PyExc_ValueError, "null address for %s", name);
+        return false;
+    }
+    out = reinterpret_cast<F>(p);
+    return true;
+}
+
+PyObject* bind(PyObject*, PyObject* table) {
+    if (!PyDict_Check(table)) {
+        PyErr_SetString(PyExc_TypeError, "expected a dict of entry point addresses");
+        return nullptr;
+    }
+    Api next{};
+#define LOOKUP(name) if (!lookup(table, #name, next.name)) return nullptr
+    LOOKUP(get_game_size);
+    LOOKUP(get_cell);
+    LOOKUP(get_board);
+    LOOKUP(get_bitboards);
+    LOOKUP(current_player);
+    LOOKUP(get_valid_moves);
+    LOOKUP(get_move_previews);
+    LOOKUP(make_move);
+    LOOKUP(pass_turn);
+    LOOKUP(get_score);
+    LOOKUP(get_result);
+    LOOKUP(reset_game);
+    LOOKUP(get_top_moves);
+    LOOKUP(search_best_move);
+    LOOKUP(undo_move);
+    LOOKUP(redo_move);
+    LOOKUP(goto_ply);
+    LOOKUP(get_ply);
+    LOOKUP(get_history);
+    LOOKUP(get_position_hash);
+#undef LOOKUP
+    api = next;
+    bound = true;
+    Py_RETURN_NONE;
+}
+
+PyMethodDef moduleMethods[] = {
+    {"bind", bind, METH_O, "Takes {entry point name: address} from the loaded core library"},
+    {nullptr, nullptr, 0, nullptr},
+};
+
+PyModuleDef moduleDef = {PyModuleDef_HEAD_INIT, "_reversi_native", "Direct bindings for ReversiCore", -1,
+                         moduleMethods, nullptr, nullptr, nullptr, nullptr};
+
+} // namespace
+
+PyMODINIT_FUNC PyInit__reversi_native() {
+    PyObject* module = PyModule_Create(&moduleDef);
+    if (!module) return nullptr;
+    PyObject* gameType = PyType_FromSpec(&gameSpec);
+    if (!gameType || PyModule_AddObject(module, "Game", gameType) < 0) {
+        Py_XDECREF(gameType);
+        Py_DECREF(module);
+        return nullptr;
+    }
+    return module;
+}
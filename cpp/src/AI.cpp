@@ -1,24 +1,195 @@
 #include "AI.hpp"
+#include "SharedTable.hpp"
 #include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <fstream>
 #include <limits>
+#include <sstream>
 
 namespace reversi {
 
-// Position weights
-static const int kWeights[8][8] = {
-    { 120, -20,  20,   5,   5,  20, -20, 120 },
-    { -20, -40,  -5,  -5,  -5,  -5, -40, -20 },
-    {  20,  -5,  15,   3,   3,  15,  -5,  20 },
-    {   5,  -5,   3,   3,   3,   3,  -5,   5 },
-    {   5,  -5,   3,   3,   3,   3,  -5,   5 },
-    {  20,  -5,  15,   3,   3,  15,  -5,  20 },
-    { -20, -40,  -5,  -5,  -5,  -5, -40, -20 },
-    { 120, -20,  20,   5,   5,  20, -20, 120 }
+// Evaluation of one board size (defaults, replaceable at runtime)
+template <int N>
+struct EvalParams {
+    int weights[N][N];   // position weights
+    int mobility;        // bonus per move of mobility advantage
+    // Table keys include the evaluation (and, for selective searches, ProbCut) parameters, so processes
+    // sharing a table with different settings never read each other's scores
+    uint64_t fullWidthSalt;
+    uint64_t selectiveSalt;
 };
 
-Move AI::getBestMove(const Board& board, Player player, int depth) {
+// Default position weights by distance to the nearest edge row and column, capped at 3: the top-left
+// quadrant of the classic 8x8 table, which gives every size its corners, X- and C-squares
+constexpr int kWeightsByDistance[4][4] = {
+    { 120, -20,  20,   5 },
+    { -20, -40,  -5,  -5 },
+    {  20,  -5,  15,   3 },
+    {   5,  -5,   3,   3 }
+};
+
+template <int N>
+constexpr EvalParams<N> defaultEval() {
+    EvalParams<N> eval{};
+    for (int r = 0; r < N; ++r) {
+        for (int c = 0; c < N; ++c) {
+            int dr = std::min(std::min(r, N - 1 - r), 3);
+            int dc = std::min(std::min(c, N - 1 - c), 3);
+            eval.weights[r][c] = kWeightsByDistance[dr][dc];
+        }
+    }
+    eval.mobility = 5;
+    return eval;
+}
+
+template <int N>
+static EvalParams<N> kEval = defaultEval<N>();
+
+// ProbCut: cut when the shallow search predicts a fail outside the window by kProbCutThreshold sigmas.
+// Defaults fitted by fit_probcut.py on 240 self-play positions with the default weights.
+static double kProbCutThreshold = 1.0;
+static ProbCutCheck kProbCut[AI::kMaxProbCutDepth + 1] = {
+    {}, {}, {},
+    {1, 1.0419,  9.243, 37.381},
+    {2, 1.0302,  2.903, 41.414},
+    {3, 1.0552, -2.336, 38.417},
+    {2, 1.1124,  8.583, 61.603},
+    {3, 1.1372, -2.467, 60.993},
+    {4, 1.1703, 10.302, 67.063},
+};
+
+// Shared-table entries are only reused at this depth and above; shallower nodes are cheaper to search
+constexpr int kMinTableDepth = 2;
+
+static inline uint64_t mix64(uint64_t z) {
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ull;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBull;
+    return z ^ (z >> 31);
+}
+
+// The size goes into the salt too, so boards of different sizes never share entries
+template <int N>
+static void updateSalts() {
+    auto& eval = kEval<N>;
+    uint64_t h = mix64(static_cast<uint64_t>(N) << 32 | static_cast<uint32_t>(eval.mobility));
+    for (int i = 0; i < N * N; ++i) h = mix64(h ^ static_cast<uint64_t>(static_cast<int64_t>(eval.weights[i / N][i % N])));
+    eval.fullWidthSalt = h;
+    h = mix64(h ^ 0x5E1EC71FEull);
+    uint64_t bits;
+    std::memcpy(&bits, &kProbCutThreshold, sizeof(bits));
+    h = mix64(h ^ bits);
+    for (const auto& check : kProbCut) {
+        for (double v : {static_cast<double>(check.shallow), check.a, check.b, check.sigma}) {
+            std::memcpy(&bits, &v, sizeof(bits));
+            h = mix64(h ^ bits);
+        }
+    }
+    eval.selectiveSalt = h;
+}
+
+static void updateAllSalts() {
+    updateSalts<4>();
+    updateSalts<6>();
+    updateSalts<8>();
+    updateSalts<10>();
+}
+
+[[maybe_unused]] static const bool kSaltsReady = (updateAllSalts(), true);
+
+// Disc masks as one key word; masks above 64 squares fold their high word in
+static inline uint64_t keyWord(uint64_t bits) { return bits; }
+
+static inline uint64_t keyWord(const Bits128& bits) { return bits.lo ^ mix64(bits.hi + 0xD1B54A32D192ED03ull); }
+
+template <int N>
+static uint64_t tableKey(const SizedBoard<N>& board, Player toMove, bool selective) {
+    const auto& eval = kEval<N>;
+    uint64_t black = keyWord(board.bitboard(Cell::Black));
+    uint64_t white = keyWord(board.bitboard(Cell::White));
+    uint64_t key = mix64(black ^ (selective ? eval.selectiveSalt : eval.fullWidthSalt)) ^ mix64(white + 0x9E3779B97F4A7C15ull);
+    return toMove == Player::White ? ~key : key;
+}
+
+template <int N>
+void SizedAI<N>::setWeights(const int* squares, int mobility) {
+    auto& eval = kEval<N>;
+    for (int i = 0; i < N * N; ++i) eval.weights[i / N][i % N] = squares[i];
+    eval.mobility = mobility;
+    updateSalts<N>();
+}
+
+template <int N>
+void SizedAI<N>::getWeights(int* squares, int* mobility) {
+    const auto& eval = kEval<N>;
+    if (squares) {
+        for (int i = 0; i < N * N; ++i) squares[i] = eval.weights[i / N][i % N];
+    }
+    if (mobility) *mobility = eval.mobility;
+}
+
+template <int N>
+bool SizedAI<N>::loadWeights(const std::string& path) {
+    std::ifstream in(path);
+    if (!in) return false;
+    std::vector<int> values;
+    std::string line;
+    while (std::getline(in, line)) {
+        std::istringstream tokens(line.substr(0, line.find('#')));
+        int v;
+        while (tokens >> v) values.push_back(v);
+        if (!tokens.eof()) return false;
+    }
+    if (values.size() != N * N + 1) return false;
+    setWeights(values.data(), values[N * N]);
+    return true;
+}
+
+template <int N>
+void SizedAI<N>::setProbCut(double threshold, const ProbCutCheck* checks) {
+    kProbCutThreshold = threshold;
+    for (int d = 0; d <= kMaxProbCutDepth; ++d) kProbCut[d] = checks[d];
+    updateAllSalts();
+}
+
+template <int N>
+void SizedAI<N>::getProbCut(double* threshold, ProbCutCheck* checks) {
+    if (threshold) *threshold = kProbCutThreshold;
+    if (checks) {
+        for (int d = 0; d <= kMaxProbCutDepth; ++d) checks[d] = kProbCut[d];
+    }
+}
+
+template <int N>
+bool SizedAI<N>::loadProbCut(const std::string& path) {
+    std::ifstream in(path);
+    if (!in) return false;
+    std::vector<double> values;
+    std::string line;
+    while (std::getline(in, line)) {
+        std::istringstream tokens(line.substr(0, line.find('#')));
+        double v;
+        while (tokens >> v) values.push_back(v);
+        if (!tokens.eof()) return false;
+    }
+    if (values.empty() || (values.size() - 1) % 5 != 0) return false;
+    ProbCutCheck checks[kMaxProbCutDepth + 1] = {};
+    for (size_t i = 1; i < values.size(); i += 5) {
+        int depth = static_cast<int>(values[i]);
+        int shallow = static_cast<int>(values[i + 1]);
+        if (depth < 1 || depth > kMaxProbCutDepth || shallow < 0 || shallow >= depth || values[i + 2] <= 0) return false;
+        checks[depth] = {shallow, values[i + 2], values[i + 3], values[i + 4]};
+    }
+    setProbCut(values[0], checks);
+    return true;
+}
+
+template <int N>
+Move SizedAI<N>::getBestMove(const Board& board, Player player, int depth, int* outScore, bool selective) {
+    if constexpr (N != 8) selective = false;   // ProbCut is fitted on 8x8 searches
     auto moves = board.getValidMoves(player);
     if (moves.empty()) {
+        if (outScore) *outScore = 0;
         return {-1, -1};
     }
 
@@ -33,7 +204,7 @@ Move AI::getBestMove(const Board& board, Player player, int depth) {
         
         Player opponent = (player == Player::Black) ? Player::White : Player::Black;
         
-        int score = minimax(nextBoard, depth - 1, alpha, beta, player, opponent);
+        int score = minimax(nextBoard, depth - 1, alpha, beta, player, opponent, selective);
         
         if (score > bestScore) {
             bestScore = score;
@@ -45,13 +216,105 @@ Move AI::getBestMove(const Board& board, Player player, int depth) {
         }
     }
 
+    if (outScore) *outScore = bestScore;
     return bestMove;
 }
 
-int AI::minimax(Board board, int depth, int alpha, int beta, Player maximizingPlayer, Player currentPlayer) {
+template <int N>
+std::vector<std::pair<Move, int>> SizedAI<N>::getTopMoves(const Board& board, Player player, int depth, int k) {
+    std::vector<std::pair<Move, int>> top;
+    if (k <= 0) return top;
+    auto moves = board.getValidMoves(player);
+    Player opponent = (player == Player::Black) ? Player::White : Player::Black;
+    auto byScore = [](const std::pair<Move, int>& a, const std::pair<Move, int>& b) { return a.second > b.second; };
+
+    for (const auto& move : moves) {
+        Board nextBoard = board;
+        nextBoard.applyMove(player, move.row, move.col);
+
+        // Until k moves are known every score is needed exactly; afterwards only moves beating the k-th
+        bool full = static_cast<int>(top.size()) >= k;
+        int alpha = full ? top.back().second : std::numeric_limits<int>::min();
+        int score = minimax(nextBoard, depth - 1, alpha, std::numeric_limits<int>::max(), player, opponent);
+        if (full && score <= alpha) continue;
+
+        top.insert(std::upper_bound(top.begin(), top.end(), std::make_pair(move, score), byScore), {move, score});
+        if (static_cast<int>(top.size()) > k) top.pop_back();
+    }
+    return top;
+}
+
+template <int N>
+bool SizedAI<N>::probCut(const Board& board, int depth, int alpha, int beta, Player maximizingPlayer,
+                 Player currentPlayer, int& outScore) {
+    if (depth > kMaxProbCutDepth || kProbCut[depth].shallow <= 0) return false;
+    const ProbCutCheck& check = kProbCut[depth];
+    // The fit is from the side to move's point of view; scores here are the maximizing player's
+    double offset = currentPlayer == maximizingPlayer ? check.b : -check.b;
+    double margin = kProbCutThreshold * check.sigma;
+    constexpr int kLimit = std::numeric_limits<int>::max() / 2;
+
+    if (beta != std::numeric_limits<int>::max()) {
+        double bound = std::ceil((beta + margin - offset) / check.a);
+        if (std::fabs(bound) < kLimit) {
+            int b = static_cast<int>(bound);
+            if (minimax(board, check.shallow, b - 1, b, maximizingPlayer, currentPlayer, true) >= b) {
+                outScore = beta;
+                return true;
+            }
+        }
+    }
+    if (alpha != std::numeric_limits<int>::min()) {
+        double bound = std::floor((alpha - margin - offset) / check.a);
+        if (std::fabs(bound) < kLimit) {
+            int b = static_cast<int>(bound);
+            if (minimax(board, check.shallow, b, b + 1, maximizingPlayer, currentPlayer, true) <= b) {
+                outScore = alpha;
+                return true;
+            }
+        }
+    }
+    return false;
+}
+
+template <int N>
+int SizedAI<N>::minimax(Board board, int depth, int alpha, int beta, Player maximizingPlayer, Player currentPlayer,
+                bool selective) {
     if (depth == 0) {
         return evaluate(board, maximizingPlayer);
     }
+    if (depth < kMinTableDepth || !tt::attached()) {
+        return searchNode(board, depth, alpha, beta, maximizingPlayer, currentPlayer, selective);
+    }
+
+    // The table holds scores from the side to move's point of view; here they are the maximizing player's
+    bool flip = currentPlayer != maximizingPlayer;
+    uint64_t key = tableKey(board, currentPlayer, selective);
+    int stored;
+    tt::Bound bound;
+    if (tt::probe(key, depth, stored, bound)) {
+        int score = flip ? -stored : stored;
+        if (flip && bound != tt::kExact) bound = bound == tt::kLower ? tt::kUpper : tt::kLower;
+        if (bound == tt::kExact || (bound == tt::kLower && score >= beta) || (bound == tt::kUpper && score <= alpha)) {
+            return score;
+        }
+    }
+
+    int score = searchNode(board, depth, alpha, beta, maximizingPlayer, currentPlayer, selective);
+    // Fail-low results are upper bounds and fail-high results lower bounds, from the maximizing side
+    bound = score <= alpha ? tt::kUpper : score >= beta ? tt::kLower : tt::kExact;
+    if (flip && bound != tt::kExact) bound = bound == tt::kLower ? tt::kUpper : tt::kLower;
+    tt::store(key, depth, flip ? -score : score, bound);
+    return score;
+}
+
+template <int N>
+int SizedAI<N>::searchNode(const Board& board, int depth, int alpha, int beta, Player maximizingPlayer,
+                   Player currentPlayer, bool selective) {
+    int cutScore;
+    if (selective && probCut(board, depth, alpha, beta, maximizingPlayer, currentPlayer, cutScore)) {
+        return cutScore;
+    }
 
     auto moves = board.getValidMoves(currentPlayer);
     
@@ -66,7 +329,7 @@ int AI::minimax(Board board, int depth, int alpha, int beta, Player maximizingPl
             if (diff < 0) return -10000 + diff;
             return 0;
         }
-        return minimax(board, depth, alpha, beta, maximizingPlayer, opponent);
+        return minimax(board, depth, alpha, beta, maximizingPlayer, opponent, selective);
     }
 
     if (currentPlayer == maximizingPlayer) {
@@ -76,7 +339,7 @@ int AI::minimax(Board board, int depth, int alpha, int beta, Player maximizingPl
             nextBoard.applyMove(currentPlayer, move.row, move.col);
             Player opponent = (currentPlayer == Player::Black) ? Player::White : Player::Black;
             
-            int eval = minimax(nextBoard, depth - 1, alpha, beta, maximizingPlayer, opponent);
+            int eval = minimax(nextBoard, depth - 1, alpha, beta, maximizingPlayer, opponent, selective);
             maxEval = std::max(maxEval, eval);
             alpha = std::max(alpha, eval);
             if (beta <= alpha) break;
@@ -89,7 +352,7 @@ int AI::minimax(Board board, int depth, int alpha, int beta, Player maximizingPl
             nextBoard.applyMove(currentPlayer, move.row, move.col);
             Player opponent = (currentPlayer == Player::Black) ? Player::White : Player::Black;
             
-            int eval = minimax(nextBoard, depth - 1, alpha, beta, maximizingPlayer, opponent);
+            int eval = minimax(nextBoard, depth - 1, alpha, beta, maximizingPlayer, opponent, selective);
             minEval = std::min(minEval, eval);
             beta = std::min(beta, eval);
             if (beta <= alpha) break;
@@ -98,17 +361,19 @@ int AI::minimax(Board board, int depth, int alpha, int beta, Player maximizingPl
     }
 }
 
-int AI::evaluate(const Board& board, Player player) {
+template <int N>
+int SizedAI<N>::evaluate(const Board& board, Player player) {
     int score = 0;
     
     // Positional score
+    const auto& eval = kEval<N>;
     const auto& cells = board.data();
-    for (int r = 0; r < 8; ++r) {
-        for (int c = 0; c < 8; ++c) {
-            Cell cell = cells[r * 8 + c];
+    for (int r = 0; r < N; ++r) {
+        for (int c = 0; c < N; ++c) {
+            Cell cell = cells[r * N + c];
             if (cell == Cell::Empty) continue;
             
-            int val = kWeights[r][c];
+            int val = eval.weights[r][c];
             if (cell == (player == Player::Black ? Cell::Black : Cell::White)) {
                 score += val;
             } else {
@@ -118,11 +383,16 @@ int AI::evaluate(const Board& board, Player player) {
     }
     
     // Mobility (number of moves) bonus
-    score += (int)board.getValidMoves(player).size() * 5;
+    score += board.mobility(player) * eval.mobility;
     Player opponent = (player == Player::Black) ? Player::White : Player::Black;
-    score -= (int)board.getValidMoves(opponent).size() * 5;
+    score -= board.mobility(opponent) * eval.mobility;
 
     return score;
 }
 
+template class SizedAI<4>;
+template class SizedAI<6>;
+template class SizedAI<8>;
+template class SizedAI<10>;
+
 } // namespace reversi
@@ -1,4 +1,6 @@
 #include "Board.hpp"
+#include "Kernels.hpp"
+#include <cstddef>
 
 using namespace reversi;
 
@@ -10,11 +12,13 @@ constexpr int DIRS[8][2] = {
 };
 }
 
-Board::Board() {
+template <int N>
+SizedBoard<N>::SizedBoard() {
     reset();
 }
 
-void Board::reset() {
+template <int N>
+void SizedBoard<N>::reset() {
     cells.fill(Cell::Empty);
     int mid = kSize / 2;
     setCell(mid - 1, mid - 1, Cell::White);
@@ -23,19 +27,23 @@ void Board::reset() {
     setCell(mid,     mid - 1, Cell::Black);
 }
 
-Cell Board::getCell(int row, int col) const {
+template <int N>
+Cell SizedBoard<N>::getCell(int row, int col) const {
     return cells[static_cast<size_t>(row * kSize + col)];
 }
 
-void Board::setCell(int row, int col, Cell value) {
+template <int N>
+void SizedBoard<N>::setCell(int row, int col, Cell value) {
     cells[static_cast<size_t>(row * kSize + col)] = value;
 }
 
-bool Board::inBounds(int row, int col) {
+template <int N>
+bool SizedBoard<N>::inBounds(int row, int col) {
     return row >= 0 && col >= 0 && row < kSize && col < kSize;
 }
 
-bool Board::willFlipInDirection(Player player, int row, int col, int dRow, int dCol) const {
+template <int N>
+bool SizedBoard<N>::willFlipInDirection(Player player, int row, int col, int dRow, int dCol) const {
     int r = row + dRow;
     int c = col + dCol;
     Cell me = static_cast<Cell>(static_cast<int8_t>(player));
@@ -48,22 +56,39 @@ bool Board::willFlipInDirection(Player player, int row, int col, int dRow, int d
     return seenOpp && inBounds(r, c) && getCell(r, c) == me;
 }
 
-std::vector<Move> Board::getValidMoves(Player player) const {
+template <int N>
+std::vector<Move> SizedBoard<N>::getValidMoves(Player player) const {
     std::vector<Move> moves;
-    for (int r = 0; r < kSize; ++r) {
-        for (int c = 0; c < kSize; ++c) {
-            if (getCell(r, c) != Cell::Empty) continue;
-            bool ok = false;
-            for (auto& d : DIRS) {
-                if (willFlipInDirection(player, r, c, d[0], d[1])) { ok = true; break; }
-            }
-            if (ok) moves.push_back({r, c});
-        }
+    for (Mask m = moveMask(player); m; m &= m - 1) {
+        int sq = lowestSquare(m);
+        moves.push_back({sq / kSize, sq % kSize});
     }
     return moves;
 }
 
-bool Board::isValidMove(Player player, int row, int col) const {
+template <int N>
+typename SizedBoard<N>::Mask SizedBoard<N>::moveMask(Player player) const {
+    Mask own = 0, opp = 0;
+    Cell me = static_cast<Cell>(static_cast<int8_t>(player));
+    for (int i = 0; i < kSize * kSize; ++i) {
+        Cell cell = cells[static_cast<size_t>(i)];
+        if (cell == me) own |= Mask{1} << i;
+        else if (cell != Cell::Empty) opp |= Mask{1} << i;
+    }
+    if constexpr (N == 8) {
+        return kernels::moves(own, opp);
+    } else {
+        return kernels::sizedMoves<N>(own, opp);
+    }
+}
+
+template <int N>
+int SizedBoard<N>::mobility(Player player) const {
+    return popcount(moveMask(player));
+}
+
+template <int N>
+bool SizedBoard<N>::isValidMove(Player player, int row, int col) const {
     if (!inBounds(row, col) || getCell(row, col) != Cell::Empty) return false;
     for (auto& d : DIRS) {
         if (willFlipInDirection(player, row, col, d[0], d[1])) return true;
@@ -71,7 +96,8 @@ bool Board::isValidMove(Player player, int row, int col) const {
     return false;
 }
 
-int Board::applyDirection(Player player, int row, int col, int dRow, int dCol) {
+template <int N>
+int SizedBoard<N>::applyDirection(Player player, int row, int col, int dRow, int dCol) {
     int r = row + dRow;
     int c = col + dCol;
     Cell me = static_cast<Cell>(static_cast<int8_t>(player));
@@ -87,7 +113,8 @@ int Board::applyDirection(Player player, int row, int col, int dRow, int dCol) {
     return flipped;
 }
 
-bool Board::applyMove(Player player, int row, int col) {
+template <int N>
+bool SizedBoard<N>::applyMove(Player player, int row, int col) {
     if (!isValidMove(player, row, col)) return false;
     Cell me = static_cast<Cell>(static_cast<int8_t>(player));
     setCell(row, col, me);
@@ -95,22 +122,81 @@ bool Board::applyMove(Player player, int row, int col) {
     return true;
 }
 
-std::pair<int, int> Board::getScore() const {
-    int black = 0, white = 0;
-    for (auto cell : cells) {
-        if (cell == Cell::Black) ++black;
-        else if (cell == Cell::White) ++white;
+template <int N>
+typename SizedBoard<N>::Mask SizedBoard<N>::flipsInDirection(Player player, int row, int col, int dRow, int dCol) const {
+    int r = row + dRow;
+    int c = col + dCol;
+    Cell me = static_cast<Cell>(static_cast<int8_t>(player));
+    Cell opp = static_cast<Cell>(-static_cast<int8_t>(player));
+    Mask mask = 0;
+    while (inBounds(r, c) && getCell(r, c) == opp) {
+        mask |= Mask{1} << (r * kSize + c);
+        r += dRow; c += dCol;
     }
-    return {black, white};
+    if (!inBounds(r, c) || getCell(r, c) != me) return 0;
+    return mask;
 }
 
-bool Board::hasAnyValidMove(Player player) const {
+template <int N>
+typename SizedBoard<N>::Mask SizedBoard<N>::flipMask(Player player, int row, int col) const {
+    if (!inBounds(row, col) || getCell(row, col) != Cell::Empty) return 0;
+    Mask mask = 0;
+    for (auto& d : DIRS) { mask |= flipsInDirection(player, row, col, d[0], d[1]); }
+    return mask;
+}
+
+template <int N>
+void SizedBoard<N>::applyFlips(Player player, int row, int col, Mask flips) {
+    Cell me = static_cast<Cell>(static_cast<int8_t>(player));
+    setCell(row, col, me);
+    for (Mask m = flips; m; m &= m - 1) cells[static_cast<size_t>(lowestSquare(m))] = me;
+}
+
+template <int N>
+void SizedBoard<N>::undoFlips(Player player, int row, int col, Mask flips) {
+    Cell opp = static_cast<Cell>(-static_cast<int8_t>(player));
+    setCell(row, col, Cell::Empty);
+    for (Mask m = flips; m; m &= m - 1) cells[static_cast<size_t>(lowestSquare(m))] = opp;
+}
+
+template <int N>
+std::vector<typename SizedBoard<N>::Preview> SizedBoard<N>::getMovePreviews(Player player) const {
+    std::vector<Preview> previews;
     for (int r = 0; r < kSize; ++r) {
         for (int c = 0; c < kSize; ++c) {
-            if (isValidMove(player, r, c)) return true;
+            Mask mask = flipMask(player, r, c);
+            if (!mask) continue;
+            previews.push_back({{r, c}, mask, popcount(mask)});
         }
     }
-    return false;
+    return previews;
+}
+
+template <int N>
+typename SizedBoard<N>::Mask SizedBoard<N>::bitboard(Cell color) const {
+    Mask bits = 0;
+    for (int i = 0; i < kSize * kSize; ++i) {
+        if (cells[static_cast<size_t>(i)] == color) bits |= Mask{1} << i;
+    }
+    return bits;
 }
 
+template <int N>
+std::pair<int, int> SizedBoard<N>::getScore() const {
+    int black = 0, white = 0;
+    for (auto cell : cells) {
+        if (cell == Cell::Black) ++black;
+        else if (cell == Cell::White) ++white;
+    }
+    return {black, white};
+}
+
+template <int N>
+bool SizedBoard<N>::hasAnyValidMove(Player player) const {
+    return moveMask(player) != 0;
+}
 
+template class reversi::SizedBoard<4>;
+template class reversi::SizedBoard<6>;
+template class reversi::SizedBoard<8>;
+template class reversi::SizedBoard<10>;
@@ -3,24 +3,131 @@
 
 using namespace reversi;
 
-Game::Game() : board(), playerToMove(Player::Black), previousPlayerPassed(false) {}
+namespace {
+// Zobrist keys for incremental position hashing; the 8x8 keys match services/pycore.py
+template <int N>
+struct ZobristKeys {
+    static constexpr int kCells = N * N;
+    uint64_t cells[kCells][2];
+    uint64_t whiteToMove;
 
-bool Game::makeMove(int row, int col) {
-    if (board.applyMove(playerToMove, row, col)) {
-        previousPlayerPassed = false;
-        playerToMove = static_cast<Player>(-static_cast<int8_t>(playerToMove));
-        return true;
+    ZobristKeys() {
+        uint64_t state = 0x9E3779B97F4A7C15ull;
+        auto next = [&state]() {
+            uint64_t z = (state += 0x9E3779B97F4A7C15ull);
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ull;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBull;
+            return z ^ (z >> 31);
+        };
+        for (auto& cell : cells) { cell[0] = next(); cell[1] = next(); }
+        whiteToMove = next();
     }
-    return false;
+};
+
+template <int N>
+const ZobristKeys<N>& zobrist() {
+    static const ZobristKeys<N> keys;
+    return keys;
+}
+
+inline int colorIndex(Player player) { return player == Player::Black ? 0 : 1; }
+
+inline Player opponentOf(Player player) { return static_cast<Player>(-static_cast<int8_t>(player)); }
+}
+
+template <int N>
+SizedGame<N>::SizedGame()
+    : board(), playerToMove(Player::Black), previousPlayerPassed(false),
+      positionHash(computeHash(board, Player::Black)) {}
+
+template <int N>
+uint64_t SizedGame<N>::computeHash(const Board& board, Player toMove) {
+    const auto& keys = zobrist<N>();
+    uint64_t h = toMove == Player::White ? keys.whiteToMove : 0;
+    const auto& cells = board.data();
+    for (int i = 0; i < N * N; ++i) {
+        if (cells[i] == Cell::Black) h ^= keys.cells[i][0];
+        else if (cells[i] == Cell::White) h ^= keys.cells[i][1];
+    }
+    return h;
+}
+
+template <int N>
+bool SizedGame<N>::makeMove(int row, int col) {
+    // Replaying the recorded next move keeps the redo tail
+    if (plyIndex < moves.size() && moves[plyIndex].move.row == row && moves[plyIndex].move.col == col) {
+        return redo();
+    }
+    auto flips = board.flipMask(playerToMove, row, col);
+    if (!flips) return false;
+    record({row, col}, flips);
+    return true;
+}
+
+template <int N>
+void SizedGame<N>::passTurn() {
+    if (plyIndex < moves.size() && moves[plyIndex].move.row == -1) {
+        redo();
+        return;
+    }
+    record({-1, -1}, 0);
+}
+
+template <int N>
+void SizedGame<N>::record(Move move, typename Board::Mask flips) {
+    moves.resize(plyIndex);
+    // A pass leaves previousPlayerPassed set when the passing player had no move either
+    bool passedAfter = move.row < 0 && !board.hasAnyValidMove(playerToMove);
+    moves.push_back({move, flips, playerToMove, previousPlayerPassed, passedAfter, positionHash});
+    redo();
+}
+
+template <int N>
+void SizedGame<N>::apply(const HistoryEntry& entry) {
+    const auto& keys = zobrist<N>();
+    if (entry.move.row >= 0) {
+        board.applyFlips(entry.player, entry.move.row, entry.move.col, entry.flips);
+        positionHash ^= keys.cells[entry.move.row * N + entry.move.col][colorIndex(entry.player)];
+        for (typename Board::Mask m = entry.flips; m; m &= m - 1) {
+            int sq = lowestSquare(m);
+            positionHash ^= keys.cells[sq][0] ^ keys.cells[sq][1];
+        }
+    }
+    previousPlayerPassed = entry.passedAfter;
+    playerToMove = opponentOf(entry.player);
+    positionHash ^= keys.whiteToMove;
 }
 
-void Game::passTurn() {
-    bool currentPlayerHasNoMoves = board.getValidMoves(playerToMove).empty();
-    previousPlayerPassed = currentPlayerHasNoMoves;
-    playerToMove = static_cast<Player>(-static_cast<int8_t>(playerToMove));
+template <int N>
+bool SizedGame<N>::undo() {
+    if (plyIndex == 0) return false;
+    const auto& entry = moves[--plyIndex];
+    if (entry.move.row >= 0) {
+        board.undoFlips(entry.player, entry.move.row, entry.move.col, entry.flips);
+    }
+    playerToMove = entry.player;
+    previousPlayerPassed = entry.passedBefore;
+    positionHash = entry.hashBefore;
+    return true;
+}
+
+template <int N>
+bool SizedGame<N>::redo() {
+    if (plyIndex >= moves.size()) return false;
+    apply(moves[plyIndex++]);
+    return true;
 }
 
-GameResult Game::result() const {
+template <int N>
+bool SizedGame<N>::gotoPly(int target) {
+    if (target < 0 || target > static_cast<int>(moves.size())) return false;
+    while (ply() > target) undo();
+    while (ply() < target) redo();
+    return true;
+}
+
+template <int N>
+GameResult SizedGame<N>::result() const {
     bool blackHas = board.hasAnyValidMove(Player::Black);
     bool whiteHas = board.hasAnyValidMove(Player::White);
     // Game ends only when both players have no moves
@@ -31,14 +138,39 @@ GameResult Game::result() const {
     return GameResult::Draw;
 }
 
-void Game::reset() {
+template <int N>
+void SizedGame<N>::reset() {
     board.reset();
     playerToMove = Player::Black;
     previousPlayerPassed = false;
+    moves.clear();
+    plyIndex = 0;
+    positionHash = computeHash(board, playerToMove);
+}
+
+template <int N>
+std::vector<std::pair<Move, int>> SizedGame<N>::getTopMoves(int depth, int k) const {
+    return SizedAI<N>::getTopMoves(board, playerToMove, depth, k);
 }
 
-Move Game::getBestMove(int depth) const {
-    return AI::getBestMove(board, playerToMove, depth);
+template <int N>
+Move SizedGame<N>::getBestMove(int depth, int* outScore, bool selective) const {
+    return SizedAI<N>::getBestMove(board, playerToMove, depth, outScore, selective);
 }
 
+AnyGame* reversi::newGame(int size) {
+    switch (size) {
+        case 4: return new AnyGame(std::in_place_type<SizedGame<4>>);
+        case 6: return new AnyGame(std::in_place_type<SizedGame<6>>);
+        case 8: return new AnyGame(std::in_place_type<Game>);
+        case 10: return new AnyGame(std::in_place_type<SizedGame<10>>);
+    }
+    return nullptr;
+}
+
+template class reversi::SizedGame<4>;
+template class reversi::SizedGame<6>;
+template class reversi::SizedGame<8>;
+template class reversi::SizedGame<10>;
+
 
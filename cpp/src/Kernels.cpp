@@ -0,0 +1,135 @@
+#include "Kernels.hpp"
+
+#include <cstdlib>
+#include <cstring>
+
+#if defined(__x86_64__) || defined(_M_X64)
+  #define REVERSI_X86 1
+  #ifdef _MSC_VER
+    #include <intrin.h>
+    #include <immintrin.h>
+    #define TARGET_POPCNT
+    #define TARGET_AVX2
+  #else
+    #include <immintrin.h>
+    #define TARGET_POPCNT __attribute__((target("popcnt")))
+    #define TARGET_AVX2 __attribute__((target("avx2,popcnt")))
+  #endif
+#else
+  #define REVERSI_X86 0
+#endif
+
+namespace reversi {
+namespace kernels {
+
+namespace {
+using MovesFn = uint64_t (*)(uint64_t, uint64_t);
+using PopcountFn = int (*)(uint64_t);
+
+// Opponent discs that can be part of a horizontal or diagonal run (columns 1-6),
+// which keeps shifted runs from wrapping onto the next row
+constexpr uint64_t kInner = 0x7E7E7E7E7E7E7E7Eull;
+
+template <int Shift>
+inline uint64_t movesInDirection(uint64_t own, uint64_t opp) {
+    uint64_t left = opp & (own << Shift);
+    uint64_t right = opp & (own >> Shift);
+    for (int i = 0; i < 5; ++i) {
+        left |= opp & (left << Shift);
+        right |= opp & (right >> Shift);
+    }
+    return (left << Shift) | (right >> Shift);
+}
+
+uint64_t movesGeneric(uint64_t own, uint64_t opp) {
+    uint64_t inner = opp & kInner;
+    uint64_t moves = movesInDirection<1>(own, inner)
+                   | movesInDirection<8>(own, opp)
+                   | movesInDirection<7>(own, inner)
+                   | movesInDirection<9>(own, inner);
+    return moves & ~(own | opp);
+}
+
+int popcountGeneric(uint64_t x) {
+    x = x - ((x >> 1) & 0x5555555555555555ull);
+    x = (x & 0x3333333333333333ull) + ((x >> 2) & 0x3333333333333333ull);
+    x = (x + (x >> 4)) & 0x0F0F0F0F0F0F0F0Full;
+    return static_cast<int>((x * 0x0101010101010101ull) >> 56);
+}
+
+#if REVERSI_X86
+TARGET_POPCNT int popcountHardware(uint64_t x) {
+#ifdef _MSC_VER
+    return static_cast<int>(__popcnt64(x));
+#else
+    return __builtin_popcountll(x);
+#endif
+}
+
+// All four shift directions (1, 8, 9, 7) in one 256-bit register
+TARGET_AVX2 uint64_t movesAvx2(uint64_t own, uint64_t opp) {
+    const __m256i shifts = _mm256_set_epi64x(7, 9, 8, 1);
+    const __m256i masks = _mm256_set_epi64x(static_cast<long long>(kInner), static_cast<long long>(kInner),
+                                            -1, static_cast<long long>(kInner));
+    __m256i pp = _mm256_broadcastq_epi64(_mm_cvtsi64_si128(static_cast<long long>(own)));
+    __m256i oo = _mm256_and_si256(_mm256_broadcastq_epi64(_mm_cvtsi64_si128(static_cast<long long>(opp))), masks);
+
+    __m256i left = _mm256_and_si256(oo, _mm256_sllv_epi64(pp, shifts));
+    __m256i right = _mm256_and_si256(oo, _mm256_srlv_epi64(pp, shifts));
+    for (int i = 0; i < 5; ++i) {
+        left = _mm256_or_si256(left, _mm256_and_si256(oo, _mm256_sllv_epi64(left, shifts)));
+        right = _mm256_or_si256(right, _mm256_and_si256(oo, _mm256_srlv_epi64(right, shifts)));
+    }
+    __m256i m = _mm256_or_si256(_mm256_sllv_epi64(left, shifts), _mm256_srlv_epi64(right, shifts));
+    __m128i m2 = _mm_or_si128(_mm256_castsi256_si128(m), _mm256_extracti128_si256(m, 1));
+    m2 = _mm_or_si128(m2, _mm_unpackhi_epi64(m2, m2));
+    return static_cast<uint64_t>(_mm_cvtsi128_si64(m2)) & ~(own | opp);
+}
+#endif
+
+struct Dispatch {
+    MovesFn moves;
+    PopcountFn popcount;
+    const char* name;
+};
+
+Dispatch select() {
+    bool popcnt = false;
+    bool avx2 = false;
+#if REVERSI_X86
+  #ifdef _MSC_VER
+    int info[4];
+    __cpuid(info, 1);
+    popcnt = (info[2] >> 23) & 1;
+    bool osUsesXsave = (info[2] >> 27) & 1;
+    bool avx = (info[2] >> 28) & 1;
+    __cpuidex(info, 7, 0);
+    avx2 = ((info[1] >> 5) & 1) && avx && osUsesXsave && ((_xgetbv(0) & 6) == 6);
+  #else
+    __builtin_cpu_init();
+    popcnt = __builtin_cpu_supports("popcnt");
+    avx2 = __builtin_cpu_supports("avx2");
+  #endif
+#endif
+    const char* cap = std::getenv("REVERSI_KERNEL");
+    if (cap && std::strcmp(cap, "generic") == 0) { popcnt = false; avx2 = false; }
+    if (cap && std::strcmp(cap, "popcnt") == 0) { avx2 = false; }
+
+#if REVERSI_X86
+    if (avx2 && popcnt) return {movesAvx2, popcountHardware, "avx2"};
+    if (popcnt) return {movesGeneric, popcountHardware, "popcnt"};
+#endif
+    return {movesGeneric, popcountGeneric, "generic"};
+}
+
+const Dispatch kDispatch = select();
+}
+
+uint64_t moves(uint64_t own, uint64_t opp) { return kDispatch.moves(own, opp); }
+
+int popcount(uint64_t x) { return kDispatch.popcount(x); }
+
+const char* name() { return kDispatch.name; }
+
+} // namespace kernels
+} // namespace reversi
@@ -0,0 +1,135 @@
+#include "SearchPool.hpp"
+
+#include <chrono>
+
+namespace reversi {
+
+ThreadPool& ThreadPool::instance() {
+    // Never destroyed: joining threads during static destruction can deadlock in a DLL
+    static ThreadPool* pool = new ThreadPool();
+    return *pool;
+}
+
+void ThreadPool::resize(int threads) {
+    stop();
+    start(threads);
+}
+
+int ThreadPool::size() {
+    std::lock_guard<std::mutex> lock(mutex);
+    return static_cast<int>(workers.size());
+}
+
+void ThreadPool::submit(std::function<void()> task) {
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (!workers.empty()) {
+            tasks.push_back(std::move(task));
+            ready.notify_one();
+            return;
+        }
+    }
+    start(0);
+    std::lock_guard<std::mutex> lock(mutex);
+    tasks.push_back(std::move(task));
+    ready.notify_one();
+}
+
+void ThreadPool::start(int threads) {
+    if (threads <= 0) threads = static_cast<int>(std::thread::hardware_concurrency());
+    if (threads <= 0) threads = 1;
+    std::lock_guard<std::mutex> lock(mutex);
+    if (!workers.empty()) return;
+    stopping = false;
+    for (int i = 0; i < threads; ++i) workers.emplace_back([this] { run(); });
+}
+
+void ThreadPool::stop() {
+    std::vector<std::thread> old;
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        stopping = true;
+        old.swap(workers);
+    }
+    ready.notify_all();
+    for (auto& t : old) t.join();
+}
+
+void ThreadPool::run() {
+    for (;;) {
+        std::function<void()> task;
+        {
+            std::unique_lock<std::mutex> lock(mutex);
+            ready.wait(lock, [this] { return stopping || !tasks.empty(); });
+            // Drain the queue before exiting so no batch is left waiting
+            if (tasks.empty()) return;
+            task = std::move(tasks.front());
+            tasks.pop_front();
+        }
+        task();
+    }
+}
+
+SearchBatch::SearchBatch(std::vector<SearchRequest> requests_, SearchCallback callback_, void* user_)
+    : requests(std::move(requests_)), results(requests.size(), Result{-1, 0}),
+      callback(callback_), user(user_), remaining(static_cast<int>(requests.size())) {
+    auto& pool = ThreadPool::instance();
+    for (int i = 0; i < static_cast<int>(requests.size()); ++i) {
+        pool.submit([this, i] { search(i); });
+    }
+}
+
+SearchBatch::~SearchBatch() {
+    wait();
+}
+
+void SearchBatch::search(int index) {
+    const SearchRequest& request = requests[index];
+    int score = 0;
+    int move = -1;
+    if (request.game) {
+        std::visit([&](const auto& game) {
+            Move best = game.getBestMove(request.depth, &score, request.selective);
+            if (best.row != -1) move = best.row * game.kSize + best.col;
+        }, *request.game);
+    }
+    if (callback) callback(user, index, move, score);
+    // Notify under the lock: once remaining hits zero the batch may be destroyed
+    std::lock_guard<std::mutex> lock(mutex);
+    results[index] = Result{move, score};
+    done.push_back(index);
+    --remaining;
+    finished.notify_all();
+}
+
+int SearchBatch::poll(int* outIndices, int* outMoves, int* outScores, int max, int timeoutMs) {
+    std::unique_lock<std::mutex> lock(mutex);
+    auto available = [this] { return !done.empty() || remaining == 0; };
+    if (timeoutMs < 0) {
+        finished.wait(lock, available);
+    } else {
+        finished.wait_for(lock, std::chrono::milliseconds(timeoutMs), available);
+    }
+    int n = 0;
+    while (n < max && !done.empty()) {
+        int index = done.front();
+        done.pop_front();
+        if (outIndices) outIndices[n] = index;
+        if (outMoves) outMoves[n] = results[index].move;
+        if (outScores) outScores[n] = results[index].score;
+        ++n;
+    }
+    return n;
+}
+
+void SearchBatch::wait() {
+    std::unique_lock<std::mutex> lock(mutex);
+    finished.wait(lock, [this] { return remaining == 0; });
+}
+
+int SearchBatch::pending() {
+    std::lock_guard<std::mutex> lock(mutex);
+    return remaining;
+}
+
+} // namespace reversi
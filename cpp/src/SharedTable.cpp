@@ -0,0 +1,219 @@
+#include "SharedTable.hpp"
+
+#include <atomic>
+#include <chrono>
+#include <cstring>
+#include <thread>
+
+#ifdef _WIN32
+  #ifndef NOMINMAX
+    #define NOMINMAX
+  #endif
+  #include <windows.h>
+#else
+  #include <fcntl.h>
+  #include <sys/mman.h>
+  #include <sys/stat.h>
+  #include <unistd.h>
+#endif
+
+namespace reversi {
+namespace tt {
+
+namespace {
+constexpr uint64_t kMagic = 0x3154545F52565352ull;  // "RSVR_TT1"
+constexpr int kWays = 2;  // per bucket: a depth-preferred slot and an always-replace slot
+
+struct Entry {
+    std::atomic<uint64_t> check;  // key ^ data
+    std::atomic<uint64_t> data;   // score (32 bits), depth (8), bound (2)
+};
+
+struct Bucket {
+    Entry slots[kWays];
+};
+
+struct Header {
+    std::atomic<uint64_t> magic;  // set last by the creating process
+    uint64_t buckets;             // a power of two
+    uint64_t bytes;
+    uint64_t reserved[5];
+};
+
+static_assert(std::atomic<uint64_t>::is_always_lock_free, "entries are shared between processes");
+static_assert(sizeof(Header) == 64 && sizeof(Bucket) == 32, "segment layout is shared between builds");
+
+struct Mapping {
+    Header* header = nullptr;
+    Bucket* buckets = nullptr;
+    uint64_t mask = 0;
+    size_t bytes = 0;
+#ifdef _WIN32
+    HANDLE handle = nullptr;
+#endif
+};
+
+Mapping mapping;
+std::atomic<uint64_t> probeCount{0}, hitCount{0}, storeCount{0};
+
+inline uint64_t pack(int depth, int score, Bound bound) {
+    return static_cast<uint32_t>(score) | (static_cast<uint64_t>(depth & 0xFF) << 32)
+         | (static_cast<uint64_t>(bound) << 40);
+}
+
+inline int unpackDepth(uint64_t data) { return static_cast<int>((data >> 32) & 0xFF); }
+
+std::string segmentName(const std::string& name) {
+#ifdef _WIN32
+    return "Local\\" + name;
+#else
+    return name.empty() || name[0] != '/' ? "/" + name : name;
+#endif
+}
+
+uint64_t bucketsFor(int megabytes) {
+    uint64_t available = (static_cast<uint64_t>(megabytes) << 20) - sizeof(Header);
+    uint64_t buckets = 1;
+    while (buckets * 2 * sizeof(Bucket) <= available) buckets *= 2;
+    return buckets;
+}
+
+// Waits for the creating process to publish the header
+bool waitForHeader(Header* header, size_t bytes) {
+    for (int i = 0; i < 2000; ++i) {
+        if (header->magic.load(std::memory_order_acquire) == kMagic) {
+            return header->bytes <= bytes && sizeof(Header) + header->buckets * sizeof(Bucket) <= bytes;
+        }
+        std::this_thread::sleep_for(std::chrono::milliseconds(1));
+    }
+    return false;
+}
+
+bool map(const std::string& name, int megabytes) {
+    uint64_t buckets = bucketsFor(megabytes);
+    size_t bytes = sizeof(Header) + buckets * sizeof(Bucket);
+    std::string full = segmentName(name);
+    bool created = false;
+    void* base = nullptr;
+#ifdef _WIN32
+    HANDLE handle = CreateFileMappingA(INVALID_HANDLE_VALUE, nullptr, PAGE_READWRITE,
+                                       static_cast<DWORD>(static_cast<uint64_t>(bytes) >> 32),
+                                       static_cast<DWORD>(bytes & 0xFFFFFFFFu), full.c_str());
+    if (!handle) return false;
+    created = GetLastError() != ERROR_ALREADY_EXISTS;
+    base = MapViewOfFile(handle, FILE_MAP_ALL_ACCESS, 0, 0, 0);
+    if (!base) { CloseHandle(handle); return false; }
+    MEMORY_BASIC_INFORMATION info;
+    if (!VirtualQuery(base, &info, sizeof(info))) { UnmapViewOfFile(base); CloseHandle(handle); return false; }
+    if (!created) bytes = info.RegionSize;
+#else
+    int fd = shm_open(full.c_str(), O_RDWR | O_CREAT | O_EXCL, 0600);
+    if (fd >= 0) {
+        created = true;
+        if (ftruncate(fd, static_cast<off_t>(bytes)) != 0) { close(fd); shm_unlink(full.c_str()); return false; }
+    } else {
+        fd = shm_open(full.c_str(), O_RDWR, 0600);
+        if (fd < 0) return false;
+        // The creator may not have sized the segment yet
+        struct stat st{};
+        for (int i = 0; i < 2000 && fstat(fd, &st) == 0 && static_cast<size_t>(st.st_size) < sizeof(Header); ++i) {
+            std::this_thread::sleep_for(std::chrono::milliseconds(1));
+        }
+        if (static_cast<size_t>(st.st_size) < sizeof(Header)) { close(fd); return false; }
+        bytes = static_cast<size_t>(st.st_size);
+    }
+    base = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (base == MAP_FAILED) return false;
+#endif
+    auto* header = static_cast<Header*>(base);
+    if (created) {
+        header->buckets = buckets;
+        header->bytes = bytes;
+        header->magic.store(kMagic, std::memory_order_release);
+    } else if (!waitForHeader(header, bytes)) {
+#ifdef _WIN32
+        UnmapViewOfFile(base);
+        CloseHandle(handle);
+#else
+        munmap(base, bytes);
+#endif
+        return false;
+    }
+    mapping.header = header;
+    mapping.buckets = reinterpret_cast<Bucket*>(static_cast<char*>(base) + sizeof(Header));
+    mapping.mask = header->buckets - 1;
+    mapping.bytes = bytes;
+#ifdef _WIN32
+    mapping.handle = handle;
+#endif
+    return true;
+}
+}
+
+bool attach(const std::string& name, int megabytes) {
+    detach();
+    if (name.empty() || megabytes < 1) return false;
+    return map(name, megabytes);
+}
+
+void detach() {
+    if (!mapping.header) return;
+#ifdef _WIN32
+    UnmapViewOfFile(mapping.header);
+    CloseHandle(mapping.handle);
+#else
+    munmap(mapping.header, mapping.bytes);
+#endif
+    mapping = Mapping{};
+}
+
+bool attached() {
+    return mapping.header != nullptr;
+}
+
+bool remove(const std::string& name) {
+#ifdef _WIN32
+    (void)name;
+    return true;
+#else
+    return shm_unlink(segmentName(name).c_str()) == 0;
+#endif
+}
+
+bool probe(uint64_t key, int depth, int& score, Bound& bound) {
+    probeCount.fetch_add(1, std::memory_order_relaxed);
+    Bucket& bucket = mapping.buckets[key & mapping.mask];
+    for (auto& slot : bucket.slots) {
+        uint64_t data = slot.data.load(std::memory_order_relaxed);
+        uint64_t check = slot.check.load(std::memory_order_relaxed);
+        if ((check ^ data) != key || unpackDepth(data) != depth) continue;
+        bound = static_cast<Bound>((data >> 40) & 3);
+        if (bound == kNone) continue;
+        score = static_cast<int32_t>(static_cast<uint32_t>(data));
+        hitCount.fetch_add(1, std::memory_order_relaxed);
+        return true;
+    }
+    return false;
+}
+
+void store(uint64_t key, int depth, int score, Bound bound) {
+    storeCount.fetch_add(1, std::memory_order_relaxed);
+    Bucket& bucket = mapping.buckets[key & mapping.mask];
+    Entry& preferred = bucket.slots[0];
+    uint64_t old = preferred.data.load(std::memory_order_relaxed);
+    bool same = (preferred.check.load(std::memory_order_relaxed) ^ old) == key;
+    Entry& slot = (same || depth >= unpackDepth(old)) ? preferred : bucket.slots[1];
+    uint64_t data = pack(depth, score, bound);
+    slot.data.store(data, std::memory_order_relaxed);
+    slot.check.store(key ^ data, std::memory_order_relaxed);
+}
+
+void stats(uint64_t* probes, uint64_t* hits, uint64_t* stores) {
+    if (probes) *probes = probeCount.load(std::memory_order_relaxed);
+    if (hits) *hits = hitCount.load(std::memory_order_relaxed);
+    if (stores) *stores = storeCount.load(std::memory_order_relaxed);
+}
+
+} // namespace tt
+} // namespace reversi
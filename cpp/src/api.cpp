@@ -1,86 +1,199 @@
     #include "api.h"
     #include "Game.hpp"
+    #include "AI.hpp"
+    #include "Kernels.hpp"
+    #include "SharedTable.hpp"
+    #include "SearchPool.hpp"
     #include <vector>
     #include <memory>
+    #include <variant>
 
-    using reversi::Game;
+    using reversi::AnyGame;
     using reversi::Board;
     using reversi::Player;
     using reversi::GameResult;
     using reversi::Cell;
+    using reversi::SearchBatch;
+    using reversi::SearchRequest;
+    using reversi::ThreadPool;
+
+    namespace {
+    AnyGame* gameOf(reversi_handle h) {
+        return reinterpret_cast<AnyGame*>(h);
+    }
+
+    // Runs f on the handle's game at its own size; fallback is returned for a null handle
+    template <typename R, typename F>
+    R onGame(reversi_handle h, R fallback, F&& f) {
+        auto* g = gameOf(h);
+        return g ? std::visit(f, *g) : fallback;
+    }
+
+    template <typename F>
+    void onGame(reversi_handle h, F&& f) {
+        if (auto* g = gameOf(h)) std::visit(f, *g);
+    }
+
+    // row * size + col on the game's own board, -1 for a pass or no move
+    template <typename G>
+    int squareOf(const G&, reversi::Move m) {
+        return m.row < 0 ? -1 : m.row * G::kSize + m.col;
+    }
+
+    std::vector<SearchRequest> searchRequests(const reversi_handle* games, const int* depths, int count, int flags) {
+        std::vector<SearchRequest> requests;
+        if (!games || !depths || count <= 0) return requests;
+        requests.reserve(count);
+        for (int i = 0; i < count; ++i) {
+            requests.push_back({reinterpret_cast<const AnyGame*>(games[i]), depths[i], (flags & SEARCH_PROBCUT) != 0});
+        }
+        return requests;
+    }
+    }
 
     extern "C" {
 
     REVERSI_API reversi_handle create_game() {
-        return reinterpret_cast<reversi_handle>(new Game());
+        return reinterpret_cast<reversi_handle>(reversi::newGame(Board::kSize));
+    }
+
+    REVERSI_API reversi_handle create_game_sized(int size) {
+        return reinterpret_cast<reversi_handle>(reversi::newGame(size));
     }
 
     REVERSI_API void destroy_game(reversi_handle h) {
         if (!h) return;
-        auto* g = reinterpret_cast<Game*>(h);
-        delete g;
+        delete gameOf(h);
+    }
+
+    REVERSI_API reversi_handle clone_game(reversi_handle h) {
+        auto* g = gameOf(h);
+        if (!g) return nullptr;
+        return reinterpret_cast<reversi_handle>(new AnyGame(*g));
+    }
+
+    REVERSI_API int copy_game(reversi_handle dst, reversi_handle src) {
+        auto* d = gameOf(dst);
+        auto* s = gameOf(src);
+        if (!d || !s || d->index() != s->index()) return 0;
+        if (d != s) *d = *s;
+        return 1;
     }
 
     REVERSI_API int get_board_size() { return Board::kSize; }
 
+    REVERSI_API int get_game_size(reversi_handle h) {
+        return onGame(h, 0, [](const auto& g) { return g.kSize; });
+    }
+
     REVERSI_API cell_t get_cell(reversi_handle h, int row, int col) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return CELL_EMPTY;
-        auto c = g->getBoard().getCell(row, col);
-        if (c == Cell::Black) return CELL_BLACK;
-        if (c == Cell::White) return CELL_WHITE;
-        return CELL_EMPTY;
+        return onGame(h, CELL_EMPTY, [&](const auto& g) {
+            auto c = g.getBoard().getCell(row, col);
+            if (c == Cell::Black) return CELL_BLACK;
+            if (c == Cell::White) return CELL_WHITE;
+            return CELL_EMPTY;
+        });
     }
 
     REVERSI_API void get_board(reversi_handle h, int8_t* out64) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g || !out64) return;
-        const auto& arr = g->getBoard().data();
-        for (size_t i = 0; i < arr.size(); ++i) out64[i] = static_cast<int8_t>(arr[i]);
+        if (!out64) return;
+        onGame(h, [&](const auto& g) {
+            const auto& arr = g.getBoard().data();
+            for (size_t i = 0; i < arr.size(); ++i) out64[i] = static_cast<int8_t>(arr[i]);
+        });
+    }
+
+    REVERSI_API void get_bitboards(reversi_handle h, uint64_t* out_black, uint64_t* out_white) {
+        if (out_black) *out_black = 0;
+        if (out_white) *out_white = 0;
+        onGame(h, [&](const auto& g) {
+            if (out_black) *out_black = reversi::maskWord(g.getBoard().bitboard(Cell::Black), 0);
+            if (out_white) *out_white = reversi::maskWord(g.getBoard().bitboard(Cell::White), 0);
+        });
+    }
+
+    REVERSI_API void get_bitboards_wide(reversi_handle h, uint64_t* out_black2, uint64_t* out_white2) {
+        for (int i = 0; i < 2; ++i) {
+            if (out_black2) out_black2[i] = 0;
+            if (out_white2) out_white2[i] = 0;
+        }
+        onGame(h, [&](const auto& g) {
+            auto black = g.getBoard().bitboard(Cell::Black);
+            auto white = g.getBoard().bitboard(Cell::White);
+            for (int i = 0; i < 2; ++i) {
+                if (out_black2) out_black2[i] = reversi::maskWord(black, i);
+                if (out_white2) out_white2[i] = reversi::maskWord(white, i);
+            }
+        });
     }
 
     REVERSI_API player_t current_player(reversi_handle h) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return PLAYER_BLACK;
-        return static_cast<player_t>(static_cast<int8_t>(g->currentPlayer()));
+        return onGame(h, PLAYER_BLACK, [](const auto& g) {
+            return static_cast<player_t>(static_cast<int8_t>(g.currentPlayer()));
+        });
     }
 
     REVERSI_API int get_valid_moves(reversi_handle h, int* out_moves, int max_moves) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return 0;
-        auto moves = g->validMoves();
-        int n = static_cast<int>(moves.size());
-        int toCopy = (out_moves && max_moves > 0) ? std::min(n, max_moves) : 0;
-        for (int i = 0; i < toCopy; ++i) {
-            out_moves[i] = moves[i].row * Board::kSize + moves[i].col;
-        }
-        return n;
+        return onGame(h, 0, [&](const auto& g) {
+            auto moves = g.validMoves();
+            int n = static_cast<int>(moves.size());
+            int toCopy = (out_moves && max_moves > 0) ? std::min(n, max_moves) : 0;
+            for (int i = 0; i < toCopy; ++i) {
+                out_moves[i] = squareOf(g, moves[i]);
+            }
+            return n;
+        });
+    }
+
+    REVERSI_API int get_move_previews(reversi_handle h, int* out_moves, uint64_t* out_masks, int* out_counts, int max_moves) {
+        return onGame(h, 0, [&](const auto& g) {
+            auto previews = g.movePreviews();
+            int n = static_cast<int>(previews.size());
+            int toCopy = max_moves > 0 ? std::min(n, max_moves) : 0;
+            for (int i = 0; i < toCopy; ++i) {
+                const auto& p = previews[i];
+                if (out_moves) out_moves[i] = squareOf(g, p.move);
+                if (out_masks) out_masks[i] = reversi::maskWord(p.flips, 0);
+                if (out_counts) out_counts[i] = p.flipCount;
+            }
+            return n;
+        });
+    }
+
+    REVERSI_API int get_move_previews_wide(reversi_handle h, int* out_moves, uint64_t* out_masks2, int* out_counts, int max_moves) {
+        return onGame(h, 0, [&](const auto& g) {
+            auto previews = g.movePreviews();
+            int n = static_cast<int>(previews.size());
+            int toCopy = max_moves > 0 ? std::min(n, max_moves) : 0;
+            for (int i = 0; i < toCopy; ++i) {
+                const auto& p = previews[i];
+                if (out_moves) out_moves[i] = squareOf(g, p.move);
+                if (out_masks2) {
+                    out_masks2[2 * i] = reversi::maskWord(p.flips, 0);
+                    out_masks2[2 * i + 1] = reversi::maskWord(p.flips, 1);
+                }
+                if (out_counts) out_counts[i] = p.flipCount;
+            }
+            return n;
+        });
     }
 
     REVERSI_API int make_move(reversi_handle h, int row, int col) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return 0;
-        return g->makeMove(row, col) ? 1 : 0;
+        return onGame(h, 0, [&](auto& g) { return g.makeMove(row, col) ? 1 : 0; });
     }
 
     REVERSI_API void pass_turn(reversi_handle h) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return;
-        g->passTurn();
+        onGame(h, [](auto& g) { g.passTurn(); });
     }
 
     REVERSI_API void get_score(reversi_handle h, int* out_black, int* out_white) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) { if (out_black) *out_black = 0; if (out_white) *out_white = 0; return; }
-        auto s = g->score();
+        auto s = onGame(h, std::make_pair(0, 0), [](const auto& g) { return g.score(); });
         if (out_black) *out_black = s.first;
         if (out_white) *out_white = s.second;
     }
 
     REVERSI_API result_t get_result(reversi_handle h) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return RESULT_ONGOING;
-        auto r = g->result();
+        auto r = onGame(h, GameResult::Ongoing, [](const auto& g) { return g.result(); });
         switch (r) {
             case GameResult::Ongoing: return RESULT_ONGOING;
             case GameResult::BlackWins: return RESULT_BLACK;
@@ -91,19 +204,165 @@
     }
 
     REVERSI_API void reset_game(reversi_handle h) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return;
-        g->reset();
+        onGame(h, [](auto& g) { g.reset(); });
     }
 
     REVERSI_API int get_best_move(reversi_handle h, int depth) {
-        auto* g = reinterpret_cast<Game*>(h);
-        if (!g) return -1;
-        auto move = g->getBestMove(depth);
-        if (move.row == -1) return -1;
-        return move.row * Board::kSize + move.col;
+        return onGame(h, -1, [&](const auto& g) { return squareOf(g, g.getBestMove(depth)); });
+    }
+
+    REVERSI_API int get_top_moves(reversi_handle h, int k, int depth, int* out_moves, int* out_scores) {
+        if (k <= 0) return 0;
+        return onGame(h, 0, [&](const auto& g) {
+            auto top = g.getTopMoves(depth, k);
+            int n = static_cast<int>(top.size());
+            for (int i = 0; i < n; ++i) {
+                if (out_moves) out_moves[i] = squareOf(g, top[i].first);
+                if (out_scores) out_scores[i] = top[i].second;
+            }
+            return n;
+        });
+    }
+
+    REVERSI_API int get_best_move_score(reversi_handle h, int depth, int* out_score) {
+        if (out_score) *out_score = 0;
+        return onGame(h, -1, [&](const auto& g) { return squareOf(g, g.getBestMove(depth, out_score)); });
+    }
+
+    REVERSI_API int search_best_move(reversi_handle h, int depth, int flags, int* out_score) {
+        if (out_score) *out_score = 0;
+        return onGame(h, -1, [&](const auto& g) {
+            return squareOf(g, g.getBestMove(depth, out_score, (flags & SEARCH_PROBCUT) != 0));
+        });
+    }
+
+    REVERSI_API int undo_move(reversi_handle h) {
+        return onGame(h, 0, [](auto& g) { return g.undo() ? 1 : 0; });
+    }
+
+    REVERSI_API int redo_move(reversi_handle h) {
+        return onGame(h, 0, [](auto& g) { return g.redo() ? 1 : 0; });
+    }
+
+    REVERSI_API int goto_ply(reversi_handle h, int ply) {
+        return onGame(h, 0, [&](auto& g) { return g.gotoPly(ply) ? 1 : 0; });
+    }
+
+    REVERSI_API int get_ply(reversi_handle h) {
+        return onGame(h, 0, [](const auto& g) { return g.ply(); });
+    }
+
+    REVERSI_API int get_history(reversi_handle h, int* out_moves, int max_moves) {
+        return onGame(h, 0, [&](const auto& g) {
+            const auto& history = g.history();
+            int n = static_cast<int>(history.size());
+            int toCopy = (out_moves && max_moves > 0) ? std::min(n, max_moves) : 0;
+            for (int i = 0; i < toCopy; ++i) {
+                out_moves[i] = squareOf(g, history[i].move);
+            }
+            return n;
+        });
+    }
+
+    REVERSI_API uint64_t get_position_hash(reversi_handle h) {
+        return onGame(h, uint64_t{0}, [](const auto& g) { return g.hash(); });
+    }
+
+    REVERSI_API void set_eval_weights(const int* squares64, int mobility) {
+        if (!squares64) return;
+        reversi::AI::setWeights(squares64, mobility);
+    }
+
+    REVERSI_API void get_eval_weights(int* out_squares64, int* out_mobility) {
+        reversi::AI::getWeights(out_squares64, out_mobility);
     }
 
+    REVERSI_API int load_eval_weights(const char* path) {
+        if (!path) return 0;
+        return reversi::AI::loadWeights(path) ? 1 : 0;
     }
 
+    REVERSI_API int load_probcut_params(const char* path) {
+        if (!path) return 0;
+        return reversi::AI::loadProbCut(path) ? 1 : 0;
+    }
+
+    REVERSI_API int get_probcut_params(double* out_threshold, double* out_checks, int max_depths) {
+        constexpr int depths = reversi::AI::kMaxProbCutDepth + 1;
+        reversi::ProbCutCheck checks[depths];
+        reversi::AI::getProbCut(out_threshold, checks);
+        if (out_checks) {
+            for (int d = 0; d < std::min(depths, max_depths); ++d) {
+                out_checks[4 * d] = checks[d].shallow;
+                out_checks[4 * d + 1] = checks[d].a;
+                out_checks[4 * d + 2] = checks[d].b;
+                out_checks[4 * d + 3] = checks[d].sigma;
+            }
+        }
+        return depths;
+    }
+
+    REVERSI_API const char* get_cpu_kernel() {
+        return reversi::kernels::name();
+    }
+
+    REVERSI_API int shared_tt_attach(const char* name, int megabytes) {
+        if (!name) return 0;
+        return reversi::tt::attach(name, megabytes) ? 1 : 0;
+    }
+
+    REVERSI_API void shared_tt_detach() {
+        reversi::tt::detach();
+    }
 
+    REVERSI_API int shared_tt_remove(const char* name) {
+        if (!name) return 0;
+        return reversi::tt::remove(name) ? 1 : 0;
+    }
+
+    REVERSI_API void shared_tt_stats(uint64_t* out_probes, uint64_t* out_hits, uint64_t* out_stores) {
+        reversi::tt::stats(out_probes, out_hits, out_stores);
+    }
+
+    REVERSI_API void set_search_threads(int threads) {
+        ThreadPool::instance().resize(threads);
+    }
+
+    REVERSI_API int get_search_threads() {
+        return ThreadPool::instance().size();
+    }
+
+    REVERSI_API int search_batch(const reversi_handle* games, const int* depths, int count, int flags,
+                                 int* out_moves, int* out_scores) {
+        SearchBatch batch(searchRequests(games, depths, count, flags));
+        batch.wait();
+        for (int i = 0; i < batch.size(); ++i) {
+            if (out_moves) out_moves[i] = batch.move(i);
+            if (out_scores) out_scores[i] = batch.score(i);
+        }
+        return batch.size();
+    }
+
+    REVERSI_API search_batch_handle search_batch_submit(const reversi_handle* games, const int* depths, int count,
+                                                        int flags, search_done_fn on_done, void* user) {
+        return reinterpret_cast<search_batch_handle>(
+            new SearchBatch(searchRequests(games, depths, count, flags), on_done, user));
+    }
+
+    REVERSI_API int search_batch_poll(search_batch_handle b, int* out_indices, int* out_moves, int* out_scores,
+                                      int max_results, int timeout_ms) {
+        auto* batch = reinterpret_cast<SearchBatch*>(b);
+        if (!batch || max_results <= 0) return 0;
+        return batch->poll(out_indices, out_moves, out_scores, max_results, timeout_ms);
+    }
+
+    REVERSI_API int search_batch_pending(search_batch_handle b) {
+        auto* batch = reinterpret_cast<SearchBatch*>(b);
+        return batch ? batch->pending() : 0;
+    }
+
+    REVERSI_API void search_batch_free(search_batch_handle b) {
+        delete reinterpret_cast<SearchBatch*>(b);
+    }
+
+    }
@@ -0,0 +1,78 @@
+import argparse
+import time
+
+from services.core import ReversiCore, native_available
+
+
+# Per-call latency of the cheap ReversiCore methods through ctypes and through the
+# _reversi_native extension, from a mid-game position.
+OPENING = [(2, 3), (2, 2), (2, 1), (4, 2), (5, 3), (3, 2)]
+
+
+def setup(native: bool) -> ReversiCore:
+    core = ReversiCore(native=native)
+    for move in OPENING:
+        core.make_move(*move)
+    return core
+
+
+def calls(core: ReversiCore):
+    move = core.valid_moves()[0]
+
+    def play_and_undo():
+        core.make_move(*move)
+        core.undo_move()
+
+    return {
+        "current_player": core.current_player,
+        "score": core.score,
+        "valid_moves": core.valid_moves,
+        "move_previews": core.move_previews,
+        "bitboards": core.bitboards,
+        "get_board": core.get_board,
+        "make_move+undo": play_and_undo,
+    }
+
+
+def time_call(fn, seconds: float) -> float:
+    """Microseconds per call, best of three runs"""
+    n = 1000
+    while True:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds / 3:
+            break
+        n *= 2
+    best = elapsed
+    for _ in range(2):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ctypes and native ReversiCore call latency")
+    parser.add_argument("--seconds", type=float, default=0.3, help="time budget per method and binding")
+    args = parser.parse_args()
+
+    with setup(native=False) as plain:
+        ctypes_times = {name: time_call(fn, args.seconds) for name, fn in calls(plain).items()}
+    if not native_available():
+        print("_reversi_native is not in use; ctypes only (see README: Python extension)")
+        for name, us in ctypes_times.items():
+            print(f"{name:<16} {us:8.2f} us")
+        return
+    with setup(native=True) as fast:
+        native_times = {name: time_call(fn, args.seconds) for name, fn in calls(fast).items()}
+
+    print(f"{'method':<16} {'ctypes':>9} {'native':>9} {'speedup':>8}")
+    for name, us in ctypes_times.items():
+        print(f"{name:<16} {us:7.2f}us {native_times[name]:7.2f}us {us / native_times[name]:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
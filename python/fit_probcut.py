@@ -0,0 +1,131 @@
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from services.core import ReversiCore
+
+
+# Fits the ProbCut regression deep_score ~ a * shallow_score + b (residual spread sigma) for every
+# search depth from positions of self-play games, writes a file for ReversiCore.load_probcut_params,
+# then benchmarks selective against full-width search with the fitted parameters.
+WIN_SCORE = 9000  # finished-game scores are 10000 + disc difference; they do not follow the regression
+
+
+def shallow_depth(depth: int) -> int:
+    """Roughly half the depth, with the same parity so both searches end on the same side's evaluation"""
+    return depth - 2 * ((depth + 2) // 4)
+
+
+def sample_positions(core: ReversiCore, rng: random.Random, games: int, random_plies: int,
+                     per_game: int) -> List[List[Tuple[int, int]]]:
+    """Move sequences leading to mid-game positions; None in a sequence marks a pass"""
+    positions = []
+    for _ in range(games):
+        core.reset()
+        line = []
+        candidates = []
+        while core.result() == 0:
+            moves = core.valid_moves()
+            if not moves:
+                core.pass_turn()
+                line.append(None)
+                continue
+            if len(line) >= random_plies and core.ply() <= 50:
+                candidates.append(list(line))
+            move = rng.choice(moves) if len(line) < random_plies else core.get_best_move(2)
+            core.make_move(*move)
+            line.append(move)
+        positions.extend(rng.sample(candidates, min(per_game, len(candidates))))
+    return positions
+
+
+def replay(core: ReversiCore, line):
+    core.reset()
+    for move in line:
+        if move is None:
+            core.pass_turn()
+        else:
+            core.make_move(*move)
+
+
+def fit(core: ReversiCore, positions, max_depth: int) -> Dict[int, Tuple[int, float, float, float]]:
+    scores = np.zeros((len(positions), max_depth + 1))
+    for i, line in enumerate(positions):
+        replay(core, line)
+        for depth in range(1, max_depth + 1):
+            scores[i, depth] = core.get_best_move_score(depth)[1]
+        if (i + 1) % 50 == 0:
+            print(f"Searched {i + 1}/{len(positions)} positions", flush=True)
+    params = {}
+    for depth in range(3, max_depth + 1):
+        shallow = shallow_depth(depth)
+        x, y = scores[:, shallow], scores[:, depth]
+        keep = (np.abs(x) < WIN_SCORE) & (np.abs(y) < WIN_SCORE)
+        a, b = np.polyfit(x[keep], y[keep], 1)
+        sigma = float(np.std(y[keep] - (a * x[keep] + b)))
+        params[depth] = (shallow, float(a), float(b), sigma)
+        print(f"depth {depth} from {shallow}: a={a:.3f} b={b:.2f} sigma={sigma:.2f} ({int(keep.sum())} positions)")
+    return params
+
+
+def write_params(path: str, threshold: float, params, positions: int):
+    with open(path, "w") as f:
+        f.write(f"# ProbCut parameters fitted on {positions} self-play positions\n")
+        f.write("# threshold in sigmas, then: depth shallow a b sigma\n")
+        f.write(f"{threshold}\n")
+        for depth, (shallow, a, b, sigma) in sorted(params.items()):
+            f.write(f"{depth} {shallow} {a:.4f} {b:.3f} {sigma:.3f}\n")
+
+
+def benchmark(core: ReversiCore, positions, depths: List[int]):
+    """Per depth: mean full-width and selective time, and how often both pick the same move"""
+    for depth in depths:
+        full_times, cut_times, same = [], [], 0
+        for line in positions:
+            replay(core, line)
+            start = time.perf_counter()
+            full_move, _ = core.get_best_move_score(depth)
+            full_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            cut_move, _ = core.get_best_move_score(depth, selective=True)
+            cut_times.append(time.perf_counter() - start)
+            same += full_move == cut_move
+        full_ms = statistics.mean(full_times) * 1000
+        cut_ms = statistics.mean(cut_times) * 1000
+        print(f"depth {depth}: full {full_ms:8.2f} ms, probcut {cut_ms:8.2f} ms "
+              f"({full_ms / max(cut_ms, 1e-9):.1f}x), same move {same / len(positions) * 100:.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit and benchmark ProbCut parameters")
+    parser.add_argument("out", help="parameter file for ReversiCore.load_probcut_params")
+    parser.add_argument("--games", type=int, default=40)
+    parser.add_argument("--per-game", type=int, default=8, help="positions sampled from each game")
+    parser.add_argument("--random-plies", type=int, default=8)
+    parser.add_argument("--max-depth", type=int, default=8)
+    parser.add_argument("--threshold", type=float, default=1.0, help="cut margin in sigmas")
+    parser.add_argument("--bench-positions", type=int, default=20)
+    parser.add_argument("--bench-depths", default="4,5,6,7")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with ReversiCore() as core:
+        positions = sample_positions(core, rng, args.games, args.random_plies, args.per_game)
+        start = time.time()
+        params = fit(core, positions, args.max_depth)
+        print(f"Fitted on {len(positions)} positions in {time.time() - start:.1f}s")
+        write_params(args.out, args.threshold, params, len(positions))
+        if not core.load_probcut_params(args.out):
+            raise RuntimeError(f"Core rejected {args.out}")
+
+        bench = sample_positions(core, random.Random(args.seed + 1), args.bench_positions, args.random_plies, 1)
+        benchmark(core, bench, [int(d) for d in args.bench_depths.split(",")])
+
+
+if __name__ == "__main__":
+    main()
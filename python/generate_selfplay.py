@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from services.core import ReversiCore, search_batch
+from services.pycore import open_core
+from services.symmetry import symmetries
+
+
+# One training position: both bitboards, side to move (1 black, -1 white),
+# search score for the side to move and final disc difference for black.
+POSITION_DTYPE = np.dtype([
+    ("black", "<u8"),
+    ("white", "<u8"),
+    ("side", "i1"),
+    ("score", "<i4"),
+    ("result", "i1"),
+])
+
+MAX_POSITIONS_PER_GAME = 60
+
+
+def shard_paths(out_dir: str, index: int):
+    base = os.path.join(out_dir, f"shard_{index:05d}")
+    return base + ".npy", base + ".json"
+
+
+def shard_done(out_dir: str, index: int) -> bool:
+    _, meta_path = shard_paths(out_dir, index)
+    if not os.path.isfile(meta_path):
+        return False
+    with open(meta_path) as f:
+        return json.load(f).get("complete", False)
+
+
+def play_game(core: ReversiCore, rng: random.Random, depth: int, random_plies: int, epsilon: float):
+    """Plays one self-play game; returns the positions before each move and the final disc difference"""
+    core.reset()
+    positions = []
+    while core.result() == 0:
+        moves = core.valid_moves()
+        if not moves:
+            core.pass_turn()
+            continue
+        black, white = core.bitboards()
+        side = core.current_player()
+        (r, c), score = core.get_best_move_score(depth)
+        if core.ply() < random_plies or rng.random() < epsilon:
+            r, c = rng.choice(moves)
+        positions.append((black, white, side, score))
+        core.make_move(r, c)
+    b, w = core.score()
+    return positions, b - w
+
+
+def play_games_batched(cores, rng: random.Random, depth: int, random_plies: int, epsilon: float):
+    """Plays one game per core in lockstep, every ply's searches going to the core's thread pool as one batch"""
+    positions = [[] for _ in cores]
+    for core in cores:
+        core.reset()
+    active = list(range(len(cores)))
+    while active:
+        searching = []
+        for i in active:
+            core = cores[i]
+            while core.result() == 0 and not core.valid_moves():
+                core.pass_turn()
+            if core.result() == 0:
+                searching.append(i)
+        active = searching
+        batch = [cores[i] for i in active]
+        for i, ((r, c), score) in zip(active, search_batch(batch, depth)):
+            core = cores[i]
+            black, white = core.bitboards()
+            if core.ply() < random_plies or rng.random() < epsilon:
+                r, c = rng.choice(core.valid_moves())
+            positions[i].append((black, white, core.current_player(), score))
+            core.make_move(r, c)
+    results = []
+    for core, game in zip(cores, positions):
+        b, w = core.score()
+        results.append((game, b - w))
+    return results
+
+
+def attach_shared_table(name: str, megabytes: int):
+    """Pool initializer: every worker process searches through the same shared transposition table"""
+    with open_core() as core:
+        if not core.attach_shared_tt(name, megabytes):
+            print(f"Worker {os.getpid()}: shared table unavailable, searching without it")
+
+
+def write_games(data: np.ndarray, count: int, games, augment: bool) -> int:
+    """Appends each game's positions (and their symmetries) to the shard; returns the new position count"""
+    for positions, result in games:
+        n = len(positions)
+        black = np.fromiter((p[0] for p in positions), dtype=np.uint64, count=n)
+        white = np.fromiter((p[1] for p in positions), dtype=np.uint64, count=n)
+        side = np.fromiter((p[2] for p in positions), dtype=np.int8, count=n)
+        score = np.fromiter((p[3] for p in positions), dtype=np.int32, count=n)
+        images = zip(symmetries(black), symmetries(white)) if augment else [(black, white)]
+        for b_img, w_img in images:
+            block = data[count:count + n]
+            block["black"] = b_img
+            block["white"] = w_img
+            block["side"] = side
+            block["score"] = score
+            block["result"] = result
+            count += n
+    return count
+
+
+def generate_shard(task):
+    """Fills one preallocated memory-mapped shard; a shard is only marked complete once fully written"""
+    out_dir, index, games, depth, random_plies, epsilon, augment, seed, batch_games = task
+    npy_path, meta_path = shard_paths(out_dir, index)
+    factor = 8 if augment else 1
+    capacity = games * MAX_POSITIONS_PER_GAME * factor
+    data = np.lib.format.open_memmap(npy_path, mode="w+", dtype=POSITION_DTYPE, shape=(capacity,))
+
+    rng = random.Random(seed * 1_000_003 + index)
+    count = 0
+    start = time.time()
+    cores = [open_core() for _ in range(max(1, min(batch_games, games)))]
+    try:
+        played = 0
+        while played < games:
+            if batch_games > 1:
+                batch = cores[:min(len(cores), games - played)]
+                finished = play_games_batched(batch, rng, depth, random_plies, epsilon)
+            else:
+                finished = [play_game(cores[0], rng, depth, random_plies, epsilon)]
+            played += len(finished)
+            count = write_games(data, count, finished, augment)
+    finally:
+        for core in cores:
+            core.close()
+    data.flush()
+    del data
+
+    meta = {"positions": count, "games": games, "depth": depth, "augmented": augment,
+            "seconds": round(time.time() - start, 3), "complete": True}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return index, count
+
+
+def load_shard(out_dir: str, index: int) -> np.ndarray:
+    """Maps the written part of a completed shard without reading it into memory"""
+    npy_path, meta_path = shard_paths(out_dir, index)
+    with open(meta_path) as f:
+        count = json.load(f)["positions"]
+    return np.load(npy_path, mmap_mode="r")[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate self-play training positions")
+    parser.add_argument("out_dir")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--games-per-shard", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--random-plies", type=int, default=8, help="random opening moves for variety")
+    parser.add_argument("--epsilon", type=float, default=0.05, help="chance of a random move later on")
+    parser.add_argument("--augment", action="store_true", help="store all 8 board symmetries")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-games", type=int, default=1, metavar="N",
+                        help="play N games at once per worker, searching them on the core's thread pool")
+    parser.add_argument("--shared-tt", type=int, default=0, metavar="MB",
+                        help="share a transposition table of this size between the workers (0: off)")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    # Completed shards are skipped, so an interrupted run resumes where it stopped
+    tasks = [(args.out_dir, i, args.games_per_shard, args.depth, args.random_plies, args.epsilon,
+              args.augment, args.seed, args.batch_games)
+             for i in range(args.shards) if not shard_done(args.out_dir, i)]
+    print(f"{args.shards - len(tasks)} shards already complete, generating {len(tasks)}...")
+
+    start = time.time()
+    total = 0
+    table = f"reversi_selfplay_{os.getpid()}" if args.shared_tt > 0 else None
+    pool_args = (attach_shared_table, (table, args.shared_tt)) if table else (None, ())
+    try:
+        with Pool(args.workers, *pool_args) as pool:
+            for index, count in pool.imap_unordered(generate_shard, tasks):
+                total += count
+                rate = total / max(time.time() - start, 1e-9) * 3600
+                print(f"Shard {index}: {count} positions ({rate:,.0f} positions/hour)")
+    finally:
+        if table:
+            with open_core() as core:
+                core.remove_shared_tt(table)
+    print(f"Wrote {total} positions in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
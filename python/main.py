@@ -1,24 +1,53 @@
-from services.core import ReversiCore
-from ui.game_ui import GameUI
+import time
+
+STARTED_AT = time.perf_counter()
+
+import os
+
+from ui.app import App
 from ui.menu import MenuUI
 
 
+# Tuned evaluation weights written by tune_weights.py, used when present
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_weights.txt")
+# ProbCut parameters written by fit_probcut.py, used instead of the built-in fit when present
+PROBCUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probcut.txt")
+
+
 def main():
+    app = App(STARTED_AT)
+    menu = MenuUI(app)
+    cache = None
     while True:
-        menu = MenuUI()
         start_game, music_enabled, volume, game_mode, difficulty = menu.run()
-        
+
         if not start_game:
             break
-        
-        core = ReversiCore()
-        ui = GameUI(core, music_enabled=music_enabled, volume=volume, game_mode=game_mode, difficulty=difficulty)
-        should_continue = ui.run()
-        
+
+        app.begin_switch("game")
+        # The engine and game screen are only imported once a game is actually started
+        from services.analysis_cache import AnalysisCache, CachedCore
+        from services.pycore import open_core
+        from ui.game_ui import GameUI
+
+        if cache is None:
+            cache = AnalysisCache()
+        with CachedCore(open_core(), cache) as core:
+            if os.path.isfile(WEIGHTS_PATH):
+                core.load_eval_weights(WEIGHTS_PATH)
+            if os.path.isfile(PROBCUT_PATH):
+                core.load_probcut_params(PROBCUT_PATH)
+            ui = GameUI(core, app, music_enabled=music_enabled, volume=volume, game_mode=game_mode, difficulty=difficulty)
+            should_continue = ui.run()
+
         if not should_continue:
             break
+        app.begin_switch("menu")
+
+    if cache is not None:
+        print(cache.report())
+        cache.close()
 
 
 if __name__ == "__main__":
     main()
-
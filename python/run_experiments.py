@@ -1,12 +1,27 @@
+import argparse
+import os
 import time
 import statistics
-from services.core import ReversiCore
+from typing import Dict, List, Optional
+from services.analysis_cache import AnalysisCache, CachedCore
+from services.cluster import ResultStore, game_jobs, play_opening, run_local
+from services.core import BOARD_SIZES
+from services.openings import load_openings
+from services.pycore import open_core
+from services.records import GameRecord, GameRecordWriter
 
-def run_experiment(num_games: int, difficulty_b: int, difficulty_w: int):
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "records", "experiments.rvgr")
+
+def run_experiment(num_games: int, difficulty_b: int, difficulty_w: int, writer: Optional[GameRecordWriter] = None,
+                   cache: Optional[AnalysisCache] = None, openings: Optional[List] = None, size: int = 8):
     """
     Runs num_games between two AIs (or Random if difficulty=0).
     difficulty_b: Black player depth (0 = random/first available - weak)
     difficulty_w: White player depth (0 = random/weak)
+    writer: if given, every finished game is appended to its archive
+    cache: if given, searches of positions seen before are answered from it
+    openings: if given, game i starts from openings[i % len(openings)] instead of the initial position
+    size: board size, one of services.core.BOARD_SIZES; small boards play out far faster
     """
     
     # Note: Our simple AI implementation doesn't have explicit "Random" mode exposed via API directly
@@ -17,54 +32,110 @@ def run_experiment(num_games: int, difficulty_b: int, difficulty_w: int):
     results = {"Black": 0, "White": 0, "Draw": 0}
     times = []
     
-    print(f"Running {num_games} games: Black(Depth {difficulty_b}) vs White(Depth {difficulty_w})...")
+    print(f"Running {num_games} games on {size}x{size}: Black(Depth {difficulty_b}) vs White(Depth {difficulty_w})...")
     
-    for i in range(num_games):
-        core = ReversiCore()
-        # core.reset() is called in constructor typically or just new instance
-        
-        start_time = time.time()
-        while core.result() == 0:
-            current_player = core.current_player() # 1 or -1
-            depth = difficulty_b if current_player == 1 else difficulty_w
+    # One pooled handle for the whole matchup, reset between games
+    core = open_core(size=size)
+    if cache is not None and size == 8:  # the cache keys 8x8 positions by their symmetries
+        core = CachedCore(core, cache)
+    with core:
+        for i in range(num_games):
+            moves = play_opening(core, openings[i % len(openings)] if openings else [])
+            start_time = time.time()
+            while core.result() == 0:
+                current_player = core.current_player() # 1 or -1
+                depth = difficulty_b if current_player == 1 else difficulty_w
             
-            # If depth 0, we could pick random move, but let's just use depth 1 as 'weak'
-            # or actually use get_valid_moves and pick random if we want rigorous exp.
-            # For simplicity, we use API get_best_move with depth.
+                # If depth 0, we could pick random move, but let's just use depth 1 as 'weak'
+                # or actually use get_valid_moves and pick random if we want rigorous exp.
+                # For simplicity, we use API get_best_move with depth.
             
-            r, c = core.get_best_move(max(1, depth))
-            if r != -1:
-                core.make_move(r, c)
-            else:
-                core.pass_turn()
+                r, c = core.get_best_move(max(1, depth))
+                if r != -1:
+                    core.make_move(r, c)
+                    moves.append((r, c))
+                else:
+                    core.pass_turn()
         
-        duration = time.time() - start_time
-        times.append(duration)
+            duration = time.time() - start_time
+            times.append(duration)
         
-        res = core.result()
-        if res == 1: results["Black"] += 1
-        elif res == -1: results["White"] += 1
-        else: results["Draw"] += 1
+            res = core.result()
+            if writer is not None:
+                b, w = core.score()
+                writer.write(GameRecord(moves, f"AI depth {difficulty_b}", f"AI depth {difficulty_w}", res, b, w,
+                                        max(1, difficulty_b), max(1, difficulty_w), core.size))
+            if res == 1: results["Black"] += 1
+            elif res == -1: results["White"] += 1
+            else: results["Draw"] += 1
         
-        if (i + 1) % 5 == 0:
-            print(f"Completed {i + 1}/{num_games} games...")
+            if (i + 1) % 5 == 0:
+                print(f"Completed {i + 1}/{num_games} games...")
             
+    print_results(results, times, num_games)
+    if cache is not None and size == 8:
+        print(cache.report())
+    print("-" * 40)
+
+def print_results(results: Dict[str, int], times: List[float], num_games: int):
     print("\nResults:")
     print(f"Black Wins: {results['Black']} ({results['Black']/num_games*100:.1f}%)")
     print(f"White Wins: {results['White']} ({results['White']/num_games*100:.1f}%)")
     print(f"Draws: {results['Draw']}")
     print(f"Avg Game Time: {statistics.mean(times):.4f}s")
+
+def run_experiment_distributed(num_games: int, difficulty_b: int, difficulty_w: int, workers: int,
+                               openings: Optional[List] = None):
+    """
+    The same matchup with the games spread over worker processes on this host
+    (services/cluster.py; its coordinator also serves workers on other machines).
+    Games are appended to the experiments archive as they finish.
+    """
+    print(f"Running {num_games} games on {workers} workers: Black(Depth {difficulty_b}) vs White(Depth {difficulty_w})...")
+    store = ResultStore(RECORDS_PATH, None)
+    times = []
+
+    def on_result(job: dict, result: dict):
+        store(job, result)
+        times.append(result["seconds"])
+
+    try:
+        jobs = game_jobs(num_games, difficulty_b, difficulty_w, random_plies=0, openings=openings)
+        coordinator = run_local(jobs, workers, on_result)
+    finally:
+        store.close()
+    print_results(store.results, times, num_games)
+    print(coordinator.summary())
     print("-" * 40)
 
 def main():
-    # Experiment 1: Weak vs Weak (Depth 1 vs Depth 1)
-    run_experiment(20, 1, 1)
+    parser = argparse.ArgumentParser(description="Engine-vs-engine experiments")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="play the games on this many worker processes (0: in this process)")
+    parser.add_argument("--openings", help="opening suite (services/openings.py); games cycle through it "
+                                           "instead of all starting from the initial position")
+    parser.add_argument("--size", type=int, default=8, choices=BOARD_SIZES,
+                        help="board size; other than 8 runs in this process, without opening suites")
+    args = parser.parse_args()
+    if args.size != 8 and (args.workers > 0 or args.openings):
+        parser.error("--size other than 8 cannot be combined with --workers or --openings")
+    openings = load_openings(args.openings) if args.openings else None
 
-    # Experiment 2: Weak vs Strong (Depth 1 vs Depth 4)
-    run_experiment(20, 1, 4)
+    experiments = [
+        (20, 1, 1),  # Experiment 1: Weak vs Weak (Depth 1 vs Depth 1)
+        (20, 1, 4),  # Experiment 2: Weak vs Strong (Depth 1 vs Depth 4)
+        (20, 4, 1),  # Experiment 3: Strong vs Weak (Depth 4 vs Depth 1)
+    ]
+    if args.workers > 0:
+        for num_games, depth_b, depth_w in experiments:
+            run_experiment_distributed(num_games, depth_b, depth_w, args.workers, openings)
+        return
 
-    # Experiment 3: Strong vs Weak (Depth 4 vs Depth 1)
-    run_experiment(20, 4, 1)
+    cache = AnalysisCache()
+    with GameRecordWriter(RECORDS_PATH) as writer:
+        for num_games, depth_b, depth_w in experiments:
+            run_experiment(num_games, depth_b, depth_w, writer, cache, openings, args.size)
+    cache.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,210 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.symmetry import canonical, inverse, transform_square
+
+
+# Search results keyed by the canonical image of a position under the 8 board symmetries,
+# plus side to move, search depth, kind of search and evaluation weights (and ProbCut parameters). Moves are stored
+# in the canonical frame and mapped back on lookup. Asymmetric weights score the images of a position
+# differently, so their results are keyed by the position itself. Where several moves share the best score,
+# a hit may return a different (equally scored) one than a fresh search would.
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "analysis.sqlite")
+
+Key = Tuple[int, int, int, int, str, int]
+Entry = List[Tuple[Tuple[int, int], int]]
+
+
+def _signed(x: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return x - (1 << 64) if x >= 1 << 63 else x
+
+
+def _map_moves(moves: Entry, index: int) -> Entry:
+    return [((r, c) if r < 0 else transform_square(r, c, index), score) for (r, c), score in moves]
+
+
+class AnalysisCache:
+    """In-memory LRU of search results in front of an SQLite file shared across sessions and processes"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_PATH, memory_entries: int = 4096, disk_entries: int = 500_000):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory: "OrderedDict[Key, Entry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis ("
+                " black INTEGER, white INTEGER, side INTEGER, depth INTEGER, kind TEXT, engine INTEGER,"
+                " moves TEXT, used REAL,"
+                " UNIQUE (black, white, side, depth, kind, engine))")
+            self.db.execute("CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used)")
+            self.db.commit()
+            self.disk_count = self.db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+    @staticmethod
+    def key(black: int, white: int, side: int, depth: int, kind: str, engine: int,
+            symmetric: bool = True) -> Tuple[Key, int]:
+        """Cache key of a position and the symmetry index taking it to its canonical image"""
+        b, w, index = canonical(black, white) if symmetric else (black, white, 0)
+        return (b, w, side, depth, kind, engine), index
+
+    def get(self, black: int, white: int, side: int, depth: int, kind: str, engine: int = 0,
+            symmetric: bool = True) -> Optional[Entry]:
+        key, index = self.key(black, white, side, depth, kind, engine, symmetric)
+        with self.lock:
+            moves = self.memory.get(key)
+            if moves is not None:
+                self.memory.move_to_end(key)
+                self.hits_memory += 1
+                return _map_moves(moves, inverse(index))
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT rowid, moves FROM analysis WHERE black=? AND white=? AND side=? AND depth=? AND kind=? AND engine=?",
+                    self._params(key)).fetchone()
+                if row is not None:
+                    self.db.execute("UPDATE analysis SET used=? WHERE rowid=?", (time.time(), row[0]))
+                    self.db.commit()
+                    moves = [((r, c), score) for r, c, score in json.loads(row[1])]
+                    self._remember(key, moves)
+                    self.hits_disk += 1
+                    return _map_moves(moves, inverse(index))
+            self.misses += 1
+            return None
+
+    def put(self, black: int, white: int, side: int, depth: int, kind: str, moves: Entry, engine: int = 0,
+            symmetric: bool = True):
+        key, index = self.key(black, white, side, depth, kind, engine, symmetric)
+        moves = _map_moves(moves, index)
+        with self.lock:
+            self._remember(key, moves)
+            if self.db is None:
+                return
+            stored = json.dumps([[r, c, score] for (r, c), score in moves])
+            # Replacing a known key must not count as a new row
+            cursor = self.db.execute(
+                "UPDATE analysis SET moves=?, used=?"
+                " WHERE black=? AND white=? AND side=? AND depth=? AND kind=? AND engine=?",
+                (stored, time.time()) + self._params(key))
+            if cursor.rowcount == 0:
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO analysis (black, white, side, depth, kind, engine, moves, used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._params(key) + (stored, time.time()))
+                self.disk_count += cursor.rowcount
+            if self.disk_count > self.disk_entries:
+                self._evict()
+            self.db.commit()
+
+    def _params(self, key: Key) -> tuple:
+        b, w, side, depth, kind, engine = key
+        return _signed(b), _signed(w), side, depth, kind, _signed(engine)
+
+    def _remember(self, key: Key, moves: Entry):
+        self.memory[key] = moves
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        """Drops the least recently used tenth of the disk store"""
+        drop = max(1, self.disk_entries // 10)
+        self.db.execute("DELETE FROM analysis WHERE rowid IN (SELECT rowid FROM analysis ORDER BY used LIMIT ?)", (drop,))
+        self.disk_count = self.db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.hits_memory,
+            "disk_hits": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_memory + self.hits_disk) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_entries": self.disk_count if self.db is not None else 0,
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        return (f"analysis cache: {s['hit_rate'] * 100:.1f}% hits of {s['lookups']} lookups "
+                f"({s['memory_hits']} memory, {s['disk_hits']} disk), {s['disk_entries']} stored")
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+
+class CachedCore:
+    """A ReversiCore (or PyReversiCore) whose searches are answered from an AnalysisCache when possible"""
+
+    def __init__(self, core, cache: AnalysisCache):
+        self.core = core
+        self.cache = cache
+        self._symmetry: Tuple[Optional[List[int]], bool] = (None, True)
+
+    def __getattr__(self, name):
+        return getattr(self.core, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.core.close()
+
+    def _lookup_key(self, selective: bool = False) -> Tuple[int, int, int, int, bool]:
+        black, white = self.core.bitboards()
+        squares, mobility = self.core.get_eval_weights()
+        if self._symmetry[0] != squares:
+            self._symmetry = squares, all(squares[r * 8 + c] == squares[tr * 8 + tc]
+                                          for r in range(8) for c in range(8)
+                                          for tr, tc in (transform_square(r, c, index) for index in range(8)))
+        symmetric = self._symmetry[1]
+        # Results are only valid for the evaluation weights (and ProbCut parameters) they were searched with
+        params = squares + [mobility]
+        if selective:
+            threshold, checks = self.core.get_probcut_params()
+            params += [threshold] + [v for check in checks for v in check]
+        engine = zlib.crc32(" ".join(map(str, params)).encode())
+        return black, white, self.core.current_player(), engine, symmetric
+
+    def get_best_move(self, depth: int, selective: bool = False) -> Tuple[int, int]:
+        return self.get_best_move_score(depth, selective)[0]
+
+    def get_best_move_score(self, depth: int, selective: bool = False) -> Tuple[Tuple[int, int], int]:
+        black, white, side, engine, symmetric = self._lookup_key(selective)
+        kind = "probcut" if selective else "best"
+        hit = self.cache.get(black, white, side, depth, kind, engine, symmetric)
+        if hit is not None:
+            return hit[0]
+        move, score = self.core.get_best_move_score(depth, selective)
+        self.cache.put(black, white, side, depth, kind, [(move, score)], engine, symmetric)
+        return move, score
+
+    def get_top_moves(self, k: int, depth: int) -> List[Tuple[Tuple[int, int], int]]:
+        if k <= 0:
+            return []
+        black, white, side, engine, symmetric = self._lookup_key()
+        kind = f"top{k}"
+        hit = self.cache.get(black, white, side, depth, kind, engine, symmetric)
+        if hit is not None:
+            return hit
+        top = self.core.get_top_moves(k, depth)
+        self.cache.put(black, white, side, depth, kind, top, engine, symmetric)
+        return top
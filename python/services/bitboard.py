@@ -0,0 +1,179 @@
+from typing import Tuple
+
+import numpy as np
+
+
+# Vectorised 8x8 bitboard rules: bit (row * 8 + col) of a uint64 is one square.
+# Every function takes NumPy uint64 arrays (any shape) and works element-wise.
+FULL = np.uint64(0xFFFFFFFFFFFFFFFF)
+NOT_COL_0 = np.uint64(0xFEFEFEFEFEFEFEFE)
+NOT_COL_7 = np.uint64(0x7F7F7F7F7F7F7F7F)
+
+# (shift, mask applied after shifting) for the 8 directions; positive shifts move towards bit 63
+DIRECTIONS = (
+    (1, NOT_COL_0), (-1, NOT_COL_7),
+    (8, FULL), (-8, FULL),
+    (9, NOT_COL_0), (7, NOT_COL_7),
+    (-7, NOT_COL_0), (-9, NOT_COL_7),
+)
+
+
+def shift(x: np.ndarray, amount: int, mask: np.uint64) -> np.ndarray:
+    if amount > 0:
+        return (x << np.uint64(amount)) & mask
+    return (x >> np.uint64(-amount)) & mask
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x).astype(np.int32)
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.int32)
+
+    def popcount(x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _BYTE_COUNTS[x.view(np.uint8).reshape(x.shape + (8,))].sum(axis=-1)
+
+
+def move_mask(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Legal moves of the side owning own, as a mask per board"""
+    own = np.asarray(own, dtype=np.uint64)
+    opp = np.asarray(opp, dtype=np.uint64)
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for amount, mask in DIRECTIONS:
+        x = shift(own, amount, mask) & opp
+        for _ in range(5):
+            x |= shift(x, amount, mask) & opp
+        moves |= shift(x, amount, mask) & empty
+    return moves
+
+
+def mobility(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    return popcount(move_mask(own, opp))
+
+
+def squares(masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every set bit of a 1-D batch of masks as (board index, square), grouped by board, squares ascending"""
+    masks = np.ascontiguousarray(masks, dtype="<u8")
+    bits = np.unpackbits(masks.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    return np.nonzero(bits)
+
+
+def square_bits(square: np.ndarray) -> np.ndarray:
+    return np.left_shift(np.uint64(1), np.asarray(square, dtype=np.uint64))
+
+
+def flip_mask(own: np.ndarray, opp: np.ndarray, move: np.ndarray) -> np.ndarray:
+    """Discs flipped when the side owning own plays the single-bit mask move (0 if it flips nothing)"""
+    own = np.asarray(own, dtype=np.uint64)
+    opp = np.asarray(opp, dtype=np.uint64)
+    move = np.asarray(move, dtype=np.uint64)
+    flips = np.zeros(np.broadcast(own, opp, move).shape, dtype=np.uint64)
+    for amount, mask in DIRECTIONS:
+        run = np.zeros_like(flips)
+        closed = np.zeros_like(flips)
+        x = shift(move, amount, mask)
+        # Walk over the opponent's discs; the run only counts if one of own discs closes it
+        for _ in range(7):
+            closed |= x & own
+            x = x & opp
+            run |= x
+            x = shift(x, amount, mask)
+        flips |= np.where(closed != 0, run, np.uint64(0))
+    return flips
+
+
+def play(own: np.ndarray, opp: np.ndarray, move: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions after own plays move, returned as (side to move next, the mover): ready for the next ply"""
+    flips = flip_mask(own, opp, move)
+    return opp ^ flips, own | flips | np.asarray(move, dtype=np.uint64)
+
+
+def weight_tables(weights: np.ndarray) -> np.ndarray:
+    """(8, 256) table: entry [k, v] sums the square weights of the bits of byte value v in byte k of a board"""
+    weights = np.asarray(weights, dtype=np.int64).reshape(8, 8)
+    bits = (np.arange(256)[:, None] >> np.arange(8)) & 1
+    return weights @ bits.T
+
+
+def weighted_sum(x: np.ndarray, tables: np.ndarray) -> np.ndarray:
+    x = np.ascontiguousarray(x, dtype="<u8")
+    return tables[np.arange(8), x.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+def evaluate(own: np.ndarray, opp: np.ndarray, tables: np.ndarray, mobility_weight: int) -> np.ndarray:
+    """The core's static evaluation for the side owning own: square weights (as weight_tables) plus mobility difference"""
+    squares_score = weighted_sum(own, tables) - weighted_sum(opp, tables)
+    return squares_score + mobility_weight * (mobility(own, opp) - mobility(opp, own)).astype(np.int64)
+
+
+def final_score(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Score of a finished game for the side owning own, on the core's win/loss scale"""
+    diff = (popcount(own) - popcount(opp)).astype(np.int64)
+    return np.sign(diff) * 10000 + diff
+
+
+ROOT_CHUNK = 1 << 16
+
+
+def negamax(own: np.ndarray, opp: np.ndarray, depth: int, tables: np.ndarray, mobility_weight: int) -> np.ndarray:
+    """Exact minimax value of every position for the side owning own, expanded one ply at a time for the whole batch"""
+    own = np.asarray(own, dtype=np.uint64).ravel()
+    opp = np.asarray(opp, dtype=np.uint64).ravel()
+    if depth <= 0:
+        return evaluate(own, opp, tables, mobility_weight)
+
+    values = np.empty(len(own), dtype=np.int64)
+    moves = move_mask(own, opp)
+    stuck = moves == 0
+    if stuck.any():
+        idx = np.flatnonzero(stuck)
+        over = move_mask(opp[idx], own[idx]) == 0
+        values[idx[over]] = final_score(own[idx[over]], opp[idx[over]])
+        passing = idx[~over]
+        if len(passing):
+            # A pass hands the move over without using up depth
+            values[passing] = -negamax(opp[passing], own[passing], depth, tables, mobility_weight)
+
+    parents = np.flatnonzero(~stuck)
+    if len(parents):
+        board, square = squares(moves[parents])
+        child_own, child_opp = play(own[parents][board], opp[parents][board], square_bits(square))
+        child_values = -negamax(child_own, child_opp, depth - 1, tables, mobility_weight)
+        starts = np.flatnonzero(np.r_[True, board[1:] != board[:-1]])
+        values[parents] = np.maximum.reduceat(child_values, starts)
+    return values
+
+
+def root_values(own: np.ndarray, opp: np.ndarray, depth: int, weights: np.ndarray,
+                mobility_weight: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(board index, square, value) for every legal root move of every position, grouped by board"""
+    own = np.asarray(own, dtype=np.uint64).ravel()
+    opp = np.asarray(opp, dtype=np.uint64).ravel()
+    board, square = squares(move_mask(own, opp))
+    child_own, child_opp = play(own[board], opp[board], square_bits(square))
+    tables = weight_tables(weights)
+    # Children are searched in slices so the frontier of a deep search stays bounded in memory
+    step = max(1, ROOT_CHUNK // 8 ** max(depth - 2, 0))
+    values = np.empty(len(board), dtype=np.int64)
+    for start in range(0, len(board), step):
+        part = slice(start, start + step)
+        values[part] = -negamax(child_own[part], child_opp[part], depth - 1, tables, mobility_weight)
+    return board, square, values
+
+
+def best_moves(own: np.ndarray, opp: np.ndarray, depth: int, weights: np.ndarray,
+               mobility_weight: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best square (-1 without a legal move) and its score per position; ties go to the lowest square like the core"""
+    own = np.asarray(own, dtype=np.uint64).ravel()
+    best = np.full(len(own), -1, dtype=np.int64)
+    scores = np.zeros(len(own), dtype=np.int64)
+    board, square, values = root_values(own, opp, depth, weights, mobility_weight)
+    if len(board):
+        # Sort by board, then score descending, then square ascending; the first entry per board wins
+        order = np.lexsort((square, -values, board))
+        first = order[np.r_[True, board[order][1:] != board[order][:-1]]]
+        best[board[first]] = square[first]
+        scores[board[first]] = values[first]
+    return best, scores
@@ -0,0 +1,443 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from services.core import load_library
+from services.openings import load_openings
+from services.pycore import open_core
+from services.records import GameRecord, GameRecordWriter
+
+
+# Distributed self-play: a coordinator hands out jobs to worker processes over TCP, on this host
+# or others. JSON lines, worker-initiated:
+#   worker -> {"type": "hello", "worker": name}        coordinator -> {"type": "welcome", "heartbeat": s}
+#   worker -> {"type": "ready"}                          coordinator -> "job" | "wait" | "done"
+#   worker -> {"type": "result", "job": id, ...}         coordinator -> the next "job" | "wait" | "done"
+#   worker -> {"type": "heartbeat"}                      (every heartbeat seconds, no reply)
+# A job is leased to one worker; it goes back to the queue when the worker disconnects, falls
+# silent for lease_timeout seconds or exceeds job_timeout, and fails after max_attempts leases.
+# A job that raises on a worker comes back as an error and is retried the same way. With
+# idle_timeout, the remaining jobs fail once no worker has been connected for that long.
+# There is no authentication: expose the coordinator only on trusted networks.
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PORT = 7979
+HEARTBEAT = 2.0
+WAIT_SECONDS = 0.5
+
+
+def play_opening(core, moves: List) -> List:
+    """Resets the game and plays a move list (passes implicit, as in records); returns the moves as tuples"""
+    core.reset()
+    played = []
+    for r, c in moves:
+        if (r, c) not in core.valid_moves():
+            core.pass_turn()
+        if not core.make_move(r, c):
+            raise ValueError(f"Illegal move {(r, c)} after {played}")
+        played.append((r, c))
+    return played
+
+
+def play_game_job(core, job: dict) -> dict:
+    """A full game between two search depths from an optional opening, the next random_plies moves
+    random for variety"""
+    rng = random.Random(job.get("seed", 0))
+    depths = {1: max(1, job["black_depth"]), -1: max(1, job["white_depth"])}
+    opening = play_opening(core, job.get("opening", []))
+    moves = list(opening)
+    while core.result() == 0:
+        legal = core.valid_moves()
+        if not legal:
+            core.pass_turn()
+            continue
+        if len(moves) < len(opening) + job.get("random_plies", 0):
+            move = rng.choice(legal)
+        else:
+            move = core.get_best_move(depths[core.current_player()], job.get("selective", False))
+        core.make_move(*move)
+        moves.append(move)
+    b, w = core.score()
+    return {"moves": moves, "result": core.result(), "black_score": b, "white_score": w}
+
+
+def search_position_job(core, job: dict) -> dict:
+    """Best move and score of the position after a move list (passes implicit, as in records)"""
+    play_opening(core, job["moves"])
+    move, score = core.get_best_move_score(job["depth"], job.get("selective", False))
+    return {"move": move, "score": score}
+
+
+JOB_KINDS: Dict[str, Callable[..., dict]] = {
+    "game": play_game_job,
+    "position": search_position_job,
+}
+
+
+def game_jobs(games: int, black_depth: int, white_depth: int, random_plies: int = 4, seed: int = 1,
+              openings: Optional[List[List]] = None) -> List[dict]:
+    """Game jobs; with an opening suite, game i starts from opening i (cycling through the suite)"""
+    jobs = [{"kind": "game", "black_depth": black_depth, "white_depth": white_depth,
+             "random_plies": random_plies, "seed": seed * 1_000_003 + i} for i in range(games)]
+    if openings:
+        for i, job in enumerate(jobs):
+            job["opening"] = openings[i % len(openings)]
+    return jobs
+
+
+def position_jobs(lines: List[List], depth: int) -> List[dict]:
+    return [{"kind": "position", "moves": moves, "depth": depth} for moves in lines]
+
+
+@dataclass
+class Lease:
+    job: int
+    worker: str
+    deadline: float
+
+
+class Coordinator:
+    """Serves jobs until every one has a result or has failed; results go to on_result as they arrive"""
+
+    def __init__(self, jobs: List[dict], on_result: Callable[[dict, dict], None],
+                 lease_timeout: float = 15.0, job_timeout: float = 600.0, max_attempts: int = 3,
+                 idle_timeout: Optional[float] = None):
+        self.jobs = {i: {**job, "id": i} for i, job in enumerate(jobs)}
+        self.on_result = on_result
+        self.lease_timeout = lease_timeout
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.idle_timeout = idle_timeout
+        self.pending: Deque[int] = deque(self.jobs)
+        self.leases: Dict[int, Lease] = {}
+        self.attempts: Counter = Counter()
+        self.done: Set[int] = set()
+        self.failed: Set[int] = set()
+        self.workers: Dict[str, int] = Counter()  # results per worker
+        self.finished = asyncio.Event()
+        self.connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.started = time.time()
+        self.last_connected = time.monotonic()
+
+    def _check_finished(self):
+        if len(self.done) + len(self.failed) == len(self.jobs):
+            self.finished.set()
+
+    def _requeue(self, job_id: int, reason: str):
+        self.leases.pop(job_id, None)
+        if job_id in self.done:
+            return
+        if self.attempts[job_id] >= self.max_attempts:
+            self.failed.add(job_id)
+            print(f"Job {job_id} failed after {self.attempts[job_id]} attempts ({reason})", file=sys.stderr)
+            self._check_finished()
+        else:
+            self.pending.appendleft(job_id)
+
+    def fail_remaining(self, reason: str):
+        """Fails every job without a result, e.g. once no worker is left to run it"""
+        for job_id in self.jobs:
+            if job_id not in self.done and job_id not in self.failed:
+                self.failed.add(job_id)
+                print(f"Job {job_id} failed ({reason})", file=sys.stderr)
+        self.pending.clear()
+        self.leases.clear()
+        self._check_finished()
+
+    def _assign(self, worker: str) -> dict:
+        while self.pending:
+            job_id = self.pending.popleft()
+            if job_id in self.done:
+                continue
+            self.attempts[job_id] += 1
+            self.leases[job_id] = Lease(job_id, worker, time.monotonic() + self.job_timeout)
+            return {"type": "job", **self.jobs[job_id]}
+        if self.finished.is_set():
+            return {"type": "done"}
+        return {"type": "wait", "seconds": WAIT_SECONDS}
+
+    def _complete(self, worker: str, message: dict):
+        job_id = message.get("job")
+        if job_id not in self.jobs or job_id in self.done or job_id in self.failed:
+            return  # a duplicate from a worker whose lease had already expired
+        self.leases.pop(job_id, None)
+        if "error" in message:
+            print(f"Job {job_id} on {worker}: {message['error']}", file=sys.stderr)
+            self._requeue(job_id, message["error"])
+            return
+        self.done.add(job_id)
+        self.workers[worker] += 1
+        self.on_result(self.jobs[job_id], message["result"])
+        self._check_finished()
+
+    def _release_worker(self, worker: str, reason: str):
+        for job_id in [j for j, lease in self.leases.items() if lease.worker == worker]:
+            self._requeue(job_id, reason)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections[asyncio.current_task()] = writer
+        peer = writer.get_extra_info("peername")
+        worker = f"{peer[0]}:{peer[1]}" if peer else "worker"
+
+        async def send(message: dict):
+            writer.write((json.dumps(message) + "\n").encode())
+            await writer.drain()
+
+        try:
+            while True:
+                # A silent worker is lost: its leases go back to the queue
+                line = await asyncio.wait_for(reader.readline(), self.lease_timeout)
+                if not line:
+                    break
+                message = json.loads(line)
+                kind = message.get("type")
+                if kind == "hello":
+                    worker = f"{message.get('worker', 'worker')}@{worker}"
+                    await send({"type": "welcome", "heartbeat": HEARTBEAT})
+                elif kind == "result":
+                    self._complete(worker, message)
+                    await send(self._assign(worker))
+                elif kind == "ready":
+                    await send(self._assign(worker))
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._release_worker(worker, f"lost {worker}")
+            self.connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _reap(self):
+        while not self.finished.is_set():
+            await asyncio.sleep(1.0)
+            now = time.monotonic()
+            for job_id in [j for j, lease in self.leases.items() if lease.deadline < now]:
+                self._requeue(job_id, "job timeout")
+            if self.connections:
+                self.last_connected = now
+            elif self.idle_timeout is not None and now - self.last_connected > self.idle_timeout:
+                self.fail_remaining(f"no worker connected for {self.idle_timeout:g}s")
+
+    async def serve(self, host: str, port: int, on_listening: Optional[Callable[[int], None]] = None):
+        server = await asyncio.start_server(self._handle, host, port)
+        bound = server.sockets[0].getsockname()[1]
+        print(f"Coordinator on {host}:{bound} with {len(self.jobs)} jobs", file=sys.stderr)
+        if on_listening:
+            on_listening(bound)
+        self._check_finished()
+        reaper = asyncio.create_task(self._reap())
+        async with server:
+            await self.finished.wait()
+            reaper.cancel()
+            # Idle workers pick up "done" on their next poll; whoever is left is disconnected
+            deadline = time.monotonic() + 4 * WAIT_SECONDS
+            while self.connections and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            for writer in list(self.connections.values()):
+                writer.close()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+
+    def summary(self) -> str:
+        elapsed = time.time() - self.started
+        per_worker = ", ".join(f"{name}: {count}" for name, count in sorted(self.workers.items()))
+        return (f"{len(self.done)} jobs done, {len(self.failed)} failed in {elapsed:.1f}s "
+                f"({len(self.done) / max(elapsed, 1e-9):.2f}/s); {per_worker}")
+
+
+class Worker:
+    """Connects to a coordinator and runs its jobs on one engine until told it is done"""
+
+    def __init__(self, host: str, port: int, name: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.name = name or f"{socket.gethostname()}/{os.getpid()}"
+        self.send_lock = threading.Lock()
+
+    def _send(self, sock: socket.socket, message: dict):
+        with self.send_lock:
+            sock.sendall((json.dumps(message) + "\n").encode())
+
+    def _heartbeat(self, sock: socket.socket, interval: float, stop: threading.Event):
+        while not stop.wait(interval):
+            try:
+                self._send(sock, {"type": "heartbeat"})
+            except OSError:
+                return
+
+    def run(self) -> int:
+        """Returns the number of jobs completed"""
+        completed = 0
+        stop = threading.Event()
+        with socket.create_connection((self.host, self.port)) as sock, sock.makefile("r") as lines, \
+                open_core() as core:
+            self._send(sock, {"type": "hello", "worker": self.name})
+            welcome = json.loads(lines.readline())
+            threading.Thread(target=self._heartbeat, args=(sock, welcome["heartbeat"], stop), daemon=True).start()
+            try:
+                self._send(sock, {"type": "ready"})
+                while True:
+                    line = lines.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    if message["type"] == "done":
+                        break
+                    if message["type"] == "wait":
+                        time.sleep(message["seconds"])
+                        self._send(sock, {"type": "ready"})
+                        continue
+                    start = time.perf_counter()
+                    try:
+                        result = JOB_KINDS[message["kind"]](core, message)
+                        result["seconds"] = round(time.perf_counter() - start, 3)
+                        reply = {"type": "result", "job": message["id"], "result": result}
+                    except Exception as e:
+                        # A bad job must not take the worker down; the coordinator retries or fails it
+                        reply = {"type": "result", "job": message["id"], "error": f"{type(e).__name__}: {e}"}
+                    self._send(sock, reply)
+                    completed += 1
+            except (OSError, ValueError):
+                pass  # the coordinator went away; its leases are handed to other workers
+            finally:
+                stop.set()
+        return completed
+
+
+def spawn_worker(host: str, port: int, name: str, extra_args: List[str] = ()) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", "services.cluster", "worker", "--host", host,
+                             "--port", str(port), "--name", name, *extra_args], cwd=PYTHON_DIR)
+
+
+def run_local(jobs: List[dict], workers: int, on_result: Callable[[dict, dict], None],
+              worker_args: List[str] = ()) -> Coordinator:
+    """Runs the jobs on worker processes spawned on this host; returns the finished coordinator"""
+    procs: List[subprocess.Popen] = []
+
+    async def main():
+        coordinator = Coordinator(jobs, on_result)
+
+        def start_workers(port: int):
+            for i in range(workers):
+                procs.append(spawn_worker("127.0.0.1", port, f"local{i}", worker_args))
+
+        async def watch_workers():
+            # Without this, jobs left when every worker process has exited would wait forever
+            while not coordinator.finished.is_set():
+                await asyncio.sleep(1.0)
+                if procs and all(proc.poll() is not None for proc in procs) and not coordinator.connections:
+                    coordinator.fail_remaining("every worker process exited")
+
+        watcher = asyncio.create_task(watch_workers())
+        await coordinator.serve("127.0.0.1", 0, start_workers)
+        watcher.cancel()
+        return coordinator
+
+    try:
+        return asyncio.run(main())
+    finally:
+        for proc in procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+class ResultStore:
+    """Appends game results to a record archive and position results to a JSON lines file"""
+
+    def __init__(self, archive: Optional[str], positions_out: Optional[str]):
+        self.games = GameRecordWriter(archive) if archive else None
+        self.positions = open(positions_out, "a") if positions_out else None
+        self.results = {"Black": 0, "White": 0, "Draw": 0}
+
+    def __call__(self, job: dict, result: dict):
+        if job["kind"] == "game":
+            self.results["Black" if result["result"] == 1 else "White" if result["result"] == -1 else "Draw"] += 1
+            if self.games is not None:
+                self.games.write(GameRecord([tuple(m) for m in result["moves"]], f"AI depth {job['black_depth']}",
+                                            f"AI depth {job['white_depth']}", result["result"],
+                                            result["black_score"], result["white_score"],
+                                            job["black_depth"], job["white_depth"]))
+        elif self.positions is not None:
+            self.positions.write(json.dumps({"moves": job["moves"], "depth": job["depth"], **result}) + "\n")
+            self.positions.flush()
+
+    def close(self):
+        if self.games is not None:
+            self.games.close()
+        if self.positions is not None:
+            self.positions.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed self-play: a coordinator and its workers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="run jobs from a coordinator")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=DEFAULT_PORT)
+    worker.add_argument("--name")
+    worker.add_argument("--library", help="core library to load instead of the default search path")
+    worker.add_argument("--weights", help="evaluation weights file")
+    for name in ("coordinator", "local"):
+        p = sub.add_parser(name, help="serve jobs to remote workers" if name == "coordinator"
+                           else "serve jobs to worker processes started on this host")
+        if name == "coordinator":
+            p.add_argument("--host", default="0.0.0.0")
+            p.add_argument("--port", type=int, default=DEFAULT_PORT)
+            p.add_argument("--idle-timeout", type=float,
+                           help="fail the remaining jobs after this many seconds without a connected worker")
+        else:
+            p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        p.add_argument("--games", type=int, default=100)
+        p.add_argument("--black-depth", type=int, default=3)
+        p.add_argument("--white-depth", type=int, default=3)
+        p.add_argument("--random-plies", type=int, default=4)
+        p.add_argument("--openings", help="opening suite (services/openings.py) the games start from")
+        p.add_argument("--seed", type=int, default=1)
+        p.add_argument("--positions", help="search these positions (one transcript per line) instead of playing games")
+        p.add_argument("--depth", type=int, default=6, help="search depth for --positions")
+        p.add_argument("--archive", default=os.path.join(PYTHON_DIR, "records", "cluster.rvgr"))
+        p.add_argument("--out", default="positions.jsonl", help="results of --positions, as JSON lines")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        if args.library:
+            load_library(args.library)
+        if args.weights:
+            with open_core() as core:
+                if not core.load_eval_weights(args.weights):
+                    parser.error(f"Could not load weights from {args.weights}")
+        print(f"Worker {args.name or ''} finished {Worker(args.host, args.port, args.name).run()} jobs",
+              file=sys.stderr)
+        return
+
+    if args.positions:
+        jobs = position_jobs(load_openings(args.positions), args.depth)
+        store = ResultStore(None, args.out)
+    else:
+        openings = load_openings(args.openings) if args.openings else None
+        jobs = game_jobs(args.games, args.black_depth, args.white_depth, args.random_plies, args.seed, openings)
+        store = ResultStore(args.archive, None)
+    try:
+        if args.command == "local":
+            coordinator = run_local(jobs, args.workers, store)
+        else:
+            coordinator = Coordinator(jobs, store, idle_timeout=args.idle_timeout)
+            asyncio.run(coordinator.serve(args.host, args.port))
+    finally:
+        store.close()
+    print(coordinator.summary())
+    if not args.positions:
+        print(f"Black {store.results['Black']}, White {store.results['White']}, Draws {store.results['Draw']}")
+
+
+if __name__ == "__main__":
+    main()
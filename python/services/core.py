@@ -1,22 +1,160 @@
 import ctypes
 import os
 import sys
-from ctypes import c_int, c_int8, c_void_p, POINTER
-from typing import Tuple
+import threading
+from ctypes import c_int, c_int8, c_uint64, c_void_p, POINTER
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 
-class ReversiCore:
-    def __init__(self, dll_path: str = None):
-        dll_candidates = []
-        if dll_path:
-            dll_candidates.append(dll_path)
-        dll_dir = os.path.dirname(os.path.abspath(__file__))
-        python_dir = os.path.dirname(dll_dir)
-        dll_candidates.append(os.path.join(python_dir, "reversi_core.dll"))
-        project_root = os.path.abspath(os.path.join(python_dir, os.pardir))
-        dll_candidates.append(os.path.join(project_root, "build", "Release", "reversi_core.dll"))
-        dll_candidates.append(os.path.join(project_root, "build", "reversi_core.dll"))
+try:
+    import _reversi_native
+except ImportError:
+    _reversi_native = None
+
+_lib = None
+_lib_path: Optional[str] = None
+_lib_lock = threading.Lock()
+_native_bound = False
+
+# search_flags_t
+SEARCH_FULL_WIDTH = 0
+SEARCH_PROBCUT = 1
+
+# Board sizes compiled into the core; 8 is the default and the only one with tunable weights and ProbCut
+BOARD_SIZES = (4, 6, 8, 10)
+
+# Methods answered by the _reversi_native extension when it is built; ctypes otherwise
+NATIVE_METHODS = (
+    "get_board", "get_cell", "current_player", "valid_moves", "move_previews", "make_move", "pass_turn",
+    "score", "result", "reset", "get_best_move", "get_best_move_score", "get_top_moves", "bitboards",
+    "undo_move", "redo_move", "goto_ply", "ply", "history", "position_hash",
+)
+NATIVE_ENTRY_POINTS = (
+    "get_game_size", "get_cell", "get_board", "get_bitboards", "current_player", "get_valid_moves",
+    "get_move_previews", "make_move", "pass_turn", "get_score", "get_result", "reset_game", "get_top_moves",
+    "search_best_move", "undo_move", "redo_move", "goto_ply", "get_ply", "get_history", "get_position_hash",
+)
+
+# search_done_fn
+SEARCH_DONE_FN = ctypes.CFUNCTYPE(None, c_void_p, c_int, c_int, c_int)
+
+
+def _library_name() -> str:
+    if os.name == "nt":
+        return "reversi_core.dll"
+    return "libreversi_core.dylib" if sys.platform == "darwin" else "libreversi_core.so"
+
+
+def _library_candidates(dll_path: Optional[str]) -> List[str]:
+    # An explicit path is the only candidate: falling back would quietly run another build
+    if dll_path:
+        return [os.path.abspath(dll_path)]
+    dll_candidates = []
+    name = _library_name()
+    dll_dir = os.path.dirname(os.path.abspath(__file__))
+    python_dir = os.path.dirname(dll_dir)
+    dll_candidates.append(os.path.join(python_dir, name))
+    project_root = os.path.abspath(os.path.join(python_dir, os.pardir))
+    dll_candidates.append(os.path.join(project_root, "build", "pgo", name))
+    dll_candidates.append(os.path.join(project_root, "build", "pgo", "Release", name))
+    dll_candidates.append(os.path.join(project_root, "build", "Release", name))
+    dll_candidates.append(os.path.join(project_root, "build", name))
+    return dll_candidates
 
+
+def _declare(lib):
+    lib.create_game.restype = c_void_p
+    lib.create_game_sized.argtypes = [c_int]
+    lib.create_game_sized.restype = c_void_p
+    lib.destroy_game.argtypes = [c_void_p]
+    lib.get_board_size.restype = c_int
+    lib.get_game_size.argtypes = [c_void_p]
+    lib.get_game_size.restype = c_int
+    lib.get_cell.argtypes = [c_void_p, c_int, c_int]
+    lib.get_cell.restype = c_int
+    lib.get_board.argtypes = [c_void_p, POINTER(c_int8)]
+    lib.current_player.argtypes = [c_void_p]
+    lib.current_player.restype = c_int
+    lib.get_valid_moves.argtypes = [c_void_p, POINTER(c_int), c_int]
+    lib.get_valid_moves.restype = c_int
+    lib.get_move_previews.argtypes = [c_void_p, POINTER(c_int), POINTER(c_uint64), POINTER(c_int), c_int]
+    lib.get_move_previews.restype = c_int
+    lib.get_move_previews_wide.argtypes = [c_void_p, POINTER(c_int), POINTER(c_uint64), POINTER(c_int), c_int]
+    lib.get_move_previews_wide.restype = c_int
+    lib.make_move.argtypes = [c_void_p, c_int, c_int]
+    lib.make_move.restype = c_int
+    lib.pass_turn.argtypes = [c_void_p]
+    lib.get_score.argtypes = [c_void_p, POINTER(c_int), POINTER(c_int)]
+    lib.get_result.argtypes = [c_void_p]
+    lib.get_result.restype = c_int
+    lib.reset_game.argtypes = [c_void_p]
+
+    lib.get_best_move.argtypes = [c_void_p, c_int]
+    lib.get_best_move.restype = c_int
+    lib.get_top_moves.argtypes = [c_void_p, c_int, c_int, POINTER(c_int), POINTER(c_int)]
+    lib.get_top_moves.restype = c_int
+    lib.get_best_move_score.argtypes = [c_void_p, c_int, POINTER(c_int)]
+    lib.get_best_move_score.restype = c_int
+    lib.search_best_move.argtypes = [c_void_p, c_int, c_int, POINTER(c_int)]
+    lib.search_best_move.restype = c_int
+    lib.get_bitboards.argtypes = [c_void_p, POINTER(c_uint64), POINTER(c_uint64)]
+    lib.get_bitboards_wide.argtypes = [c_void_p, POINTER(c_uint64), POINTER(c_uint64)]
+
+    lib.set_eval_weights.argtypes = [POINTER(c_int), c_int]
+    lib.get_eval_weights.argtypes = [POINTER(c_int), POINTER(c_int)]
+    lib.load_eval_weights.argtypes = [ctypes.c_char_p]
+    lib.load_eval_weights.restype = c_int
+    lib.load_probcut_params.argtypes = [ctypes.c_char_p]
+    lib.load_probcut_params.restype = c_int
+    lib.get_probcut_params.argtypes = [POINTER(ctypes.c_double), POINTER(ctypes.c_double), c_int]
+    lib.get_probcut_params.restype = c_int
+    lib.get_cpu_kernel.restype = ctypes.c_char_p
+    lib.shared_tt_attach.argtypes = [ctypes.c_char_p, c_int]
+    lib.shared_tt_attach.restype = c_int
+    lib.shared_tt_remove.argtypes = [ctypes.c_char_p]
+    lib.shared_tt_remove.restype = c_int
+    lib.shared_tt_stats.argtypes = [POINTER(c_uint64), POINTER(c_uint64), POINTER(c_uint64)]
+    lib.set_search_threads.argtypes = [c_int]
+    lib.get_search_threads.restype = c_int
+    lib.search_batch.argtypes = [POINTER(c_void_p), POINTER(c_int), c_int, c_int, POINTER(c_int), POINTER(c_int)]
+    lib.search_batch.restype = c_int
+    lib.search_batch_submit.argtypes = [POINTER(c_void_p), POINTER(c_int), c_int, c_int, SEARCH_DONE_FN, c_void_p]
+    lib.search_batch_submit.restype = c_void_p
+    lib.search_batch_poll.argtypes = [c_void_p, POINTER(c_int), POINTER(c_int), POINTER(c_int), c_int, c_int]
+    lib.search_batch_poll.restype = c_int
+    lib.search_batch_pending.argtypes = [c_void_p]
+    lib.search_batch_pending.restype = c_int
+    lib.search_batch_free.argtypes = [c_void_p]
+
+    lib.undo_move.argtypes = [c_void_p]
+    lib.undo_move.restype = c_int
+    lib.redo_move.argtypes = [c_void_p]
+    lib.redo_move.restype = c_int
+    lib.goto_ply.argtypes = [c_void_p, c_int]
+    lib.goto_ply.restype = c_int
+    lib.get_ply.argtypes = [c_void_p]
+    lib.get_ply.restype = c_int
+    lib.get_history.argtypes = [c_void_p, POINTER(c_int), c_int]
+    lib.get_history.restype = c_int
+    lib.get_position_hash.argtypes = [c_void_p]
+    lib.get_position_hash.restype = c_uint64
+    lib.clone_game.argtypes = [c_void_p]
+    lib.clone_game.restype = c_void_p
+    lib.copy_game.argtypes = [c_void_p, c_void_p]
+    lib.copy_game.restype = c_int
+
+
+def load_library(dll_path: Optional[str] = None):
+    """Loads and configures the core library once per process; later calls return the same library,
+    and asking for a different dll_path once it is loaded raises RuntimeError"""
+    global _lib, _lib_path
+    with _lib_lock:
+        if _lib is not None:
+            if dll_path and os.path.realpath(dll_path) != _lib_path:
+                raise RuntimeError(f"Cannot load {dll_path}: {_lib_path} is already loaded in this process")
+            return _lib
+
+        dll_candidates = _library_candidates(dll_path)
         load_error = None
         lib = None
         for cand in dll_candidates:
@@ -29,7 +167,7 @@ class ReversiCore:
                 except Exception:
                     pass
                 lib = ctypes.WinDLL(cand) if os.name == "nt" else ctypes.CDLL(cand)
-                dll_path = cand
+                _lib_path = os.path.realpath(cand)
                 break
             except OSError as e:
                 load_error = e
@@ -39,53 +177,131 @@ class ReversiCore:
             details = [f"tried: {p}" for p in dll_candidates]
             arch = 64 if sys.maxsize > 2**32 else 32
             raise RuntimeError(
-                "Failed to load reversi_core DLL. "
+                "Failed to load the reversi_core library. "
                 + (f"Last error: {load_error}\n" if load_error else "")
                 + "\n".join(details)
                 + f"\nPython arch: {arch}-bit"
             )
 
+        _declare(lib)
+        _bind_native(lib)
+        _lib = lib
+        return _lib
+
+
+def _bind_native(lib):
+    """Points the extension at this library's entry points, so both share one engine state"""
+    global _native_bound
+    if _reversi_native is None or os.environ.get("REVERSI_NATIVE") == "0":
+        return
+    table = {name: ctypes.cast(getattr(lib, name), c_void_p).value for name in NATIVE_ENTRY_POINTS}
+    try:
+        _reversi_native.bind(table)
+    except (KeyError, ValueError) as e:
+        print(f"_reversi_native unavailable, using ctypes: {e}", file=sys.stderr)
+        return
+    _native_bound = True
+
+
+def native_available() -> bool:
+    """True when ReversiCore methods go through the compiled extension rather than ctypes"""
+    load_library()
+    return _native_bound
+
+
+class HandlePool:
+    """Process-wide free lists of game handles, one per board size; released handles are reset and reused"""
+
+    def __init__(self, lib, max_free: int = 64):
         self.lib = lib
+        self.max_free = max_free
+        self.free: Dict[int, List[int]] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, size: int = 8) -> int:
+        with self.lock:
+            free = self.free.get(size)
+            if free:
+                return free.pop()
+        handle = self.lib.create_game_sized(size)
+        if not handle:
+            raise RuntimeError(f"Failed to create a {size}x{size} game handle")
+        return handle
+
+    def release(self, handle: int):
+        self.lib.reset_game(handle)
+        size = self.lib.get_game_size(handle)
+        with self.lock:
+            free = self.free.setdefault(size, [])
+            if len(free) < self.max_free:
+                free.append(handle)
+                return
+        self.lib.destroy_game(handle)
+
+
+_pool: Optional[HandlePool] = None
+
+
+def handle_pool(dll_path: Optional[str] = None) -> HandlePool:
+    global _pool
+    lib = load_library(dll_path)
+    with _lib_lock:
+        if _pool is None:
+            _pool = HandlePool(lib)
+        return _pool
 
-        self.lib.create_game.restype = c_void_p
-        self.lib.destroy_game.argtypes = [c_void_p]
-        self.lib.get_board_size.restype = c_int
-        self.lib.get_cell.argtypes = [c_void_p, c_int, c_int]
-        self.lib.get_cell.restype = c_int
-        self.lib.get_board.argtypes = [c_void_p, POINTER(c_int8)]
-        self.lib.current_player.argtypes = [c_void_p]
-        self.lib.current_player.restype = c_int
-        self.lib.get_valid_moves.argtypes = [c_void_p, POINTER(c_int), c_int]
-        self.lib.get_valid_moves.restype = c_int
-        self.lib.make_move.argtypes = [c_void_p, c_int, c_int]
-        self.lib.make_move.restype = c_int
-        self.lib.pass_turn.argtypes = [c_void_p]
-        self.lib.get_score.argtypes = [c_void_p, POINTER(c_int), POINTER(c_int)]
-        self.lib.get_result.argtypes = [c_void_p]
-        self.lib.get_result.restype = c_int
-        self.lib.reset_game.argtypes = [c_void_p]
-
-        self.lib.get_best_move.argtypes = [c_void_p, c_int]
-        self.lib.get_best_move.restype = c_int
-
-        self.handle = self.lib.create_game()
-        if not self.handle:
-            raise RuntimeError("Failed to create game handle")
-
-        self.size = self.lib.get_board_size()
-
-    def __del__(self):
-        try:
-            if getattr(self, "handle", None):
-                self.lib.destroy_game(self.handle)
-                self.handle = None
-        except Exception:
-            pass
+
+class ReversiCore:
+    """One game on a pooled core handle; use as a context manager or call close() to return the handle.
+    size picks the board (BOARD_SIZES); masks are Python ints with bit row * size + col at every size.
+    With the _reversi_native extension built, the per-move methods call the core directly instead of via ctypes
+    (boards up to 8x8; 10x10 masks need two words and stay on ctypes)."""
+
+    def __init__(self, dll_path: str = None, native: bool = True, size: int = 8):
+        if size not in BOARD_SIZES:
+            raise ValueError(f"Board size must be one of {BOARD_SIZES}, got {size}")
+        self.lib = load_library(dll_path)
+        self.pool = handle_pool()
+        self.handle = self.pool.acquire(size)
+        self.size = size
+        self.wide = size * size > 64
+        # Reused by the ctypes methods instead of allocating per call
+        self._cells = (c_int8 * (size * size))()
+        self._moves = (c_int * (size * size))()
+        self._pair = (c_int(), c_int())
+        self._bits = ((c_uint64 * 2)(), (c_uint64 * 2)())
+        self.native = None
+        if native and _native_bound and not self.wide:
+            self.native = _reversi_native.Game(self.handle)
+            for name in NATIVE_METHODS:
+                setattr(self, name, getattr(self.native, name))
+
+    def close(self):
+        if self.native is not None:
+            self.native.detach()
+        if self.handle:
+            self.pool.release(self.handle)
+            self.handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def clone(self) -> "ReversiCore":
+        """A new game with the same position and history, on its own handle"""
+        other = ReversiCore(native=self.native is not None, size=self.size)
+        other.copy_from(self)
+        return other
+
+    def copy_from(self, other: "ReversiCore"):
+        if other.size != self.size or not self.lib.copy_game(self.handle, other.handle):
+            raise ValueError(f"Cannot copy a {other.size}x{other.size} game into a {self.size}x{self.size} one")
 
     def get_board(self):
-        buf = (c_int8 * (self.size * self.size))()
-        self.lib.get_board(self.handle, buf)
-        return [int(buf[i]) for i in range(self.size * self.size)]
+        self.lib.get_board(self.handle, self._cells)
+        return list(self._cells)
 
     def get_cell(self, r: int, c: int) -> int:
         return int(self.lib.get_cell(self.handle, r, c))
@@ -94,13 +310,27 @@ class ReversiCore:
         return int(self.lib.current_player(self.handle))
 
     def valid_moves(self):
-        temp = (c_int * 60)()
-        count = self.lib.get_valid_moves(self.handle, temp, 60)
-        moves = []
+        count = self.lib.get_valid_moves(self.handle, self._moves, len(self._moves))
+        return [divmod(v, self.size) for v in self._moves[:count]]
+
+    def move_previews(self) -> List[Tuple[Tuple[int, int], int, int]]:
+        """Returns ((row, col), flip_mask, flip_count) for every valid move in one call"""
+        n = len(self._moves)
+        moves = (c_int * n)()
+        counts = (c_int * n)()
+        if self.wide:
+            words = (c_uint64 * (2 * n))()
+            count = self.lib.get_move_previews_wide(self.handle, moves, words, counts, n)
+            masks = [int(words[2 * i]) | int(words[2 * i + 1]) << 64 for i in range(count)]
+        else:
+            words = (c_uint64 * n)()
+            count = self.lib.get_move_previews(self.handle, moves, words, counts, n)
+            masks = [int(words[i]) for i in range(count)]
+        previews = []
         for i in range(count):
-            v = int(temp[i])
-            moves.append((v // self.size, v % self.size))
-        return moves
+            v = int(moves[i])
+            previews.append(((v // self.size, v % self.size), masks[i], int(counts[i])))
+        return previews
 
     def make_move(self, r: int, c: int) -> bool:
         return bool(self.lib.make_move(self.handle, r, c))
@@ -109,8 +339,7 @@ class ReversiCore:
         self.lib.pass_turn(self.handle)
 
     def score(self):
-        b = c_int()
-        w = c_int()
+        b, w = self._pair
         self.lib.get_score(self.handle, ctypes.byref(b), ctypes.byref(w))
         return int(b.value), int(w.value)
 
@@ -120,10 +349,202 @@ class ReversiCore:
     def reset(self):
         self.lib.reset_game(self.handle)
 
-    def get_best_move(self, depth: int) -> Tuple[int, int]:
+    def get_best_move(self, depth: int, selective: bool = False) -> Tuple[int, int]:
+        if selective:
+            return self.get_best_move_score(depth, selective)[0]
         val = int(self.lib.get_best_move(self.handle, depth))
         if val < 0:
             return (-1, -1)
         return (val // self.size, val % self.size)
 
+    def get_best_move_score(self, depth: int, selective: bool = False) -> Tuple[Tuple[int, int], int]:
+        """Best move and its search score from the side to move's point of view; selective enables ProbCut"""
+        score = c_int()
+        flags = SEARCH_PROBCUT if selective else SEARCH_FULL_WIDTH
+        val = int(self.lib.search_best_move(self.handle, depth, flags, ctypes.byref(score)))
+        if val < 0:
+            return (-1, -1), int(score.value)
+        return (val // self.size, val % self.size), int(score.value)
+
+    def get_top_moves(self, k: int, depth: int) -> List[Tuple[Tuple[int, int], int]]:
+        """The k best moves with their search scores, best first, from one shared search"""
+        if k <= 0:
+            return []
+        moves = (c_int * k)()
+        scores = (c_int * k)()
+        count = self.lib.get_top_moves(self.handle, k, depth, moves, scores)
+        return [((int(moves[i]) // self.size, int(moves[i]) % self.size), int(scores[i])) for i in range(count)]
+
+    def bitboards(self) -> Tuple[int, int]:
+        """Black and white discs as masks, bit row * size + col (64-bit up to 8x8)"""
+        b, w = self._bits
+        self.lib.get_bitboards_wide(self.handle, b, w)
+        return int(b[0]) | int(b[1]) << 64, int(w[0]) | int(w[1]) << 64
+
+    def set_eval_weights(self, squares: List[int], mobility: int):
+        """Replaces the 8x8 engine's square weights (row-major, 64 values) and mobility factor"""
+        if len(squares) != 64:
+            raise ValueError(f"Expected 64 square weights, got {len(squares)}")
+        self.lib.set_eval_weights((c_int * len(squares))(*squares), mobility)
+
+    def get_eval_weights(self) -> Tuple[List[int], int]:
+        squares = (c_int * 64)()
+        mobility = c_int()
+        self.lib.get_eval_weights(squares, ctypes.byref(mobility))
+        return [int(v) for v in squares], int(mobility.value)
+
+    def load_eval_weights(self, path: str) -> bool:
+        return bool(self.lib.load_eval_weights(os.fsencode(path)))
+
+    def load_probcut_params(self, path: str) -> bool:
+        return bool(self.lib.load_probcut_params(os.fsencode(path)))
+
+    def get_probcut_params(self) -> Tuple[float, List[Tuple[int, float, float, float]]]:
+        """Cut threshold and (shallow, a, b, sigma) per depth from 0; shallow 0 disables a depth"""
+        threshold = ctypes.c_double()
+        depths = self.lib.get_probcut_params(ctypes.byref(threshold), None, 0)
+        values = (ctypes.c_double * (4 * depths))()
+        self.lib.get_probcut_params(None, values, depths)
+        checks = [(int(values[i]), values[i + 1], values[i + 2], values[i + 3]) for i in range(0, 4 * depths, 4)]
+        return threshold.value, checks
+
+    def cpu_kernel(self) -> str:
+        """Bitboard kernel the library picked for this CPU (avx2, popcnt or generic)"""
+        return self.lib.get_cpu_kernel().decode()
+
+    def attach_shared_tt(self, name: str, megabytes: int = 64) -> bool:
+        """Searches of this process go through the shared-memory table `name`, created on first attach.
+        Process-wide, like the weights; attach before starting searches."""
+        return bool(self.lib.shared_tt_attach(name.encode(), megabytes))
+
+    def detach_shared_tt(self):
+        self.lib.shared_tt_detach()
+
+    def remove_shared_tt(self, name: str) -> bool:
+        """Deletes the segment's name once every worker is done; mappings already attached stay valid"""
+        return bool(self.lib.shared_tt_remove(name.encode()))
+
+    def shared_tt_stats(self) -> Dict[str, int]:
+        probes, hits, stores = c_uint64(), c_uint64(), c_uint64()
+        self.lib.shared_tt_stats(ctypes.byref(probes), ctypes.byref(hits), ctypes.byref(stores))
+        return {"probes": int(probes.value), "hits": int(hits.value), "stores": int(stores.value)}
+
+    def set_search_threads(self, threads: int):
+        """Sizes the core's thread pool for batched searches; 0 uses every hardware thread (the default)"""
+        self.lib.set_search_threads(threads)
+
+    def search_threads(self) -> int:
+        """Threads in the batch search pool; 0 until the first batch starts it"""
+        return int(self.lib.get_search_threads())
+
+    def undo_move(self) -> bool:
+        return bool(self.lib.undo_move(self.handle))
+
+    def redo_move(self) -> bool:
+        return bool(self.lib.redo_move(self.handle))
+
+    def goto_ply(self, ply: int) -> bool:
+        return bool(self.lib.goto_ply(self.handle, ply))
+
+    def ply(self) -> int:
+        return int(self.lib.get_ply(self.handle))
+
+    def history(self) -> List[Optional[Tuple[int, int]]]:
+        """Every recorded step including the redo tail; None marks a pass"""
+        n = 2 * self.size * self.size
+        temp = (c_int * n)()
+        count = min(self.lib.get_history(self.handle, temp, n), n)
+        steps = []
+        for i in range(count):
+            v = int(temp[i])
+            steps.append(None if v < 0 else (v // self.size, v % self.size))
+        return steps
+
+    def position_hash(self) -> int:
+        return int(self.lib.get_position_hash(self.handle))
+
+
+def _batch_arrays(cores: Sequence[ReversiCore], depths: Union[int, Sequence[int]]):
+    n = len(cores)
+    if isinstance(depths, int):
+        depths = [depths] * n
+    if len(depths) != n:
+        raise ValueError(f"Expected {n} depths, got {len(depths)}")
+    handles = [core.handle for core in cores]
+    if len(set(handles)) != n:
+        raise ValueError("Each game can only be searched once per batch")
+    return (c_void_p * n)(*handles), (c_int * n)(*depths)
+
+
+def search_batch(cores: Sequence, depths: Union[int, Sequence[int]],
+                 selective: bool = False) -> List[Tuple[Tuple[int, int], int]]:
+    """Best move and score for every game, searched on the core's thread pool in one call.
+    depths is one depth for all games or one per game; cores without a native handle are searched in turn."""
+    if not all(isinstance(core, ReversiCore) for core in cores):
+        if isinstance(depths, int):
+            depths = [depths] * len(cores)
+        return [core.get_best_move_score(depth, selective) for core, depth in zip(cores, depths)]
+    n = len(cores)
+    if n == 0:
+        return []
+    handles, depth_arr = _batch_arrays(cores, depths)
+    moves = (c_int * n)()
+    scores = (c_int * n)()
+    flags = SEARCH_PROBCUT if selective else SEARCH_FULL_WIDTH
+    lib = load_library()
+    lib.search_batch(handles, depth_arr, n, flags, moves, scores)
+    return [((-1, -1) if moves[i] < 0 else divmod(moves[i], core.size), int(scores[i])) for i, core in enumerate(cores)]
+
+
+class SearchBatch:
+    """Searches started on the core's thread pool; poll() hands back results as each game finishes.
+    Leave the games untouched until their result is out, and close() the batch when done."""
+
+    def __init__(self, cores: Sequence[ReversiCore], depths: Union[int, Sequence[int]], selective: bool = False):
+        self.lib = load_library()
+        self.cores = list(cores)
+        handles, depth_arr = _batch_arrays(self.cores, depths)
+        flags = SEARCH_PROBCUT if selective else SEARCH_FULL_WIDTH
+        self.handle = self.lib.search_batch_submit(handles, depth_arr, len(self.cores), flags,
+                                                   SEARCH_DONE_FN(), None)
+        self.returned = 0
+
+    def poll(self, timeout: Optional[float] = None, max_results: int = 64) -> List[Tuple[int, Tuple[int, int], int]]:
+        """(index, move, score) for searches finished since the last poll, waiting up to timeout
+        seconds (None: until one finishes); empty once every result has been returned"""
+        if not self.handle or self.returned == len(self.cores):
+            return []
+        indices = (c_int * max_results)()
+        moves = (c_int * max_results)()
+        scores = (c_int * max_results)()
+        timeout_ms = -1 if timeout is None else max(0, int(timeout * 1000))
+        count = self.lib.search_batch_poll(self.handle, indices, moves, scores, max_results, timeout_ms)
+        self.returned += count
+        results = []
+        for i in range(count):
+            index, v = int(indices[i]), int(moves[i])
+            move = (-1, -1) if v < 0 else divmod(v, self.cores[index].size)
+            results.append((index, move, int(scores[i])))
+        return results
+
+    def pending(self) -> int:
+        return int(self.lib.search_batch_pending(self.handle)) if self.handle else 0
+
+    def done(self) -> bool:
+        return self.returned == len(self.cores)
+
+    def __iter__(self):
+        while not self.done():
+            yield from self.poll()
+
+    def close(self):
+        """Waits for any search still running and frees the batch"""
+        if self.handle:
+            self.lib.search_batch_free(self.handle)
+            self.handle = None
+
+    def __enter__(self):
+        return self
 
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,169 @@
+import argparse
+import os
+import random
+import time
+from contextlib import nullcontext
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from services import bitboard as bb
+from services.pycore import open_core
+from services.records import from_transcript
+from services.symmetry import canonical_batch
+
+
+# Opening suites: every position N plies deep, one line per position up to board symmetry,
+# optionally kept only when a shallow search calls it balanced. Positions are expanded a ply at a
+# time as NumPy bitboard batches, sharded over a process pool, and deduplicated by sorting their
+# canonical keys, so transpositions and mirror images are dropped before they are expanded again.
+# Lines through a pass are skipped; the side to move after N plies is black for even N.
+INLINE_PARENTS = 20_000  # smaller plies are expanded in this process
+EVAL_CHUNK = 256
+
+
+def start_position() -> Tuple[np.ndarray, np.ndarray]:
+    with open_core() as core:
+        core.reset()
+        black, white = core.bitboards()
+    return np.array([black], dtype=np.uint64), np.array([white], dtype=np.uint64)
+
+
+def unique(black: np.ndarray, white: np.ndarray, lines: np.ndarray):
+    """One line per position up to symmetry, ordered by canonical key"""
+    key_black, key_white, _ = canonical_batch(black, white)
+    order = np.lexsort((key_white, key_black))
+    key_black, key_white = key_black[order], key_white[order]
+    first = np.r_[True, (key_black[1:] != key_black[:-1]) | (key_white[1:] != key_white[:-1])]
+    keep = order[first]
+    return black[keep], white[keep], lines[keep]
+
+
+def expand(task):
+    """Every child of a batch of positions with black to move on even plies, deduplicated"""
+    black, white, lines, ply = task
+    own, opp = (black, white) if ply % 2 == 0 else (white, black)
+    board, square = bb.squares(bb.move_mask(own, opp))
+    next_own, mover = bb.play(own[board], opp[board], bb.square_bits(square))
+    child_black, child_white = (mover, next_own) if ply % 2 == 0 else (next_own, mover)
+    child_lines = np.hstack([lines[board], square[:, None].astype(np.uint8)])
+    return unique(child_black, child_white, child_lines)
+
+
+def enumerate_positions(plies: int, workers: int = 1):
+    """(black, white, lines) for every position after plies moves whose side to move has a move;
+    lines are uint8 squares (row * 8 + col), one row per position"""
+    black, white = start_position()
+    lines = np.zeros((1, 0), dtype=np.uint8)
+    with Pool(workers) if workers > 1 else nullcontext() as pool:
+        for ply in range(plies):
+            if workers > 1 and len(black) > INLINE_PARENTS:
+                bounds = np.linspace(0, len(black), workers * 4 + 1, dtype=np.int64)
+                tasks = [(black[a:b], white[a:b], lines[a:b], ply) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+                parts = pool.map(expand, tasks)
+                black, white, lines = unique(*(np.concatenate(p) for p in zip(*parts)))
+            else:
+                black, white, lines = expand((black, white, lines, ply))
+    own, opp = (black, white) if plies % 2 == 0 else (white, black)
+    playable = bb.move_mask(own, opp) != 0
+    return black[playable], white[playable], lines[playable]
+
+
+def line_moves(line) -> List[Tuple[int, int]]:
+    return [divmod(int(square), 8) for square in line]
+
+
+def transcript(line) -> str:
+    return "".join(f"{chr(ord('a') + c)}{r + 1}" for r, c in line_moves(line))
+
+
+def evaluate_lines(task) -> List[int]:
+    """Search score of each line's final position, from black's point of view"""
+    lines, depth = task
+    scores = []
+    with open_core() as core:
+        for line in lines:
+            core.reset()
+            for r, c in line_moves(line):
+                core.make_move(r, c)
+            _, score = core.get_best_move_score(depth)
+            scores.append(score if core.current_player() == 1 else -score)
+    return scores
+
+
+def build_suite(plies: int, depth: int = 4, max_eval: Optional[int] = 20, count: int = 0,
+                workers: int = 1, seed: int = 1, progress: bool = False) -> List[Tuple[str, Optional[int]]]:
+    """(transcript, eval) of unique positions plies deep; with max_eval set, only those a depth-ply
+    search scores within +-max_eval. count > 0 stops after that many, drawn in a seeded random order."""
+    start = time.time()
+    _, _, lines = enumerate_positions(plies, workers)
+    if progress:
+        print(f"{len(lines)} unique positions after {plies} plies ({time.time() - start:.1f}s)")
+    order = list(range(len(lines)))
+    if count > 0:
+        random.Random(seed).shuffle(order)
+    if max_eval is None:
+        return [(transcript(lines[i]), None) for i in order[:count or None]]
+
+    suite = []
+    chunks = [order[i:i + EVAL_CHUNK] for i in range(0, len(order), EVAL_CHUNK)]
+    tasks = ((lines[chunk], depth) for chunk in chunks)
+    with Pool(workers) if workers > 1 else nullcontext() as pool:
+        results = pool.imap(evaluate_lines, tasks) if workers > 1 else map(evaluate_lines, tasks)
+        for done, (chunk, scores) in enumerate(zip(chunks, results), start=1):
+            suite.extend((transcript(lines[i]), s) for i, s in zip(chunk, scores) if abs(s) <= max_eval)
+            if progress and done % 50 == 0:
+                print(f"Evaluated {done * EVAL_CHUNK}/{len(order)}, kept {len(suite)}")
+            if 0 < count <= len(suite):
+                break
+    return suite[:count or None]
+
+
+def write_suite(path: str, suite: List[Tuple[str, Optional[int]]], header: str):
+    with open(path, "w") as f:
+        f.write(f"# {header}\n")
+        for text, score in suite:
+            f.write(text if score is None else f"{text}  # {score:+d}")
+            f.write("\n")
+
+
+def load_openings(path: str) -> List[List[Tuple[int, int]]]:
+    """One transcript per line (e.g. f5d6c3d3); '#' starts a comment"""
+    openings = []
+    with open(path) as f:
+        for line in f:
+            text = line.split("#", 1)[0].strip()
+            if text:
+                openings.append(from_transcript(text))
+    return openings
+
+
+def default_openings(plies: int) -> List[List[Tuple[int, int]]]:
+    """Every line of the given length, keeping one per position up to board symmetry"""
+    _, _, lines = enumerate_positions(plies)
+    return [line_moves(line) for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write an opening suite of unique, balanced positions")
+    parser.add_argument("out", help="suite file, one transcript per line")
+    parser.add_argument("--plies", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=4, help="balance search depth")
+    parser.add_argument("--max-eval", type=int, default=20,
+                        help="keep positions the search scores within this many points (negative: keep all)")
+    parser.add_argument("--count", type=int, default=0, help="stop after this many openings (0: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1, help="draw order when --count is set")
+    args = parser.parse_args()
+
+    start = time.time()
+    max_eval = args.max_eval if args.max_eval >= 0 else None
+    suite = build_suite(args.plies, args.depth, max_eval, args.count, args.workers, args.seed, progress=True)
+    balance = f"depth {args.depth}, |eval| <= {max_eval}" if max_eval is not None else "unfiltered"
+    write_suite(args.out, suite, f"{len(suite)} openings, {args.plies} plies, unique up to symmetry, {balance}")
+    print(f"Wrote {len(suite)} openings to {args.out} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
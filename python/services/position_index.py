@@ -0,0 +1,272 @@
+import argparse
+import os
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import bitboard as bb
+from services.records import GameRecord, encode_record, from_transcript, read_record_at, scan_records
+from services.symmetry import canonical_batch, inverse, symmetries, transform_square
+
+
+# On-disk index of a game archive: every position reached in every game, keyed by a hash of its
+# canonical image under the 8 board symmetries and the side to move, mapped to the offsets of the
+# games that reached it, their outcomes and the moves played next (stored in the canonical frame).
+# update() indexes only the records appended since the last call.
+BATCH_GAMES = 4096
+START_BLACK = (1 << 28) | (1 << 35)
+START_WHITE = (1 << 27) | (1 << 36)
+NO_MOVE = 64  # the final position of a game has no next move
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def position_keys(black: np.ndarray, white: np.ndarray, side: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Signed 64-bit index keys of positions (as SQLite stores them) and each one's symmetry index"""
+    b, w, index = canonical_batch(np.asarray(black, dtype=np.uint64), np.asarray(white, dtype=np.uint64))
+    with np.errstate(over="ignore"):
+        keys = _mix(b) ^ _mix(w + np.uint64(0x9E3779B97F4A7C15))
+    keys = np.where(np.asarray(side) == -1, ~keys, keys)
+    return keys.view(np.int64), index
+
+
+def replay_batch(records: List[GameRecord]):
+    """Every position of every game, before each move and after the last one, replayed in lockstep.
+    Passes are implicit in records: a move the side to move cannot play belongs to the other side.
+    Returns (game number, black, white, side, next square) arrays; a game with an illegal move
+    is cut off where it went wrong, and games on other board sizes are skipped."""
+    n = len(records)
+    length = np.array([len(r.moves) for r in records])
+    moves = np.full((n, max(length.max(initial=0), 1)), NO_MOVE, dtype=np.int64)
+    for i, record in enumerate(records):
+        moves[i, :len(record.moves)] = [r * 8 + c for r, c in record.moves]
+    black = np.full(n, START_BLACK, dtype=np.uint64)
+    white = np.full(n, START_WHITE, dtype=np.uint64)
+    side = np.ones(n, dtype=np.int8)
+    alive = np.array([r.size == 8 for r in records], dtype=bool)
+    out = []
+    for ply in range(moves.shape[1] + 1):
+        playing = alive & (length > ply)
+        finished = alive & (length == ply)
+        if finished.any():
+            idx = np.nonzero(finished)[0]
+            out.append((idx, black[idx], white[idx], side[idx], np.full(len(idx), NO_MOVE)))
+            alive &= ~finished
+        if not playing.any():
+            break
+        idx = np.nonzero(playing)[0]
+        square = moves[idx, ply]
+        bit = np.uint64(1) << square.astype(np.uint64)
+        own = np.where(side[idx] == 1, black[idx], white[idx])
+        opp = np.where(side[idx] == 1, white[idx], black[idx])
+        passed = (bb.move_mask(own, opp) & bit) == 0
+        side[idx[passed]] *= -1
+        own, opp = np.where(passed, opp, own), np.where(passed, own, opp)
+        flips = bb.flip_mask(own, opp, bit)
+        bad = flips == 0
+        alive[idx[bad]] = False
+        good = ~bad
+        idx, own, opp, flips, bit, square = idx[good], own[good], opp[good], flips[good], bit[good], square[good]
+        out.append((idx, black[idx], white[idx], side[idx], square))
+        own = own | flips | bit
+        opp = opp ^ flips
+        black_to_move = side[idx] == 1
+        black[idx] = np.where(black_to_move, own, opp)
+        white[idx] = np.where(black_to_move, opp, own)
+        side[idx] *= -1
+    if not out:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.uint64), empty.astype(np.uint64), empty.astype(np.int8), empty
+    return tuple(np.concatenate(parts) for parts in zip(*out))
+
+
+@dataclass
+class PositionStats:
+    games: int = 0
+    black_wins: int = 0
+    white_wins: int = 0
+    draws: int = 0
+    next_moves: List[Tuple[Tuple[int, int], int]] = field(default_factory=list)  # most played first
+
+
+class PositionIndex:
+    """SQLite index of an archive's positions; lookups take milliseconds regardless of archive size"""
+
+    def __init__(self, archive_path: str, index_path: Optional[str] = None):
+        self.archive_path = archive_path
+        self.index_path = index_path or archive_path + ".index.sqlite"
+        self.db = sqlite3.connect(self.index_path, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);"
+            "CREATE TABLE IF NOT EXISTS games (key INTEGER, offset INTEGER, PRIMARY KEY (key, offset)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS stats (key INTEGER PRIMARY KEY, games INTEGER, black_wins INTEGER,"
+            " white_wins INTEGER, draws INTEGER);"
+            "CREATE TABLE IF NOT EXISTS next_moves (key INTEGER, square INTEGER, count INTEGER,"
+            " PRIMARY KEY (key, square)) WITHOUT ROWID;")
+        self.db.commit()
+
+    def _meta(self, name: str, default: int = 0) -> int:
+        row = self.db.execute("SELECT value FROM meta WHERE name=?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _clear(self):
+        self.db.executescript("DELETE FROM meta; DELETE FROM games; DELETE FROM stats; DELETE FROM next_moves;")
+
+    def update(self) -> int:
+        """Indexes the records appended since the last update; returns how many games were added"""
+        if not os.path.isfile(self.archive_path):
+            return 0
+        indexed = self._meta("indexed_bytes")
+        if os.path.getsize(self.archive_path) < indexed:
+            # The archive was replaced or truncated: start over
+            self._clear()
+            indexed = 0
+        added = 0
+        batch: List[Tuple[int, GameRecord]] = []
+        try:
+            for offset, record in scan_records(self.archive_path, indexed):
+                batch.append((offset, record))
+                if len(batch) == BATCH_GAMES:
+                    self._index_batch(batch)
+                    added += len(batch)
+                    batch = []
+        except ValueError:
+            pass  # a record still being written; it is picked up by the next update
+        if batch:
+            self._index_batch(batch)
+            added += len(batch)
+        return added
+
+    def _index_batch(self, batch: List[Tuple[int, GameRecord]]):
+        offsets = np.array([offset for offset, _ in batch], dtype=np.int64)
+        records = [record for _, record in batch]
+        game, black, white, side, square = replay_batch(records)
+        keys, index = position_keys(black, white, side)
+
+        # Next moves in the canonical frame, so every symmetric variation counts towards one entry
+        played = square != NO_MOVE
+        canonical_square = np.full(len(square), NO_MOVE)
+        if played.any():
+            images = np.stack(symmetries(np.uint64(1) << square[played].astype(np.uint64)))
+            moved = images[index[played], np.arange(played.sum())]
+            canonical_square[played] = np.log2(moved.astype(np.float64)).astype(np.int64)
+
+        results = np.array([r.result for r in records], dtype=np.int8)[game]
+        key_list = keys.tolist()
+        stats: Dict[int, List[int]] = {}
+        for key, result in zip(key_list, results.tolist()):
+            entry = stats.setdefault(key, [0, 0, 0, 0])
+            entry[0] += 1
+            if result == 1:
+                entry[1] += 1
+            elif result == -1:
+                entry[2] += 1
+            elif result == 2:
+                entry[3] += 1
+        moves = Counter((k, s) for k, s, p in zip(key_list, canonical_square.tolist(), played.tolist()) if p)
+
+        end = batch[-1][0] + len(encode_record(batch[-1][1]))
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO games (key, offset) VALUES (?, ?)",
+                                zip(key_list, offsets[game].tolist()))
+            self.db.executemany(
+                "INSERT INTO stats (key, games, black_wins, white_wins, draws) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET games = games + excluded.games,"
+                " black_wins = black_wins + excluded.black_wins, white_wins = white_wins + excluded.white_wins,"
+                " draws = draws + excluded.draws",
+                ((key, *counts) for key, counts in stats.items()))
+            self.db.executemany(
+                "INSERT INTO next_moves (key, square, count) VALUES (?, ?, ?)"
+                " ON CONFLICT (key, square) DO UPDATE SET count = count + excluded.count",
+                ((key, sq, count) for (key, sq), count in moves.items()))
+            self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('indexed_bytes', ?)", (end,))
+
+    def _key(self, black: int, white: int, side: int) -> Tuple[int, int]:
+        keys, index = position_keys(np.array([black], dtype=np.uint64), np.array([white], dtype=np.uint64),
+                                    np.array([side]))
+        return int(keys[0]), int(index[0])
+
+    def lookup(self, black: int, white: int, side: int) -> PositionStats:
+        """Outcomes of the games that reached this position (in any orientation) and the moves played from it"""
+        key, index = self._key(black, white, side)
+        row = self.db.execute("SELECT games, black_wins, white_wins, draws FROM stats WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return PositionStats()
+        back = inverse(index)
+        moves = [(transform_square(sq // 8, sq % 8, back), count) for sq, count in self.db.execute(
+            "SELECT square, count FROM next_moves WHERE key=? ORDER BY count DESC, square", (key,))]
+        return PositionStats(*row, next_moves=moves)
+
+    def game_offsets(self, black: int, white: int, side: int, limit: int = 100) -> List[int]:
+        key, _ = self._key(black, white, side)
+        return [offset for (offset,) in self.db.execute(
+            "SELECT offset FROM games WHERE key=? ORDER BY offset LIMIT ?", (key, limit))]
+
+    def games(self, black: int, white: int, side: int, limit: int = 100) -> List[GameRecord]:
+        """The games that reached this position, oldest first"""
+        return [read_record_at(self.archive_path, offset) for offset in self.game_offsets(black, white, side, limit)]
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def position_after(moves: List[Tuple[int, int]]) -> Tuple[int, int, int]:
+    """(black, white, side to move) after a move list with implicit passes"""
+    record = GameRecord(moves)
+    game, black, white, side, square = replay_batch([record])
+    if len(game) != len(moves) + 1:
+        raise ValueError("Illegal move in move list")
+    return int(black[-1]), int(white[-1]), int(side[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a game archive by position and query it")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("update", help="index the games appended since the last update")
+    build.add_argument("archive")
+    query = sub.add_parser("query", help="games reaching the position after a transcript")
+    query.add_argument("archive")
+    query.add_argument("transcript", nargs="?", default="", help="e.g. f5d6c3 (empty: the start position)")
+    query.add_argument("--games", type=int, default=5, help="list this many of the games")
+    args = parser.parse_args()
+
+    with PositionIndex(args.archive) as index:
+        start = time.perf_counter()
+        if args.command == "update":
+            added = index.update()
+            print(f"Indexed {added} games in {time.perf_counter() - start:.1f}s")
+            return
+        black, white, side = position_after(from_transcript(args.transcript))
+        stats = index.lookup(black, white, side)
+        offsets = index.game_offsets(black, white, side, args.games)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{stats.games} games: black {stats.black_wins}, white {stats.white_wins}, draws {stats.draws} "
+              f"({elapsed:.1f} ms)")
+        for (r, c), count in stats.next_moves:
+            print(f"  {chr(ord('a') + c)}{r + 1}: {count}")
+        for offset in offsets:
+            record = read_record_at(args.archive, offset)
+            print(f"  @{offset} {record.black} vs {record.white} {record.black_score}-{record.white_score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import bitboard as bb
+
+
+# Pure NumPy engine following the same rules, evaluation and search as the C++ core,
+# behind the ReversiCore interface. Slower per game, but needs no compiled library.
+SIZE = 8
+
+DEFAULT_WEIGHTS = [
+    120, -20, 20, 5, 5, 20, -20, 120,
+    -20, -40, -5, -5, -5, -5, -40, -20,
+    20, -5, 15, 3, 3, 15, -5, 20,
+    5, -5, 3, 3, 3, 3, -5, 5,
+    5, -5, 3, 3, 3, 3, -5, 5,
+    20, -5, 15, 3, 3, 15, -5, 20,
+    -20, -40, -5, -5, -5, -5, -40, -20,
+    120, -20, 20, 5, 5, 20, -20, 120,
+]
+DEFAULT_MOBILITY_WEIGHT = 5
+
+# Evaluation weights are process-wide, like the core's
+_weights = np.array(DEFAULT_WEIGHTS, dtype=np.int64)
+_mobility_weight = DEFAULT_MOBILITY_WEIGHT
+_weights_lock = threading.Lock()
+
+
+def _splitmix64_keys(count: int) -> List[int]:
+    state = 0x9E3779B97F4A7C15
+    keys = []
+    for _ in range(count):
+        state = (state + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        keys.append(z ^ (z >> 31))
+    return keys
+
+
+# Same Zobrist keys as the core, so position hashes agree between engines
+_keys = _splitmix64_keys(SIZE * SIZE * 2 + 1)
+ZOBRIST = [(_keys[2 * sq], _keys[2 * sq + 1]) for sq in range(SIZE * SIZE)]
+ZOBRIST_WHITE_TO_MOVE = _keys[-1]
+
+START_BLACK = (1 << 28) | (1 << 35)
+START_WHITE = (1 << 27) | (1 << 36)
+
+
+def evaluation_weights() -> Tuple[np.ndarray, int]:
+    with _weights_lock:
+        return _weights, _mobility_weight
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+def _move_mask(own: int, opp: int) -> int:
+    return int(bb.move_mask(np.uint64(own), np.uint64(opp)))
+
+
+@dataclass
+class _HistoryEntry:
+    square: int  # -1 for a pass
+    flips: int
+    player: int
+    passed_before: bool
+    passed_after: bool  # worked out once when the step is recorded
+    hash_before: int
+
+
+class PyReversiCore:
+    """NumPy implementation of the ReversiCore interface; used when the compiled library is unavailable"""
+
+    def __init__(self):
+        self.size = SIZE
+        self.reset()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def clone(self) -> "PyReversiCore":
+        other = PyReversiCore()
+        other.copy_from(self)
+        return other
+
+    def copy_from(self, other: "PyReversiCore"):
+        self.black, self.white = other.black, other.white
+        self.to_move = other.to_move
+        self.previous_passed = other.previous_passed
+        self.moves = list(other.moves)
+        self.ply_index = other.ply_index
+        self.hash = other.hash
+
+    def _own_opp(self) -> Tuple[int, int]:
+        return (self.black, self.white) if self.to_move == 1 else (self.white, self.black)
+
+    def _compute_hash(self) -> int:
+        h = ZOBRIST_WHITE_TO_MOVE if self.to_move == -1 else 0
+        for sq in range(SIZE * SIZE):
+            if self.black >> sq & 1:
+                h ^= ZOBRIST[sq][0]
+            elif self.white >> sq & 1:
+                h ^= ZOBRIST[sq][1]
+        return h
+
+    def get_board(self):
+        return [1 if self.black >> i & 1 else -1 if self.white >> i & 1 else 0 for i in range(SIZE * SIZE)]
+
+    def get_cell(self, r: int, c: int) -> int:
+        sq = r * SIZE + c
+        return 1 if self.black >> sq & 1 else -1 if self.white >> sq & 1 else 0
+
+    def current_player(self) -> int:
+        return self.to_move
+
+    def valid_moves(self):
+        mask = _move_mask(*self._own_opp())
+        return [divmod(sq, SIZE) for sq in range(SIZE * SIZE) if mask >> sq & 1]
+
+    def move_previews(self) -> List[Tuple[Tuple[int, int], int, int]]:
+        own, opp = self._own_opp()
+        squares = [sq for sq in range(SIZE * SIZE) if _move_mask(own, opp) >> sq & 1]
+        if not squares:
+            return []
+        flips = bb.flip_mask(np.uint64(own), np.uint64(opp), bb.square_bits(squares))
+        return [(divmod(sq, SIZE), int(f), _popcount(int(f))) for sq, f in zip(squares, flips)]
+
+    def make_move(self, r: int, c: int) -> bool:
+        if not (0 <= r < SIZE and 0 <= c < SIZE):
+            return False
+        sq = r * SIZE + c
+        # Replaying the recorded next move keeps the redo tail
+        if self.ply_index < len(self.moves) and self.moves[self.ply_index].square == sq:
+            return self.redo_move()
+        own, opp = self._own_opp()
+        if (own | opp) >> sq & 1:
+            return False
+        flips = int(bb.flip_mask(np.uint64(own), np.uint64(opp), np.uint64(1 << sq)))
+        if not flips:
+            return False
+        self._record(sq, flips)
+        return True
+
+    def pass_turn(self):
+        if self.ply_index < len(self.moves) and self.moves[self.ply_index].square == -1:
+            self.redo_move()
+            return
+        self._record(-1, 0)
+
+    def _record(self, square: int, flips: int):
+        del self.moves[self.ply_index:]
+        # A pass leaves previous_passed set when the passing player had no move either
+        passed_after = square < 0 and _move_mask(*self._own_opp()) == 0
+        self.moves.append(_HistoryEntry(square, flips, self.to_move, self.previous_passed, passed_after, self.hash))
+        self.redo_move()
+
+    def _apply(self, entry: _HistoryEntry):
+        color = 0 if entry.player == 1 else 1
+        if entry.square >= 0:
+            placed = 1 << entry.square
+            if entry.player == 1:
+                self.black |= placed | entry.flips
+                self.white &= ~entry.flips
+            else:
+                self.white |= placed | entry.flips
+                self.black &= ~entry.flips
+            self.hash ^= ZOBRIST[entry.square][color]
+            flips = entry.flips
+            while flips:
+                sq = (flips & -flips).bit_length() - 1
+                self.hash ^= ZOBRIST[sq][0] ^ ZOBRIST[sq][1]
+                flips &= flips - 1
+        self.previous_passed = entry.passed_after
+        self.to_move = -entry.player
+        self.hash ^= ZOBRIST_WHITE_TO_MOVE
+
+    def score(self):
+        return _popcount(self.black), _popcount(self.white)
+
+    def result(self) -> int:
+        if _move_mask(self.black, self.white) or _move_mask(self.white, self.black):
+            return 0
+        b, w = self.score()
+        return 1 if b > w else -1 if w > b else 2
+
+    def reset(self):
+        self.black, self.white = START_BLACK, START_WHITE
+        self.to_move = 1
+        self.previous_passed = False
+        self.moves: List[_HistoryEntry] = []
+        self.ply_index = 0
+        self.hash = self._compute_hash()
+
+    def get_best_move(self, depth: int, selective: bool = False) -> Tuple[int, int]:
+        return self.get_best_move_score(depth, selective)[0]
+
+    def get_best_move_score(self, depth: int, selective: bool = False) -> Tuple[Tuple[int, int], int]:
+        """Always a full-width search; selective is accepted for interface compatibility"""
+        own, opp = self._own_opp()
+        weights, mobility = evaluation_weights()
+        best, scores = bb.best_moves(np.uint64(own), np.uint64(opp), depth, weights, mobility)
+        if best[0] < 0:
+            return (-1, -1), 0
+        return divmod(int(best[0]), SIZE), int(scores[0])
+
+    def get_top_moves(self, k: int, depth: int) -> List[Tuple[Tuple[int, int], int]]:
+        if k <= 0:
+            return []
+        own, opp = self._own_opp()
+        weights, mobility = evaluation_weights()
+        _, square, values = bb.root_values(np.uint64(own), np.uint64(opp), depth, weights, mobility)
+        # Stable sort keeps square order among equal scores, like the core
+        order = np.argsort(-values, kind="stable")[:k]
+        return [(divmod(int(square[i]), SIZE), int(values[i])) for i in order]
+
+    def bitboards(self) -> Tuple[int, int]:
+        return self.black, self.white
+
+    def set_eval_weights(self, squares: List[int], mobility: int):
+        global _weights, _mobility_weight
+        if len(squares) != SIZE * SIZE:
+            raise ValueError(f"Expected {SIZE * SIZE} square weights, got {len(squares)}")
+        with _weights_lock:
+            _weights = np.array(squares, dtype=np.int64)
+            _mobility_weight = int(mobility)
+
+    def get_eval_weights(self) -> Tuple[List[int], int]:
+        weights, mobility = evaluation_weights()
+        return [int(v) for v in weights], mobility
+
+    def load_eval_weights(self, path: str) -> bool:
+        """Same text format as the core: 64 square weights then mobility, '#' starts a comment"""
+        try:
+            with open(path) as f:
+                values = [int(v) for line in f for v in line.split("#", 1)[0].split()]
+        except (OSError, ValueError):
+            return False
+        if len(values) != SIZE * SIZE + 1:
+            return False
+        self.set_eval_weights(values[:-1], values[-1])
+        return True
+
+    def load_probcut_params(self, path: str) -> bool:
+        return False
+
+    def get_probcut_params(self) -> Tuple[float, List[Tuple[int, float, float, float]]]:
+        """No ProbCut: every search is full width"""
+        return 0.0, []
+
+    def cpu_kernel(self) -> str:
+        return "numpy"
+
+    def attach_shared_tt(self, name: str, megabytes: int = 64) -> bool:
+        """The NumPy search has no transposition table"""
+        return False
+
+    def detach_shared_tt(self):
+        pass
+
+    def remove_shared_tt(self, name: str) -> bool:
+        return False
+
+    def shared_tt_stats(self) -> Dict[str, int]:
+        return {"probes": 0, "hits": 0, "stores": 0}
+
+    def set_search_threads(self, threads: int):
+        """Batched searches run one after another here"""
+        pass
+
+    def search_threads(self) -> int:
+        return 0
+
+    def undo_move(self) -> bool:
+        if self.ply_index == 0:
+            return False
+        self.ply_index -= 1
+        entry = self.moves[self.ply_index]
+        if entry.square >= 0:
+            placed = 1 << entry.square
+            if entry.player == 1:
+                self.black &= ~(placed | entry.flips)
+                self.white |= entry.flips
+            else:
+                self.white &= ~(placed | entry.flips)
+                self.black |= entry.flips
+        self.to_move = entry.player
+        self.previous_passed = entry.passed_before
+        self.hash = entry.hash_before
+        return True
+
+    def redo_move(self) -> bool:
+        if self.ply_index >= len(self.moves):
+            return False
+        self.ply_index += 1
+        self._apply(self.moves[self.ply_index - 1])
+        return True
+
+    def goto_ply(self, ply: int) -> bool:
+        if not (0 <= ply <= len(self.moves)):
+            return False
+        while self.ply_index > ply:
+            self.undo_move()
+        while self.ply_index < ply:
+            self.redo_move()
+        return True
+
+    def ply(self) -> int:
+        return self.ply_index
+
+    def history(self) -> List[Optional[Tuple[int, int]]]:
+        return [None if e.square < 0 else divmod(e.square, SIZE) for e in self.moves]
+
+    def position_hash(self) -> int:
+        return self.hash
+
+
+def open_core(dll_path: str = None, size: int = SIZE):
+    """ReversiCore on the compiled library when it loads, otherwise the NumPy engine (8x8 only)"""
+    from services.core import ReversiCore
+    if size != SIZE:
+        return ReversiCore(dll_path, size=size)
+    if os.environ.get("REVERSI_ENGINE") == "numpy":
+        return PyReversiCore()
+    try:
+        return ReversiCore(dll_path)
+    except RuntimeError:
+        return PyReversiCore()
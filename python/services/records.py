@@ -0,0 +1,194 @@
+import argparse
+import os
+import re
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+
+# Archive layout: MAGIC, then records appended back to back.
+# Record: fixed header, two length-prefixed UTF-8 player names, one byte per move.
+# Moves are stored as row * size + col; passes are implicit, as in WTHOR and text transcripts.
+MAGIC = b"RVGR\x01"
+_HEADER = struct.Struct("<BBbBBBB")  # size, move count, result, black score, white score, black depth, white depth
+
+WTHOR_HEADER_SIZE = 16
+WTHOR_GAME_SIZE = 68
+
+
+@dataclass
+class GameRecord:
+    moves: List[Tuple[int, int]] = field(default_factory=list)
+    black: str = "Black"
+    white: str = "White"
+    result: int = 0           # 1 black, -1 white, 2 draw, 0 unfinished
+    black_score: int = 0
+    white_score: int = 0
+    black_depth: int = 0      # engine depth, 0 for a human player
+    white_depth: int = 0
+    size: int = 8
+
+
+def encode_record(record: GameRecord) -> bytes:
+    black = record.black.encode("utf-8")[:255]
+    white = record.white.encode("utf-8")[:255]
+    header = _HEADER.pack(record.size, len(record.moves), record.result, record.black_score,
+                          record.white_score, record.black_depth, record.white_depth)
+    moves = bytes(r * record.size + c for r, c in record.moves)
+    return header + bytes([len(black)]) + black + bytes([len(white)]) + white + moves
+
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError("Truncated game record")
+    return data
+
+
+def decode_record(f: BinaryIO) -> Optional[GameRecord]:
+    """Reads the next record from f, or returns None at the end of the archive"""
+    head = f.read(_HEADER.size)
+    if not head:
+        return None
+    if len(head) != _HEADER.size:
+        raise ValueError("Truncated game record")
+    size, count, result, b_score, w_score, b_depth, w_depth = _HEADER.unpack(head)
+    black = _read_exact(f, _read_exact(f, 1)[0]).decode("utf-8")
+    white = _read_exact(f, _read_exact(f, 1)[0]).decode("utf-8")
+    moves = [divmod(v, size) for v in _read_exact(f, count)]
+    return GameRecord(moves, black, white, result, b_score, w_score, b_depth, w_depth, size)
+
+
+class GameRecordWriter:
+    """Append-only archive writer; every record is flushed as soon as it is written"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.count = 0
+
+    def write(self, record: GameRecord):
+        self.file.write(encode_record(record))
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Iterates an archive one record at a time, so memory stays bounded for any archive size"""
+    for _offset, record in scan_records(path):
+        yield record
+
+
+def scan_records(path: str, start: int = len(MAGIC)) -> Iterator[Tuple[int, GameRecord]]:
+    """(byte offset, record) from start onwards; offsets stay valid as the archive grows"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a game record archive")
+        f.seek(max(start, len(MAGIC)))
+        while True:
+            offset = f.tell()
+            record = decode_record(f)
+            if record is None:
+                return
+            yield offset, record
+
+
+def read_record_at(path: str, offset: int) -> GameRecord:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        record = decode_record(f)
+    if record is None:
+        raise ValueError(f"No game record at offset {offset} of {path}")
+    return record
+
+
+def to_transcript(record: GameRecord) -> str:
+    """Standard text transcript, e.g. 'f5d6c3d3' (column letter, then row number)"""
+    return "".join(f"{chr(ord('a') + c)}{r + 1}" for r, c in record.moves)
+
+
+def from_transcript(text: str, size: int = 8) -> List[Tuple[int, int]]:
+    """Parses to_transcript output; rows may have several digits on boards above 9x9 ('a10')"""
+    text = "".join(text.split()).lower()
+    if not re.fullmatch(r"([a-z][0-9]+)*", text):
+        raise ValueError(f"Invalid transcript: {text!r}")
+    moves = []
+    for square in re.findall(r"[a-z][0-9]+", text):
+        c = ord(square[0]) - ord("a")
+        r = int(square[1:]) - 1
+        if not (0 <= r < size and 0 <= c < size):
+            raise ValueError(f"Invalid square in transcript: {square}")
+        moves.append((r, c))
+    return moves
+
+
+def read_wthor(path: str) -> Iterator[GameRecord]:
+    """Iterates games of a WTHOR (.wtb) database; player names are the numeric WTHOR ids"""
+    with open(path, "rb") as f:
+        header = _read_exact(f, WTHOR_HEADER_SIZE)
+        count = struct.unpack_from("<I", header, 4)[0]
+        for _ in range(count):
+            data = f.read(WTHOR_GAME_SIZE)
+            if len(data) != WTHOR_GAME_SIZE:
+                return
+            _tournament, black_id, white_id, black_score = struct.unpack_from("<HHHB", data)
+            moves = []
+            for v in data[8:]:
+                if v == 0:
+                    break
+                # WTHOR squares are 10 * row + col, both 1-based
+                moves.append((v // 10 - 1, v % 10 - 1))
+            white_score = 64 - black_score
+            if black_score > white_score:
+                result = 1
+            elif white_score > black_score:
+                result = -1
+            else:
+                result = 2
+            yield GameRecord(moves, f"wthor:{black_id}", f"wthor:{white_id}", result,
+                             black_score, white_score)
+
+
+def import_wthor(src_paths: List[str], dest_path: str) -> int:
+    """Appends every game of the given WTHOR databases to an archive; returns the number imported"""
+    with GameRecordWriter(dest_path) as writer:
+        for src in src_paths:
+            for record in read_wthor(src):
+                writer.write(record)
+        return writer.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reversi game record tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import-wthor", help="append WTHOR databases to an archive")
+    imp.add_argument("archive")
+    imp.add_argument("wthor", nargs="+")
+    exp = sub.add_parser("transcript", help="print every game of an archive as a text transcript")
+    exp.add_argument("archive")
+    args = parser.parse_args()
+
+    if args.command == "import-wthor":
+        print(f"Imported {import_wthor(args.wthor, args.archive)} games into {args.archive}")
+    else:
+        for record in read_records(args.archive):
+            print(f"{record.black} vs {record.white} {record.black_score}-{record.white_score} {to_transcript(record)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# Post-game review: every ply of a finished game is searched on its own engine handle in a thread
+# pool (the core's searches run outside the GIL), and results stream back as they complete.
+# Scores are from the point of view of the player who moved.
+DEFAULT_DEPTH = 6
+WIN_SCORE = 9000  # finished-game scores are 10000 + disc difference
+
+
+def square_name(move: Tuple[int, int]) -> str:
+    r, c = move
+    return f"{chr(ord('a') + c)}{r + 1}"
+
+
+def score_label(score: int) -> str:
+    """Search score as text; finished games show the disc margin instead"""
+    if score >= WIN_SCORE:
+        return f"win +{score - 10000}"
+    if score <= -WIN_SCORE:
+        return f"loss {score + 10000}"
+    return f"{score:+d}"
+
+
+@dataclass
+class PlyReview:
+    ply: int
+    player: int
+    played: Tuple[int, int]
+    played_score: int
+    best: Tuple[int, int]
+    best_score: int
+
+    @property
+    def loss(self) -> int:
+        """Score given away by the move played compared with the engine's choice"""
+        return self.best_score - self.played_score
+
+    def describe(self) -> str:
+        side = "Black" if self.player == 1 else "White"
+        if self.loss <= 0:  # the engine's choice or a move scoring just as well
+            return f"{side} {square_name(self.played)} ({score_label(self.played_score)}): best move"
+        return (f"{side} {square_name(self.played)} ({score_label(self.played_score)}), "
+                f"best {square_name(self.best)} ({score_label(self.best_score)})")
+
+
+class GameReview:
+    """Searches every move of a game in parallel; poll() hands over results as they arrive"""
+
+    def __init__(self, core, depth: int = DEFAULT_DEPTH, workers: Optional[int] = None):
+        self.depth = depth
+        # A private copy of the game, so the caller may keep browsing or playing on its own core
+        self.game = core.clone()
+        self.history = self.game.history()
+        self.plies = [i for i, move in enumerate(self.history) if move is not None]
+        self.results: List[PlyReview] = []
+        self.failed: Dict[int, str] = {}  # plies whose search raised, with the error; they count as done
+        self.done: "queue.Queue[PlyReview]" = queue.Queue()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.cores = []
+        self.cancelled = False
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1, thread_name_prefix="review")
+        self.futures: List[Future] = [self.executor.submit(self._review_ply, ply) for ply in self.plies]
+
+    def _worker_core(self):
+        """One engine handle per pool thread, reused for every ply that thread reviews"""
+        core = getattr(self.local, "core", None)
+        if core is None:
+            with self.lock:
+                core = self.game.clone()
+                self.cores.append(core)
+            self.local.core = core
+        return core
+
+    def _review_ply(self, ply: int):
+        if self.cancelled:
+            return
+        try:
+            self._search_ply(ply)
+        except Exception as e:
+            with self.lock:
+                self.failed[ply] = f"{type(e).__name__}: {e}"
+
+    def _search_ply(self, ply: int):
+        core = self._worker_core()
+        core.goto_ply(ply)
+        player = core.current_player()
+        played = self.history[ply]
+        # Exact scores for every legal move: the best one and the one played come from the same search
+        scores = core.get_top_moves(len(core.valid_moves()), self.depth)
+        best, best_score = scores[0]
+        played_score = dict(scores)[played]
+        self.done.put(PlyReview(ply, player, played, played_score, best, best_score))
+
+    def poll(self) -> List[PlyReview]:
+        """Results completed since the last call, also collected in self.results"""
+        new = []
+        while True:
+            try:
+                new.append(self.done.get_nowait())
+            except queue.Empty:
+                break
+        self.results.extend(new)
+        return new
+
+    def progress(self) -> Tuple[int, int]:
+        """Plies reviewed or failed, out of all plies"""
+        with self.lock:
+            failed = len(self.failed)
+        return len(self.results) + failed, len(self.plies)
+
+    def finished(self) -> bool:
+        done, total = self.progress()
+        return done == total
+
+    def at_ply(self, ply: int) -> Optional[PlyReview]:
+        for review in self.results:
+            if review.ply == ply:
+                return review
+        return None
+
+    def total_loss(self, player: int) -> int:
+        return sum(r.loss for r in self.results if r.player == player)
+
+    def best_moves(self, player: int) -> Tuple[int, int]:
+        """How many of the player's reviewed moves matched the engine's choice, out of how many"""
+        mine = [r for r in self.results if r.player == player]
+        return sum(r.loss <= 0 for r in mine), len(mine)
+
+    def close(self):
+        self.cancelled = True
+        for future in self.futures:
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        for core in self.cores:
+            core.close()
+        self.cores.clear()
+        self.game.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def wait(self) -> List[PlyReview]:
+        """Blocks until every ply is reviewed or failed; results in game order"""
+        for future in self.futures:
+            future.result()
+        self.poll()
+        return sorted(self.results, key=lambda r: r.ply)
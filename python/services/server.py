@@ -0,0 +1,375 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from services.core import load_library
+from services.pycore import open_core
+
+
+# JSON line protocol: one request object per line, one response object per line.
+#   {"id": 1, "cmd": "new"}                              -> {"id": 1, "ok": true, "session": "1"}
+#   {"id": 2, "cmd": "move", "session": "1", "move": "f5"}
+#   {"id": 3, "cmd": "best", "session": "1", "depth": 5, "play": true}   -> "move" and search "eval"
+#     ("selective": true uses ProbCut pruning; depth 1 to MAX_DEPTH, "timeout" in seconds)
+#   {"id": 4, "cmd": "state" | "pass" | "undo" | "close", "session": "1"}
+#   {"id": 5, "cmd": "stats"}
+# Responses carry the request id and may arrive out of order across sessions.
+MAX_INFLIGHT_PER_CONNECTION = 32
+SESSION_COMMANDS = {"close", "best", "state", "move", "pass", "undo"}
+# A native search cannot be cancelled, so a timed-out search still holds its worker until it ends
+MAX_DEPTH = 12
+LATENCY_WINDOW = 1000
+
+
+def square_name(move: Tuple[int, int]) -> Optional[str]:
+    r, c = move
+    if r < 0:
+        return None
+    return f"{chr(ord('a') + c)}{r + 1}"
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def parse_square(value, size: int) -> Tuple[int, int]:
+    if isinstance(value, str) and len(value) >= 2 and value[1:].isdigit():
+        r, c = int(value[1:]) - 1, ord(value[0].lower()) - ord("a")
+    elif isinstance(value, (list, tuple)) and len(value) == 2 and all(type(v) is int for v in value):
+        r, c = value
+    else:
+        raise ProtocolError(f"Invalid move: {value!r}")
+    if not (0 <= r < size and 0 <= c < size):
+        raise ProtocolError(f"Move out of board: {value!r}")
+    return r, c
+
+
+def int_field(request: dict, name: str, default: int, low: int, high: int) -> int:
+    value = request.get(name, default)
+    if type(value) is not int or not low <= value <= high:
+        raise ProtocolError(f"{name} must be an integer from {low} to {high}: {value!r}")
+    return value
+
+
+def positive_field(request: dict, name: str, default: float) -> float:
+    value = request.get(name, default)
+    if type(value) not in (int, float) or not 0 < value < float("inf"):
+        raise ProtocolError(f"{name} must be a positive number: {value!r}")
+    return float(value)
+
+
+def bool_field(request: dict, name: str) -> bool:
+    value = request.get(name, False)
+    if not isinstance(value, bool):
+        raise ProtocolError(f"{name} must be true or false: {value!r}")
+    return value
+
+
+class Metrics:
+    """Per-command request counts, errors and a sliding window of latencies"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def record(self, cmd: str, seconds: float, ok: bool):
+        self.counts[cmd] += 1
+        if not ok:
+            self.errors[cmd] += 1
+        self.latencies[cmd].append(seconds * 1000)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for cmd, window in self.latencies.items():
+            ordered = sorted(window)
+            result[cmd] = {
+                "count": self.counts[cmd],
+                "errors": self.errors[cmd],
+                "p50_ms": round(ordered[len(ordered) // 2], 3),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+        return result
+
+
+class TurnQueue:
+    """First-come, first-served exclusive turns. take() queues the caller before its first await,
+    so requests get their turns in the order they were dispatched, not the order they resume in"""
+
+    def __init__(self):
+        self.last: Optional[asyncio.Future] = None
+
+    async def take(self, timeout: Optional[float] = None) -> asyncio.Future:
+        """Waits for every earlier turn to be released; the returned turn must be passed to release()"""
+        previous = self.last
+        turn = asyncio.get_running_loop().create_future()
+        self.last = turn
+        if previous is not None and not previous.done():
+            try:
+                done, _ = await asyncio.wait({previous}, timeout=timeout)
+                if not done:
+                    raise asyncio.TimeoutError()
+            except BaseException:
+                # Keep the queue intact: this turn is handed straight on once it comes
+                previous.add_done_callback(lambda _: self.release(turn))
+                raise
+        return turn
+
+    @staticmethod
+    def release(turn: asyncio.Future):
+        if not turn.done():
+            turn.set_result(None)
+
+
+class Session:
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.core = open_core()
+        # Serialises every use of the handle in arrival order, including searches still running after a timeout
+        self.turns = TurnQueue()
+
+    def state(self) -> dict:
+        b, w = self.core.score()
+        return {
+            "board": self.core.get_board(),
+            "to_move": self.core.current_player(),
+            "moves": [square_name(m) for m in self.core.valid_moves()],
+            "score": [b, w],
+            "result": self.core.result(),
+            "ply": self.core.ply(),
+        }
+
+
+class EngineServer:
+    def __init__(self, workers: int, max_queued: int, timeout: float):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self.search_slots: Optional[asyncio.Semaphore] = None
+        self.metrics = Metrics()
+        self.next_session = 0
+        self.open_sessions = 0
+
+    async def serve_connection(self, read_line: Callable[[], Awaitable[bytes]],
+                               write_line: Callable[[dict], Awaitable[None]]):
+        """Runs one client: requests are handled concurrently, but reading pauses when too many are in flight"""
+        if self.search_slots is None:
+            self.search_slots = asyncio.Semaphore(self.workers + self.max_queued)
+        sessions: Dict[str, Session] = {}
+        inflight = asyncio.Semaphore(MAX_INFLIGHT_PER_CONNECTION)
+        tasks = set()
+        try:
+            while True:
+                line = await read_line()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await inflight.acquire()
+                task = asyncio.create_task(self._respond(line, sessions, write_line, inflight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for session in list(sessions.values()):
+                await self._close_session(session, sessions)
+
+    async def _respond(self, line: bytes, sessions: Dict[str, Session], write_line, inflight: asyncio.Semaphore):
+        try:
+            start = time.perf_counter()
+            cmd = "invalid"
+            request_id = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ProtocolError("Request must be a JSON object")
+                request_id = request.get("id")
+                cmd = str(request.get("cmd", ""))
+                response = await self._dispatch(cmd, request, sessions)
+                response["ok"] = True
+            except (ProtocolError, ValueError, asyncio.TimeoutError) as e:
+                message = "timeout" if isinstance(e, asyncio.TimeoutError) else str(e)
+                response = {"ok": False, "error": message}
+            except Exception as e:
+                response = {"ok": False, "error": f"internal error: {type(e).__name__}: {e}"}
+            elapsed = time.perf_counter() - start
+            self.metrics.record(cmd, elapsed, response["ok"])
+            response["id"] = request_id
+            response["ms"] = round(elapsed * 1000, 3)
+            await write_line(response)
+        finally:
+            inflight.release()
+
+    def _session(self, request: dict, sessions: Dict[str, Session]) -> Session:
+        session = sessions.get(str(request.get("session")))
+        if session is None:
+            raise ProtocolError(f"Unknown session: {request.get('session')!r}")
+        return session
+
+    async def _dispatch(self, cmd: str, request: dict, sessions: Dict[str, Session]) -> dict:
+        if cmd == "new":
+            self.next_session += 1
+            session = Session(str(self.next_session))
+            sessions[session.id] = session
+            self.open_sessions += 1
+            return {"session": session.id, **session.state()}
+        if cmd == "stats":
+            return {"sessions": self.open_sessions, "workers": self.workers, "commands": self.metrics.summary()}
+
+        if cmd not in SESSION_COMMANDS:
+            raise ProtocolError(f"Unknown command: {cmd!r}")
+        session = self._session(request, sessions)
+        if cmd == "close":
+            await self._close_session(session, sessions)
+            return {"session": session.id}
+        if cmd == "best":
+            return await self._search(session, request)
+
+        turn = await session.turns.take()
+        try:
+            if cmd == "state":
+                pass
+            elif cmd == "move":
+                r, c = parse_square(request.get("move"), session.core.size)
+                if not session.core.make_move(r, c):
+                    raise ProtocolError(f"Illegal move: {request.get('move')!r}")
+            elif cmd == "pass":
+                if session.core.valid_moves():
+                    raise ProtocolError("Cannot pass while a move is available")
+                session.core.pass_turn()
+            elif cmd == "undo":
+                if not session.core.undo_move():
+                    raise ProtocolError("Nothing to undo")
+            return session.state()
+        finally:
+            TurnQueue.release(turn)
+
+    async def _search(self, session: Session, request: dict) -> dict:
+        """Runs the search on the worker pool; a timed-out search keeps its session's turn until it finishes"""
+        depth = int_field(request, "depth", 3, 1, MAX_DEPTH)
+        timeout = positive_field(request, "timeout", self.timeout)
+        play = bool_field(request, "play")
+        selective = bool_field(request, "selective")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        # The session's turn first, so later requests on it queue behind this one; then a slot in the
+        # bounded search queue. Neither wait goes past the request deadline.
+        turn = await session.turns.take(timeout)
+        try:
+            await asyncio.wait_for(self.search_slots.acquire(), max(0.0, deadline - loop.time()))
+        except BaseException:
+            TurnQueue.release(turn)
+            raise
+
+        def job():
+            move, score = session.core.get_best_move_score(depth, selective)
+            if play and move[0] >= 0:
+                session.core.make_move(*move)
+            return move, score, session.state() if play else {}
+
+        future = loop.run_in_executor(self.executor, job)
+
+        def finish(_):
+            TurnQueue.release(turn)
+            self.search_slots.release()
+        future.add_done_callback(finish)
+
+        done, _ = await asyncio.wait({future}, timeout=max(0.0, deadline - loop.time()))
+        if not done:
+            raise asyncio.TimeoutError()
+        move, score, state = future.result()
+        return {"move": square_name(move), "eval": score, **state}
+
+    async def _close_session(self, session: Session, sessions: Dict[str, Session]):
+        if sessions.pop(session.id, None) is None:
+            return
+        turn = await session.turns.take()
+        try:
+            session.core.close()
+        finally:
+            TurnQueue.release(turn)
+        self.open_sessions -= 1
+
+
+async def serve_stdio(server: EngineServer):
+    loop = asyncio.get_running_loop()
+
+    async def read_line() -> bytes:
+        return (await loop.run_in_executor(None, sys.stdin.buffer.readline))
+
+    async def write_line(response: dict):
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+    await server.serve_connection(read_line, write_line)
+
+
+async def serve_tcp(server: EngineServer, host: str, port: int):
+    async def on_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+
+        async def write_line(response: dict):
+            async with write_lock:
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+
+        try:
+            await server.serve_connection(reader.readline, write_line)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    tcp = await asyncio.start_server(on_client, host, port)
+    addresses = ", ".join(str(s.getsockname()) for s in tcp.sockets)
+    print(f"Engine server listening on {addresses}", file=sys.stderr)
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Reversi engine speaking JSON lines")
+    parser.add_argument("--tcp", action="store_true", help="listen on TCP instead of stdin/stdout")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent searches")
+    parser.add_argument("--max-queued", type=int, default=64, help="searches waiting for a worker")
+    parser.add_argument("--timeout", type=float, default=30.0, help="default per-request timeout in seconds")
+    parser.add_argument("--library", help="core library to load instead of the default search path")
+    parser.add_argument("--weights", help="evaluation weights file, applied to every session")
+    parser.add_argument("--probcut", help="ProbCut parameter file, applied to every session")
+    args = parser.parse_args()
+
+    if args.library:
+        load_library(args.library)
+    # Weights and ProbCut parameters are process-wide, so one core applies them to every session
+    with open_core() as core:
+        if args.weights and not core.load_eval_weights(args.weights):
+            parser.error(f"Could not load weights from {args.weights}")
+        if args.probcut and not core.load_probcut_params(args.probcut):
+            parser.error(f"Could not load ProbCut parameters from {args.probcut}")
+
+    server = EngineServer(args.workers, args.max_queued, args.timeout)
+    try:
+        if args.tcp:
+            asyncio.run(serve_tcp(server, args.host, args.port))
+        else:
+            asyncio.run(serve_stdio(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.metrics.summary()), file=sys.stderr)
+        server.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+# Bit (row * 8 + col) of a 64-bit mask is one square of the 8x8 board.
+# Every transform works on Python ints and on NumPy uint64 arrays alike.
+FULL = 0xFFFFFFFFFFFFFFFF
+
+
+def flip_vertical(x):
+    x = ((x >> 8) & 0x00FF00FF00FF00FF) | ((x & 0x00FF00FF00FF00FF) << 8)
+    x = ((x >> 16) & 0x0000FFFF0000FFFF) | ((x & 0x0000FFFF0000FFFF) << 16)
+    return ((x >> 32) | (x << 32)) & FULL
+
+
+def mirror_horizontal(x):
+    x = ((x >> 1) & 0x5555555555555555) | ((x & 0x5555555555555555) << 1)
+    x = ((x >> 2) & 0x3333333333333333) | ((x & 0x3333333333333333) << 2)
+    return ((x >> 4) & 0x0F0F0F0F0F0F0F0F) | ((x & 0x0F0F0F0F0F0F0F0F) << 4)
+
+
+def transpose(x):
+    t = 0x0F0F0F0F00000000 & (x ^ (x << 28))
+    x = x ^ t ^ (t >> 28)
+    t = 0x3333000033330000 & (x ^ (x << 14))
+    x = x ^ t ^ (t >> 14)
+    t = 0x5500550055005500 & (x ^ (x << 7))
+    return (x ^ t ^ (t >> 7)) & FULL
+
+
+def symmetries(x) -> List:
+    """The 8 images of x under the board's rotations and reflections, identity first"""
+    images = []
+    for base in (x, transpose(x)):
+        v = flip_vertical(base)
+        images.extend([base, mirror_horizontal(base), v, mirror_horizontal(v)])
+    return images
+
+
+def canonical(black: int, white: int) -> Tuple[int, int, int]:
+    """Smallest (black, white) image of a position and the index of the symmetry that produced it"""
+    best = None
+    for index, (b, w) in enumerate(zip(symmetries(black), symmetries(white))):
+        if best is None or (b, w) < best[:2]:
+            best = (b, w, index)
+    return best
+
+
+def canonical_batch(black: np.ndarray, white: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """canonical() for uint64 arrays of positions: smallest images and the symmetry index of each"""
+    blacks = np.stack(symmetries(black))
+    whites = np.stack(symmetries(white))
+    # Lexicographic minimum of (black, white): smallest white among the images with the smallest black
+    tied = blacks == blacks.min(axis=0)
+    index = np.where(tied, whites, np.uint64(FULL)).argmin(axis=0)
+    columns = np.arange(blacks.shape[1])
+    return blacks[index, columns], whites[index, columns], index
+
+
+def transform_square(row: int, col: int, index: int) -> Tuple[int, int]:
+    """Maps a square through symmetry number index of symmetries()"""
+    image = symmetries(1 << (row * 8 + col))[index]
+    sq = image.bit_length() - 1
+    return sq // 8, sq % 8
+
+
+def _inverse_indices() -> List[int]:
+    # {a1, b1} is mapped onto itself only by the identity, so it identifies each symmetry
+    probe = 0b11
+    images = symmetries(probe)
+    return [next(j for j in range(8) if symmetries(images[i])[j] == probe) for i in range(8)]
+
+
+INVERSE = _inverse_indices()
+
+
+def inverse(index: int) -> int:
+    """Index of the symmetry that undoes symmetry number index"""
+    return INVERSE[index]
@@ -0,0 +1,187 @@
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from services.core import ReversiCore
+
+
+# Checks the engine's exact (to the end of the game) search scores on small boards against an
+# independent memoised negamax: every position reachable on 4x4, random endgames on 6x6, or the
+# start position against the published perfect-play result. Scores are final disc differences
+# for the side to move; the engine reports a win as 10000 + difference and a loss as -10000 + difference.
+PERFECT_PLAY = {4: -8, 6: -4}  # black's disc difference from the start; 6x6: white wins 16-20 (Feinstein, 1993)
+WIN = 10000
+
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+_rays: Dict[int, List[List[List[int]]]] = {}
+
+
+def rays(size: int) -> List[List[List[int]]]:
+    """For every square, the bits of the squares along each direction, nearest first"""
+    if size not in _rays:
+        table = []
+        for sq in range(size * size):
+            r, c = divmod(sq, size)
+            lines = []
+            for dr, dc in DIRECTIONS:
+                line = []
+                rr, cc = r + dr, c + dc
+                while 0 <= rr < size and 0 <= cc < size:
+                    line.append(1 << (rr * size + cc))
+                    rr, cc = rr + dr, cc + dc
+                if len(line) >= 2:
+                    lines.append(line)
+            table.append(lines)
+        _rays[size] = table
+    return _rays[size]
+
+
+def legal_moves(own: int, opp: int, size: int) -> List[Tuple[int, int]]:
+    """(square bit, flipped discs) for every move of the side owning own"""
+    moves = []
+    table = rays(size)
+    empty = ~(own | opp) & ((1 << size * size) - 1)
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        flips = 0
+        for line in table[bit.bit_length() - 1]:
+            run = 0
+            for b in line:
+                if opp & b:
+                    run |= b
+                else:
+                    if run and own & b:
+                        flips |= run
+                    break
+        if flips:
+            moves.append((bit, flips))
+    return moves
+
+
+def reference_score(own: int, opp: int, size: int, memo: Dict[Tuple[int, int], int]) -> int:
+    """Final disc difference for the side owning own under perfect play"""
+    key = (own, opp)
+    if key in memo:
+        return memo[key]
+    moves = legal_moves(own, opp, size)
+    if moves:
+        score = max(-reference_score(opp ^ flips, own | bit | flips, size, memo) for bit, flips in moves)
+    elif legal_moves(opp, own, size):
+        score = -reference_score(opp, own, size, memo)
+    else:
+        score = bin(own).count("1") - bin(opp).count("1")
+    memo[key] = score
+    return score
+
+
+def engine_score(core: ReversiCore) -> int:
+    """The engine's exact score for the side to move: a full-width search one ply past the last empty square"""
+    if not core.valid_moves():
+        black, white = core.score()
+        if core.result() != 0:
+            return (black - white) * core.current_player()
+        core.pass_turn()
+        score = -engine_score(core)
+        core.undo_move()
+        return score
+    black, white = core.score()
+    _, score = core.get_best_move_score(core.size * core.size - black - white + 1)
+    if abs(score) > WIN // 2:
+        return score - WIN if score > 0 else score + WIN
+    return score
+
+
+def sides(core: ReversiCore) -> Tuple[int, int]:
+    black, white = core.bitboards()
+    return (black, white) if core.current_player() == 1 else (white, black)
+
+
+def check_position(core: ReversiCore, memo: Dict) -> Tuple[int, int]:
+    own, opp = sides(core)
+    return engine_score(core), reference_score(own, opp, core.size, memo)
+
+
+def check_all(core: ReversiCore, memo: Dict) -> Tuple[int, int]:
+    """Compares every position reachable from the current one; returns (positions, mismatches)"""
+    seen = set()
+    mismatches = 0
+
+    def visit():
+        nonlocal mismatches
+        key = (*core.bitboards(), core.current_player())
+        if key in seen or core.result() != 0:
+            return
+        seen.add(key)
+        engine, reference = check_position(core, memo)
+        if engine != reference:
+            mismatches += 1
+            print(f"Mismatch after {core.history()}: engine {engine:+d}, reference {reference:+d}")
+        moves = core.valid_moves()
+        if not moves:
+            core.pass_turn()
+            visit()
+            core.undo_move()
+        for r, c in moves:
+            core.make_move(r, c)
+            visit()
+            core.undo_move()
+
+    visit()
+    return len(seen), mismatches
+
+
+def check_random(core: ReversiCore, memo: Dict, positions: int, empties: int, seed: int) -> Tuple[int, int]:
+    """Compares positions with the given number of empty squares, reached by random play"""
+    rng = random.Random(seed)
+    checked = mismatches = 0
+    while checked < positions:
+        core.reset()
+        while core.result() == 0 and sum(core.score()) < core.size * core.size - empties:
+            moves = core.valid_moves()
+            if moves:
+                core.make_move(*rng.choice(moves))
+            else:
+                core.pass_turn()
+        if core.result() != 0:
+            continue
+        engine, reference = check_position(core, memo)
+        checked += 1
+        if engine != reference:
+            mismatches += 1
+            print(f"Mismatch after {core.history()}: engine {engine:+d}, reference {reference:+d}")
+    return checked, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check exact engine scores on small boards against a reference solver")
+    parser.add_argument("--size", type=int, default=4, choices=(4, 6))
+    parser.add_argument("--start", action="store_true",
+                        help="solve the start position with the engine and compare with the known result "
+                             "(seconds on 4x4; 6x6 is far beyond a full-width search without move ordering)")
+    parser.add_argument("--positions", type=int, default=50, help="random positions (6x6)")
+    parser.add_argument("--empties", type=int, default=10, help="empty squares in the random positions (6x6)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.time()
+    memo: Dict[Tuple[int, int], int] = {}
+    with ReversiCore(size=args.size) as core:
+        if args.start:
+            score = engine_score(core)
+            ok = score == PERFECT_PLAY[args.size]
+            print(f"{args.size}x{args.size} start: engine {score:+d}, perfect play {PERFECT_PLAY[args.size]:+d} "
+                  f"({'ok' if ok else 'MISMATCH'}, {time.time() - start:.1f}s)")
+            return
+        if args.size == 4:
+            checked, mismatches = check_all(core, memo)
+            label = "reachable 4x4 positions"
+        else:
+            checked, mismatches = check_random(core, memo, args.positions, args.empties, args.seed)
+            label = f"random 6x6 positions with {args.empties} empties"
+    print(f"{checked} {label}: {mismatches} mismatches ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from services.openings import default_openings, load_openings
+
+
+# Gates an engine change: a candidate plays a baseline in colour-swapped pairs of games from a fixed
+# opening suite, games run in parallel, and a sequential probability ratio test on the pair scores
+# stops the match as soon as "candidate is elo1 stronger" or "no better than elo0" is conclusive.
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+PAIR_SCORES = (0.0, 0.25, 0.5, 0.75, 1.0)  # candidate's share of a pair: 0, 1/2, 1, 3/2 or 2 points of 2
+PRIOR = 1e-3
+
+
+@dataclass
+class EngineSpec:
+    """One side of the match: search settings plus the library and parameter files its process loads"""
+    name: str
+    depth: int = 3
+    selective: bool = False
+    library: Optional[str] = None
+    weights: Optional[str] = None
+    probcut: Optional[str] = None
+
+    def server_args(self) -> List[str]:
+        args = [sys.executable, "-m", "services.server", "--workers", "1"]
+        for option, value in (("--library", self.library), ("--weights", self.weights), ("--probcut", self.probcut)):
+            if value:
+                args += [option, os.path.abspath(value)]
+        return args
+
+
+def parse_spec(name: str, text: str) -> EngineSpec:
+    """Parses "depth=5,selective=1,weights=eval_weights.txt" style engine descriptions"""
+    spec = EngineSpec(name)
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        if key == "depth":
+            spec.depth = int(value)
+        elif key == "selective":
+            spec.selective = value.lower() in ("1", "true", "yes")
+        elif key in ("library", "weights", "probcut"):
+            setattr(spec, key, value)
+        else:
+            raise ValueError(f"Unknown engine option {key!r} in {text!r}")
+    return spec
+
+
+class EngineProcess:
+    """A headless engine server on stdin/stdout, owned by one match worker"""
+
+    def __init__(self, spec: EngineSpec):
+        self.spec = spec
+        self.proc = subprocess.Popen(spec.server_args(), cwd=PYTHON_DIR, stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self.next_id = 0
+
+    def request(self, cmd: str, **fields) -> dict:
+        self.next_id += 1
+        self.proc.stdin.write(json.dumps({"id": self.next_id, "cmd": cmd, **fields}) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Engine {self.spec.name} exited")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"Engine {self.spec.name}: {response.get('error')}")
+        return response
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def play_game(black: EngineProcess, white: EngineProcess, opening: List[Tuple[int, int]]) -> int:
+    """Plays one game from an opening; returns 1 black win, -1 white win, 2 draw"""
+    engines = {1: black, -1: white}
+    sessions = {color: engine.request("new")["session"] for color, engine in engines.items()}
+
+    def both(cmd: str, **fields) -> dict:
+        state = None
+        for color, engine in engines.items():
+            state = engine.request(cmd, session=sessions[color], **fields)
+        return state
+
+    state = engines[1].request("state", session=sessions[1])
+    for r, c in opening:
+        state = both("move", move=[r, c])
+    while state["result"] == 0:
+        if not state["moves"]:
+            state = both("pass")
+            continue
+        engine = engines[state["to_move"]]
+        reply = engine.request("best", session=sessions[state["to_move"]], depth=engine.spec.depth,
+                               selective=engine.spec.selective)
+        state = both("move", move=reply["move"])
+    for color, engine in engines.items():
+        engine.request("close", session=sessions[color])
+    return state["result"]
+
+
+def candidate_points(result: int, candidate_color: int) -> float:
+    if result == 2:
+        return 0.5
+    return 1.0 if result == candidate_color else 0.0
+
+
+class SPRT:
+    """Normal-approximation GSPRT on colour-swapped pair scores (pentanomial model), logistic Elo"""
+
+    def __init__(self, elo0: float, elo1: float, alpha: float, beta: float):
+        self.s0 = self.expected_score(elo0)
+        self.s1 = self.expected_score(elo1)
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.counts = [0] * len(PAIR_SCORES)
+
+    @staticmethod
+    def expected_score(elo: float) -> float:
+        return 1 / (1 + 10 ** (-elo / 400))
+
+    def add_pair(self, points: float):
+        self.counts[int(round(points * 2))] += 1
+
+    def _moments(self) -> Tuple[int, float, float]:
+        n = sum(self.counts)
+        if n == 0:
+            return 0, 0.5, 0.0
+        # A small prior on every outcome keeps the variance positive when all pairs agree
+        # (identical engines split every pair 1-1)
+        counts = [c + PRIOR for c in self.counts]
+        total = sum(counts)
+        mean = sum(c * s for c, s in zip(counts, PAIR_SCORES)) / total
+        var = sum(c * (s - mean) ** 2 for c, s in zip(counts, PAIR_SCORES)) / total
+        return n, mean, var
+
+    def llr(self) -> float:
+        n, mean, var = self._moments()
+        if n == 0:
+            return 0.0
+        return n * (self.s1 - self.s0) * (2 * mean - self.s0 - self.s1) / (2 * var)
+
+    def verdict(self) -> Optional[str]:
+        llr = self.llr()
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+    def elo(self) -> Tuple[float, float]:
+        """Elo estimate and its 95% error margin from the pair scores"""
+        n, mean, var = self._moments()
+        if n == 0:
+            return 0.0, 0.0
+
+        def to_elo(score: float) -> float:
+            score = min(max(score, 1e-6), 1 - 1e-6)
+            return -400 * math.log10(1 / score - 1)
+
+        margin = 1.96 * math.sqrt(var / n)
+        return to_elo(mean), (to_elo(mean + margin) - to_elo(mean - margin)) / 2
+
+
+class Match:
+    def __init__(self, candidate: EngineSpec, baseline: EngineSpec, openings, sprt: SPRT, max_pairs: int):
+        self.candidate = candidate
+        self.baseline = baseline
+        self.openings = openings
+        self.sprt = sprt
+        self.max_pairs = min(max_pairs, len(openings))
+        self.lock = threading.Lock()
+        self.next_pair = 0
+        self.games = {"win": 0, "draw": 0, "loss": 0}
+        self.verdict: Optional[str] = None
+        self.started = time.time()
+
+    def _take_pair(self) -> Optional[int]:
+        with self.lock:
+            if self.verdict is not None or self.next_pair >= self.max_pairs:
+                return None
+            self.next_pair += 1
+            return self.next_pair - 1
+
+    def worker(self):
+        candidate, baseline = EngineProcess(self.candidate), EngineProcess(self.baseline)
+        try:
+            while True:
+                index = self._take_pair()
+                if index is None:
+                    break
+                opening = self.openings[index]
+                # The same opening with colours swapped cancels most of the opening's own bias
+                first = candidate_points(play_game(candidate, baseline, opening), 1)
+                second = candidate_points(play_game(baseline, candidate, opening), -1)
+                self._record(first, second)
+        finally:
+            candidate.close()
+            baseline.close()
+
+    def _record(self, first: float, second: float):
+        with self.lock:
+            for points in (first, second):
+                self.games["win" if points == 1 else "draw" if points == 0.5 else "loss"] += 1
+            self.sprt.add_pair(first + second)
+            if self.verdict is None:
+                self.verdict = self.sprt.verdict()
+            elo, margin = self.sprt.elo()
+            pairs = sum(self.sprt.counts)
+            print(f"pairs {pairs}: +{self.games['win']} ={self.games['draw']} -{self.games['loss']}  "
+                  f"elo {elo:+.1f} ±{margin:.1f}  LLR {self.sprt.llr():+.2f} "
+                  f"({self.sprt.lower:.2f}, {self.sprt.upper:.2f})  {time.time() - self.started:.0f}s", flush=True)
+
+    def run(self, workers: int) -> Optional[str]:
+        threads = [threading.Thread(target=self.worker, daemon=True) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.verdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPRT match of a candidate engine against a baseline")
+    parser.add_argument("--candidate", default="", help='e.g. "depth=5,selective=1,weights=new_weights.txt"')
+    parser.add_argument("--baseline", default="", help="same options as --candidate")
+    parser.add_argument("--openings", help="opening suite, one transcript per line (default: all 6-ply lines)")
+    parser.add_argument("--opening-plies", type=int, default=6)
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=15.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-pairs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    candidate = parse_spec("candidate", args.candidate)
+    baseline = parse_spec("baseline", args.baseline)
+    openings = load_openings(args.openings) if args.openings else default_openings(args.opening_plies)
+    sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+    print(f"{candidate} vs {baseline}: {len(openings)} openings, H0 elo {args.elo0}, H1 elo {args.elo1}")
+
+    verdict = Match(candidate, baseline, openings, sprt, args.max_pairs).run(args.workers)
+    if verdict == "H1":
+        print("PASS: candidate is stronger")
+        sys.exit(0)
+    if verdict == "H0":
+        print("FAIL: candidate is not stronger")
+        sys.exit(1)
+    print("INCONCLUSIVE: opening suite or pair limit exhausted")
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
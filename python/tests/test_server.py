@@ -0,0 +1,54 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.server import EngineServer  # noqa: E402
+
+START_MOVES = {"d3", "c4", "f5", "e6"}
+
+
+def run_lines(requests):
+    """Feeds the requests to one connection back to back and returns the responses by id"""
+    lines = [json.dumps(r).encode() + b"\n" for r in requests] + [b""]
+    responses = {}
+
+    async def read_line():
+        return lines.pop(0)
+
+    async def write_line(response):
+        responses[response["id"]] = response
+
+    server = EngineServer(workers=2, max_queued=4, timeout=30.0)
+    try:
+        asyncio.run(server.serve_connection(read_line, write_line))
+    finally:
+        server.executor.shutdown(wait=True)
+    return responses
+
+
+def test_search_answers_the_position_it_was_sent_for():
+    responses = run_lines([
+        {"id": 1, "cmd": "new"},
+        {"id": 2, "cmd": "best", "session": "1", "depth": 3},
+        {"id": 3, "cmd": "move", "session": "1", "move": "d3"},
+    ])
+    assert responses[2]["ok"] and responses[2]["move"] in START_MOVES
+    assert responses[3]["ok"] and responses[3]["ply"] == 1
+
+
+def test_played_search_comes_before_a_later_move():
+    responses = run_lines([
+        {"id": 1, "cmd": "new"},
+        {"id": 2, "cmd": "best", "session": "1", "depth": 3, "play": True},
+        {"id": 3, "cmd": "state", "session": "1"},
+    ])
+    assert responses[2]["ok"] and responses[2]["ply"] == 1
+    assert responses[3]["ply"] == 1 and responses[3]["to_move"] == -1
+
+
+def test_unknown_command_is_reported_before_the_session():
+    responses = run_lines([{"id": 1, "cmd": "bogus"}])
+    assert not responses[1]["ok"] and "Unknown command" in responses[1]["error"]
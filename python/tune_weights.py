@@ -0,0 +1,136 @@
+import argparse
+import glob
+import json
+import os
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from generate_selfplay import POSITION_DTYPE
+from services.bitboard import mobility, popcount
+from services.symmetry import symmetries
+
+
+# Square weights are tied under the 8 board symmetries (10 classes on 8x8), plus one mobility weight
+def square_classes() -> List[int]:
+    """Class masks: squares that are images of each other under board symmetry share a weight"""
+    seen = 0
+    classes = []
+    for sq in range(64):
+        if seen >> sq & 1:
+            continue
+        mask = 0
+        for image in symmetries(1 << sq):
+            mask |= image
+        seen |= mask
+        classes.append(mask)
+    return classes
+
+
+CLASSES = square_classes()
+
+
+def features(chunk: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Features from the side to move's point of view and the game outcome target (1 win, 0.5 draw, 0 loss)"""
+    black_to_move = chunk["side"] == 1
+    own = np.where(black_to_move, chunk["black"], chunk["white"])
+    opp = np.where(black_to_move, chunk["white"], chunk["black"])
+    x = np.empty((len(chunk), len(CLASSES) + 1), dtype=np.int8)
+    for i, mask in enumerate(CLASSES):
+        m = np.uint64(mask)
+        x[:, i] = popcount(own & m) - popcount(opp & m)
+    x[:, -1] = mobility(own, opp) - mobility(opp, own)
+    outcome = np.sign(chunk["result"].astype(np.int32) * chunk["side"])
+    y = (outcome + 1).astype(np.float32) / 2
+    return x, y
+
+
+def load_dataset(data_dir: str, chunk_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Streams every completed shard through the feature extractor; only the compact features stay in memory"""
+    xs, ys = [], []
+    for meta_path in sorted(glob.glob(os.path.join(data_dir, "shard_*.json"))):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if not meta.get("complete"):
+            continue
+        data = np.load(meta_path[:-len(".json")] + ".npy", mmap_mode="r")[:meta["positions"]]
+        if data.dtype != POSITION_DTYPE:
+            raise ValueError(f"{meta_path}: unexpected position format")
+        for start in range(0, len(data), chunk_size):
+            x, y = features(np.asarray(data[start:start + chunk_size]))
+            xs.append(x)
+            ys.append(y)
+    if not xs:
+        raise RuntimeError(f"No complete shards found in {data_dir}")
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+def fit(x: np.ndarray, y: np.ndarray, iterations: int, ridge: float, chunk_size: int) -> np.ndarray:
+    """Logistic regression of outcome on features by Newton's method, in chunks to bound memory"""
+    n, d = x.shape
+    w = np.zeros(d)
+    for it in range(iterations):
+        grad = np.zeros(d)
+        hess = np.zeros((d, d))
+        loss = 0.0
+        for start in range(0, n, chunk_size):
+            xc = x[start:start + chunk_size].astype(np.float64)
+            yc = y[start:start + chunk_size]
+            p = 1.0 / (1.0 + np.exp(-(xc @ w)))
+            grad += xc.T @ (p - yc)
+            hess += (xc * (p * (1 - p))[:, None]).T @ xc
+            p = np.clip(p, 1e-12, 1 - 1e-12)
+            loss -= np.sum(yc * np.log(p) + (1 - yc) * np.log(1 - p))
+        grad += ridge * w
+        hess += ridge * np.eye(d)
+        step = np.linalg.solve(hess, grad)
+        w -= step
+        print(f"Iteration {it + 1}: loss {loss / n:.5f}")
+        if np.max(np.abs(step)) < 1e-6:
+            break
+    return w
+
+
+def to_engine_weights(w: np.ndarray, corner_value: int) -> Tuple[List[int], int]:
+    """Scales the fitted logit weights to integers, with the largest square weight equal to corner_value"""
+    scale = corner_value / max(np.max(np.abs(w[:-1])), 1e-9)
+    squares = [0] * 64
+    for mask, value in zip(CLASSES, w[:-1]):
+        for sq in range(64):
+            if mask >> sq & 1:
+                squares[sq] = int(round(value * scale))
+    return squares, int(round(w[-1] * scale))
+
+
+def write_weights(path: str, squares: List[int], mobility_weight: int, positions: int):
+    with open(path, "w") as f:
+        f.write(f"# Reversi evaluation weights, tuned on {positions} positions\n")
+        f.write("# 8 rows of square weights, then the mobility weight\n")
+        for r in range(8):
+            f.write(" ".join(f"{v:4d}" for v in squares[r * 8:r * 8 + 8]) + "\n")
+        f.write(f"{mobility_weight}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit evaluation weights to self-play outcomes (Texel-style)")
+    parser.add_argument("data_dir", help="directory written by generate_selfplay.py")
+    parser.add_argument("out", help="weights file for ReversiCore.load_eval_weights")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--ridge", type=float, default=1.0)
+    parser.add_argument("--corner-value", type=int, default=120)
+    parser.add_argument("--chunk-size", type=int, default=1 << 20)
+    args = parser.parse_args()
+
+    start = time.time()
+    x, y = load_dataset(args.data_dir, args.chunk_size)
+    print(f"Extracted features of {len(x)} positions in {time.time() - start:.1f}s")
+
+    w = fit(x, y, args.iterations, args.ridge, args.chunk_size)
+    squares, mobility_weight = to_engine_weights(w, args.corner_value)
+    write_weights(args.out, squares, mobility_weight, len(x))
+    print(f"Wrote {args.out} in {time.time() - start:.1f}s total")
+
+
+if __name__ == "__main__":
+    main()
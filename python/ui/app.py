@@ -0,0 +1,114 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+
+WINDOW_SIZE = 720
+FONT_NAME = "segoeui"
+
+# Possible Rocky Balboa file names
+MUSIC_NAMES = [
+    "gonna_fly_now.mp3",
+    "rocky_theme.mp3",
+    "rocky.mp3",
+    "rocky_balboa.mp3",
+    "theme.mp3"
+]
+
+
+def find_music_file() -> Optional[str]:
+    """Searches for the Rocky Balboa music file for the game"""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    music_dir = os.path.join(base_dir, "music")
+
+    # Create directory if not exists
+    if not os.path.exists(music_dir):
+        os.makedirs(music_dir, exist_ok=True)
+
+    for name in MUSIC_NAMES:
+        path = os.path.join(music_dir, name)
+        if os.path.exists(path):
+            return path
+
+    # Also search in the project root directory
+    project_root = os.path.dirname(os.path.dirname(base_dir))
+    for name in MUSIC_NAMES:
+        path = os.path.join(project_root, name)
+        if os.path.exists(path):
+            return path
+
+    return None
+
+
+class App:
+    """Owns the window, mixer, fonts and music for the whole session, shared by every screen"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        pygame.display.init()
+        pygame.font.init()
+        try:
+            pygame.mixer.init()
+            self.audio = True
+        except pygame.error:
+            self.audio = False
+        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+
+        self.font_paths: Dict[bool, Optional[str]] = {}
+        self.fonts: Dict[Tuple[int, bool], pygame.font.Font] = {}
+
+        self.music_path = find_music_file() if self.audio else None
+        self.music_loaded = False
+        self.music_playing = False
+
+        # Latency reporting: time from a switch request to the first presented frame
+        self.pending_switch: Optional[Tuple[str, float]] = ("startup", started_at or time.perf_counter())
+        self.timings: Dict[str, float] = {}
+
+    def font(self, size: int, bold: bool = False) -> pygame.font.Font:
+        """Cached font; the system font lookup runs once per style instead of once per screen"""
+        key = (size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            if bold not in self.font_paths:
+                self.font_paths[bold] = pygame.font.match_font(FONT_NAME, bold=bold)
+            path = self.font_paths[bold]
+            font = pygame.font.Font(path, size)
+            if bold and path is None:
+                font.set_bold(True)
+            self.fonts[key] = font
+        return font
+
+    def play_music(self, volume: float):
+        if not self.music_path:
+            return
+        if not self.music_loaded:
+            pygame.mixer.music.load(self.music_path)
+            self.music_loaded = True
+        pygame.mixer.music.set_volume(volume)
+        if not self.music_playing:
+            pygame.mixer.music.play(-1)  # -1 = loop
+            self.music_playing = True
+
+    def stop_music(self):
+        if self.music_playing:
+            pygame.mixer.music.stop()
+            self.music_playing = False
+
+    def set_volume(self, volume: float):
+        if self.audio:
+            pygame.mixer.music.set_volume(volume)
+
+    def begin_switch(self, screen_name: str):
+        self.pending_switch = (screen_name, time.perf_counter())
+
+    def present(self):
+        """Flips the display and reports the latency of a pending startup or screen switch"""
+        pygame.display.flip()
+        if self.pending_switch is not None:
+            name, started = self.pending_switch
+            self.pending_switch = None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.timings[name] = elapsed_ms
+            print(f"[app] {name} ready in {elapsed_ms:.1f} ms")
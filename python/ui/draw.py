@@ -57,17 +57,70 @@ def draw_hints(surface: pygame.Surface, moves: List[Tuple[int, int]], size: int,
         pygame.draw.circle(surface, color, (cx, cy), 5)
 
 
-def draw_hover(surface: pygame.Surface, hover_cell: Optional[Tuple[int, int]], valid_moves: List[Tuple[int, int]],
-               cell: int, margin: int):
+def draw_hover(surface: pygame.Surface, hover_cell: Optional[Tuple[int, int]],
+               flip_previews: Dict[Tuple[int, int], List[Tuple[int, int]]], cell: int, margin: int):
     if not hover_cell:
         return
-    r, c = hover_cell
-    if (r, c) not in valid_moves:
+    flipped = flip_previews.get(hover_cell)
+    if flipped is None:
         return
+    r, c = hover_cell
     overlay = pygame.Surface((cell, cell), pygame.SRCALPHA)
     import pygame as pg
     pg.draw.circle(overlay, (255, 255, 255, 40), (cell // 2, cell // 2), cell // 2 - 8)
     surface.blit(overlay, (margin + c * cell, margin + r * cell))
+    # Mark the discs that this move would flip
+    for (fr, fc) in flipped:
+        cx = margin + fc * cell + cell // 2
+        cy = margin + fr * cell + cell // 2
+        pg.draw.circle(surface, (255, 215, 0), (cx, cy), cell // 2 - 10, 2)
+
+
+def build_hint_heatmap(move_evals: Dict[Tuple[int, int], Tuple[int, str, Tuple[int, int, int]]],
+                       size: int, cell: int) -> pygame.Surface:
+    """Renders the per-turn move evaluations once, so drawing them is a single blit"""
+    heatmap = pygame.Surface((cell * size, cell * size), pygame.SRCALPHA)
+    for (r, c), (_score, _label, color) in move_evals.items():
+        tile = pygame.Rect(c * cell + 2, r * cell + 2, cell - 4, cell - 4)
+        pygame.draw.rect(heatmap, (*color, 90), tile, border_radius=6)
+    return heatmap
+
+
+def draw_ranked_hints(surface: pygame.Surface, text_font: pygame.font.Font,
+                      ranked: List[Tuple[Tuple[int, int], int]], cell: int, margin: int,
+                      color=(255, 235, 120)):
+    """Numbers the engine's top moves, 1 being the best"""
+    for rank, ((r, c), _score) in enumerate(ranked, start=1):
+        s = text_font.render(str(rank), True, color)
+        rect = s.get_rect(center=(margin + c * cell + cell // 2, margin + r * cell + cell // 2))
+        surface.blit(s, rect)
+
+
+def draw_review(surface: pygame.Surface, text_font: pygame.font.Font, size_px: int, cell: int, margin: int,
+                review, best_color=(90, 220, 120), played_color=(235, 90, 80)):
+    """Marks the engine's move and, if it scores worse, the move played, with the review line below the board"""
+    for (r, c), color in ((review.best, best_color), (review.played, played_color)):
+        if color is played_color and review.loss <= 0:
+            continue
+        rect = pygame.Rect(margin + c * cell + 4, margin + r * cell + 4, cell - 8, cell - 8)
+        pygame.draw.rect(surface, color, rect, 3, border_radius=6)
+    color = best_color if review.loss <= 0 else played_color
+    s = text_font.render(f"{review.describe()}   loss {review.loss}", True, color)
+    surface.blit(s, (size_px - margin - s.get_width(), size_px - margin - 48))
+
+
+def draw_archive_stats(surface: pygame.Surface, text_font: pygame.font.Font, small_font: pygame.font.Font,
+                       size_px: int, cell: int, margin: int, stats, color=(150, 200, 255)):
+    """Outcomes of archived games through this position, and how often each next move was played"""
+    for (r, c), count in stats.next_moves:
+        s = small_font.render(str(count), True, color)
+        surface.blit(s, s.get_rect(bottomright=(margin + (c + 1) * cell - 4, margin + (r + 1) * cell - 2)))
+    if stats.games:
+        text = f"Archive: {stats.games} games   Black {stats.black_wins}  White {stats.white_wins}  Draws {stats.draws}"
+    else:
+        text = "Archive: no games reached this position"
+    s = text_font.render(text, True, color)
+    surface.blit(s, (margin, size_px - margin - 72))
 
 
 def draw_last_move(surface: pygame.Surface, last_move: Optional[Tuple[int, int]], cell: int, margin: int,
@@ -87,6 +140,11 @@ def draw_hud(surface: pygame.Surface, text_font: pygame.font.Font, size: Tuple[i
     surface.blit(s, (margin, size[1] - margin - 24))
 
 
+def draw_help(surface: pygame.Surface, text_font: pygame.font.Font, margin: int, text: str):
+    s = text_font.render(text, True, (150, 150, 150))
+    surface.blit(s, (margin, (margin - s.get_height()) // 2))
+
+
 
 def draw_trophy(surface: pygame.Surface, center: Tuple[int, int], color=(255, 215, 0)):
     import pygame as pg
@@ -148,7 +206,7 @@ def draw_statistics(surface: pygame.Surface, size_px: int, font: pygame.font.Fon
 
 def draw_endgame(surface: pygame.Surface, size_px: int, big_font: pygame.font.Font, font: pygame.font.Font,
                  result: int, time_offset: float = 0.0, confetti_particles: Optional[List] = None, 
-                 black_score: int = 0, white_score: int = 0):
+                 black_score: int = 0, white_score: int = 0, review_text: Optional[str] = None):
     # Fade in animation
     elapsed = time.time() - time_offset if time_offset > 0 else 0
     fade_progress = min(1.0, elapsed / 0.5)  # Fade in in 0.5 seconds
@@ -190,6 +248,11 @@ def draw_endgame(surface: pygame.Surface, size_px: int, big_font: pygame.font.Fo
     tip_s.set_alpha(title_alpha)
     tip_rect = tip_s.get_rect(center=(size_px // 2, size_px // 2 + 36))
     surface.blit(tip_s, tip_rect)
+
+    if review_text:
+        review_s = font.render(review_text, True, (200, 220, 255))
+        review_s.set_alpha(title_alpha)
+        surface.blit(review_s, review_s.get_rect(center=(size_px // 2, size_px // 2 + 64)))
     
     # Draw statistics (cool feature!)
     if result != 2:
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 
 def evaluate_move(row: int, col: int, before: List[int], after: List[int], player: int, size: int):
@@ -9,7 +9,16 @@ def evaluate_move(row: int, col: int, before: List[int], after: List[int], playe
             ai = after[r * size + c]
             if ai == player and bi != player:
                 flips += 1
+    return score_move(row, col, flips, after, size)
 
+
+def evaluate_previews(previews, board: List[int], size: int) -> Dict[Tuple[int, int], Tuple[int, str, Tuple[int, int, int]]]:
+    """Evaluates every previewed move of the turn without playing it"""
+    return {move: score_move(move[0], move[1], count + 1, board, size) for move, _mask, count in previews}
+
+
+def score_move(row: int, col: int, flips: int, board: List[int], size: int):
+    """flips counts every disc the mover gains, the placed one included"""
     corners = {(0, 0), (0, size - 1), (size - 1, 0), (size - 1, size - 1)}
     corner_bonus = 25 if (row, col) in corners else 0
 
@@ -27,7 +36,7 @@ def evaluate_move(row: int, col: int, before: List[int], after: List[int], playe
                 continue
             rr, cc = row + dr, col + dc
             if 0 <= rr < size and 0 <= cc < size:
-                if after[rr * size + cc] == 0:
+                if board[rr * size + cc] == 0:
                     empties_adj += 1
     frontier_penalty = -empties_adj // 3
 
@@ -1,34 +1,43 @@
+import os
 import pygame
 import time
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List
 
 from services.core import ReversiCore
+from ui.app import App, WINDOW_SIZE
+from services.records import GameRecord, GameRecordWriter
+from services.position_index import PositionIndex, PositionStats
+from services.review import GameReview
 from ui.animation import new_animation, is_active
-from ui.eval import evaluate_move
+from ui.eval import evaluate_previews
 from ui.draw import (
     draw_board, draw_discs, draw_hints, draw_hover, draw_last_move,
-    draw_hud, draw_endgame
+    draw_hud, draw_help, draw_endgame, build_hint_heatmap, draw_ranked_hints, draw_review,
+    draw_archive_stats
 )
 
 
-WINDOW_SIZE = 720
 BOARD_MARGIN = 28
 BG_COLOR = (22, 24, 27)
+RANKED_HINTS = 3
+REVIEW_DEPTH = 5
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "records", "games.rvgr")
 
 
 class GameUI:
-    def __init__(self, core: ReversiCore, music_enabled: bool = True, volume: float = 0.7, game_mode: str = "pvp", difficulty: int = 3):
-        pygame.init()
+    def __init__(self, core: ReversiCore, app: App, music_enabled: bool = True, volume: float = 0.7, game_mode: str = "pvp", difficulty: int = 3):
+        self.app = app
         self.core = core
         self.game_mode = game_mode
         self.difficulty = difficulty
         self.size = core.size
         self.size = core.size
         self.cell = (WINDOW_SIZE - 2 * BOARD_MARGIN) // self.size
-        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+        self.screen = app.screen
         pygame.display.set_caption("Reversi (C++ core + Python GUI)")
-        self.font = pygame.font.SysFont("segoeui", 20)
-        self.big_font = pygame.font.SysFont("segoeui", 36, bold=True)
+        self.font = app.font(20)
+        self.big_font = app.font(36, bold=True)
+        self.small_font = app.font(15)
         
         # Music settings
         self.music_enabled = music_enabled
@@ -40,9 +49,28 @@ class GameUI:
         self.animations = []
         self.anim_duration = 0.18
         self.last_move: Optional[Tuple[int, int]] = None
+        self.record_saved = False
         self.hover_cell: Optional[Tuple[int, int]] = None
         self.game_over_cached: Optional[int] = None
 
+        # Per-turn move previews and history, recomputed only when the position changes
+        self.ply = 0
+        self.history: List[Optional[Tuple[int, int]]] = []
+        self.valid_moves: List[Tuple[int, int]] = []
+        self.flip_previews: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self.move_evals: Dict[Tuple[int, int], Tuple[int, str, Tuple[int, int, int]]] = {}
+        self.heatmap: Optional[pygame.Surface] = None
+        self.show_heatmap = False
+        # Engine-ranked hints, one multi-move search per turn while enabled
+        self.ranked_hints: List[Tuple[Tuple[int, int], int]] = []
+        self.show_ranked = False
+        # Post-game review of the finished game, filled in by a background search pool
+        self.review: Optional[GameReview] = None
+        # Archived games through the current position, looked up per turn while enabled
+        self.position_index: Optional[PositionIndex] = None
+        self.archive_stats: Optional[PositionStats] = None
+        self.show_archive = False
+
         self.last_eval_text: Optional[str] = None
         self.last_eval_color = (255, 255, 255)
         self.last_eval_time = 0.0
@@ -56,31 +84,7 @@ class GameUI:
         """Initializes music for the game"""
         if not self.music_enabled:
             return
-        
-        import os
-        # Search for music files
-        possible_names = [
-            "gonna_fly_now.mp3",
-            "rocky_theme.mp3",
-            "rocky.mp3",
-            "rocky_balboa.mp3",
-            "theme.mp3"
-        ]
-        
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        music_dir = os.path.join(base_dir, "music")
-        
-        music_path = None
-        for name in possible_names:
-            path = os.path.join(music_dir, name)
-            if os.path.exists(path):
-                music_path = path
-                break
-        
-        if music_path:
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.set_volume(self.volume)
-            pygame.mixer.music.play(-1)  # Loop
+        self.app.play_music(self.volume)
 
     def run(self) -> bool:
         clock = pygame.time.Clock()
@@ -97,7 +101,8 @@ class GameUI:
         while running:
             # AI Logic
             current_player = self.core.current_player() # 1: Black, -1: White
-            is_ai_turn = (self.game_mode == 'pvc' and current_player == -1)
+            # The AI waits while the user is looking at an earlier position
+            is_ai_turn = (self.game_mode == 'pvc' and current_player == -1 and self.ply == len(self.history))
             
             # If it's AI turn
             if is_ai_turn and not self._is_game_over():
@@ -108,7 +113,7 @@ class GameUI:
                 if current_time >= ai_timer:
                     # Draw "Thinking..."
                     self._draw(thinking=True)
-                    pygame.display.flip()
+                    self.app.present()
                     
                     # Execute move
                     r, c = self.core.get_best_move(self.difficulty)
@@ -134,14 +139,39 @@ class GameUI:
                         elif event.key == pygame.K_m:
                             running = False
                             should_continue = True
+                        elif event.key == pygame.K_h:
+                            self.show_heatmap = not self.show_heatmap
+                        elif event.key == pygame.K_t:
+                            self.show_ranked = not self.show_ranked
+                            self._refresh_ranked_hints()
+                        elif event.key == pygame.K_g:
+                            self.show_archive = not self.show_archive
+                            self._refresh_archive_stats()
+                        elif event.key == pygame.K_z:
+                            self._undo()
+                        elif event.key == pygame.K_y:
+                            self._redo()
+                        elif event.key == pygame.K_LEFT:
+                            self._scrub(-1)
+                        elif event.key == pygame.K_RIGHT:
+                            self._scrub(1)
+                        elif event.key == pygame.K_HOME:
+                            self._jump_to_ply(0)
+                        elif event.key == pygame.K_END:
+                            self._jump_to_ply(len(self.history))
                     elif event.type == pygame.MOUSEMOTION:
                         self._handle_hover(event.pos)
 
+            if self.review is not None:
+                self.review.poll()
             self._draw(thinking=(is_ai_turn and ai_timer != 0))
-            pygame.display.flip()
+            self.app.present()
             clock.tick(60)
 
-        pygame.mixer.music.stop()
+        self._close_review()
+        if self.position_index is not None:
+            self.position_index.close()
+        self.app.stop_music()
         return should_continue
 
     def _reset(self):
@@ -150,16 +180,20 @@ class GameUI:
         self.board = self.core.get_board()
         self.animations.clear()
         self.last_move = None
+        self.record_saved = False
         self.game_over_cached = None
         self.game_over_time = None
         self.last_eval_text = None
         self.confetti_particles.clear()
+        self._close_review()
         # Check initial state - are there moves
         self._check_and_auto_pass()
 
     def _handle_click(self, pos: Tuple[int, int]):
         if self._is_game_over():
             return
+        if self.game_mode == 'pvc' and self.core.current_player() == -1:
+            return
         x, y = pos
         col = (x - BOARD_MARGIN) // self.cell
         row = (y - BOARD_MARGIN) // self.cell
@@ -170,6 +204,7 @@ class GameUI:
     def _apply_move(self, row, col):
         current_before = self.core.current_player()
         before = self.core.get_board()
+        evaluation = self.move_evals.get((row, col))
         
         if not self.core.make_move(row, col):
             return
@@ -178,6 +213,7 @@ class GameUI:
         self.prev_board = before
         self.board = after
         self.last_move = (row, col)
+        self.record_saved = False
         
         for r in range(self.size):
             for c in range(self.size):
@@ -195,11 +231,9 @@ class GameUI:
         
         # Set game over time if the game just finished
         if self.game_over_cached != 0 and self.game_over_time is None:
-            self.game_over_time = time.time()
-            # Create confetti for victory effect
-            self._create_confetti()
+            self._on_game_over()
 
-        score, label, color = evaluate_move(row, col, before, after, current_before, self.size)
+        score, label, color = evaluation
         self.last_eval_text = f"{label} ({score:+d})"
         self.last_eval_color = color
         self.last_eval_time = time.time()
@@ -215,14 +249,12 @@ class GameUI:
             if result != 0:
                 self.game_over_cached = result
                 if self.game_over_time is None:
-                    self.game_over_time = time.time()
-                    # Create confetti for victory effect
-                    self._create_confetti()
+                    self._on_game_over()
                 break
             
             # Check if the current player has moves
-            valid_moves = self.core.valid_moves()
-            if len(valid_moves) > 0:
+            self._refresh_turn_cache()
+            if len(self.valid_moves) > 0:
                 break  # There are moves, don't pass
             
             # If no moves - pass
@@ -234,11 +266,87 @@ class GameUI:
             if result != 0:
                 self.game_over_cached = result
                 if self.game_over_time is None:
-                    self.game_over_time = time.time()
-                    # Create confetti for victory effect
-                    self._create_confetti()
+                    self._on_game_over()
                 break
 
+        if self.game_over_cached is not None:
+            self._refresh_turn_cache()
+
+    def _undo(self):
+        """Takes back the last move; against the AI, back to the player's previous turn"""
+        if not self.core.undo_move():
+            return
+        while self.core.ply() > 0 and self._is_transit_ply(self.core.ply()):
+            self.core.undo_move()
+        self._after_history_jump()
+
+    def _redo(self):
+        if not self.core.redo_move():
+            return
+        while self.core.ply() < len(self.history) and self._is_transit_ply(self.core.ply()):
+            self.core.redo_move()
+        self._after_history_jump()
+
+    def _is_transit_ply(self, ply: int) -> bool:
+        """Undo/redo pass through positions followed by a pass and, against the AI, through its turns"""
+        return self.history[ply] is None or (self.game_mode == 'pvc' and self.core.current_player() == -1)
+
+    def _scrub(self, step: int):
+        """Steps one move through the game, skipping over passes"""
+        target = self.ply + step
+        while 0 < target < len(self.history) and self.history[target] is None:
+            target += step
+        self._jump_to_ply(max(0, min(len(self.history), target)))
+
+    def _jump_to_ply(self, ply: int):
+        if ply == self.ply or not self.core.goto_ply(ply):
+            return
+        self._after_history_jump()
+
+    def _after_history_jump(self):
+        self.prev_board = None
+        self.board = self.core.get_board()
+        self.animations.clear()
+        played = [m for m in self.history[:self.core.ply()] if m is not None]
+        self.last_move = played[-1] if played else None
+        self.last_eval_text = None
+        self.game_over_time = None
+        self.confetti_particles.clear()
+        self._check_and_auto_pass()
+
+    def _refresh_turn_cache(self):
+        """Fetches flips for every valid move at once and evaluates them for hover and heatmap"""
+        self.ply = self.core.ply()
+        self.history = self.core.history()
+        previews = self.core.move_previews()
+        self.valid_moves = [move for move, _mask, _count in previews]
+        self.flip_previews = {
+            move: [(i // self.size, i % self.size) for i in range(self.size * self.size) if mask >> i & 1]
+            for move, mask, _count in previews
+        }
+        self.move_evals = evaluate_previews(previews, self.board, self.size)
+        self.heatmap = build_hint_heatmap(self.move_evals, self.size, self.cell)
+        self._refresh_ranked_hints()
+        self._refresh_archive_stats()
+
+    def _refresh_ranked_hints(self):
+        self.ranked_hints = []
+        if not self.show_ranked or not self.valid_moves:
+            return
+        if self.game_mode == 'pvc' and self.core.current_player() == -1:
+            return
+        self.ranked_hints = self.core.get_top_moves(RANKED_HINTS, self.difficulty)
+
+    def _refresh_archive_stats(self):
+        self.archive_stats = None
+        if not self.show_archive:
+            return
+        if self.position_index is None:
+            self.position_index = PositionIndex(RECORDS_PATH)
+            self.position_index.update()
+        black, white = self.core.bitboards()
+        self.archive_stats = self.position_index.lookup(black, white, self.core.current_player())
+
     def _handle_hover(self, pos: Tuple[int, int]):
         x, y = pos
         col = (x - BOARD_MARGIN) // self.cell
@@ -256,10 +364,20 @@ class GameUI:
         # Hints and Hover only for human turn
         is_human_turn = not (self.game_mode == 'pvc' and self.core.current_player() == -1)
         if is_human_turn:
-            draw_hints(self.screen, self.core.valid_moves(), self.size, self.cell, BOARD_MARGIN)
-            draw_hover(self.screen, self.hover_cell, self.core.valid_moves(), self.cell, BOARD_MARGIN)
+            if self.show_heatmap and self.heatmap is not None:
+                self.screen.blit(self.heatmap, (BOARD_MARGIN, BOARD_MARGIN))
+            draw_hints(self.screen, self.valid_moves, self.size, self.cell, BOARD_MARGIN)
+            draw_hover(self.screen, self.hover_cell, self.flip_previews, self.cell, BOARD_MARGIN)
+            if self.show_ranked:
+                draw_ranked_hints(self.screen, self.font, self.ranked_hints, self.cell, BOARD_MARGIN)
+        if self.archive_stats is not None:
+            draw_archive_stats(self.screen, self.font, self.small_font, WINDOW_SIZE, self.cell, BOARD_MARGIN,
+                               self.archive_stats)
         
         draw_last_move(self.screen, self.last_move, self.cell, BOARD_MARGIN)
+        review = self._current_review()
+        if review is not None:
+            draw_review(self.screen, self.font, WINDOW_SIZE, self.cell, BOARD_MARGIN, review)
         self.animations = [a for a in self.animations if is_active(a, self.anim_duration)]
 
         b, w = self.core.score()
@@ -269,8 +387,13 @@ class GameUI:
         if thinking:
             move_str += " (Thinking...)"
             
-        status = f"Turn: {move_str}   Score  B:{b}  W:{w}   (R: Restart  M: Menu)"
+        status = f"Turn: {move_str}   Score  B:{b}  W:{w}   Move {self.ply}/{len(self.history)}"
+        if self.review is not None and not self.review.finished():
+            done, total = self.review.progress()
+            status += f"   Reviewing {done}/{total}"
         draw_hud(self.screen, self.font, (WINDOW_SIZE, WINDOW_SIZE), BOARD_MARGIN, status)
+        draw_help(self.screen, self.small_font, BOARD_MARGIN,
+                  "R: Restart  M: Menu  H: Heatmap  T: Top moves  G: Archive  Z/Y: Undo/Redo  ←→ Home End: Browse game and review")
 
         if self.last_eval_text:
             t = time.time() - self.last_eval_time
@@ -327,7 +450,70 @@ class GameUI:
             # Pass time for animation (0.0 if time not set)
             time_offset = self.game_over_time if self.game_over_time is not None else time.time()
             b, w = self.core.score()
-            draw_endgame(self.screen, WINDOW_SIZE, self.big_font, self.font, self.core.result(), time_offset, self.confetti_particles, b, w)
+            draw_endgame(self.screen, WINDOW_SIZE, self.big_font, self.font, self.core.result(), time_offset, self.confetti_particles, b, w,
+                         self._review_summary())
+
+    def _on_game_over(self):
+        self.game_over_time = time.time()
+        # Create confetti for victory effect
+        self._create_confetti()
+        self._save_record()
+        self._start_review()
+
+    def _start_review(self):
+        """Reviews the finished game unless this exact game is already being reviewed"""
+        history = self.core.history()
+        if self.review is not None and self.review.history == history:
+            return
+        self._close_review()
+        self.review = GameReview(self.core, REVIEW_DEPTH)
+
+    def _close_review(self):
+        if self.review is not None:
+            self.review.close()
+            self.review = None
+
+    def _current_review(self):
+        """The review of the move played from the position on screen, once it is ready"""
+        if self.review is None or self.review.history != self.history or self.ply >= len(self.history):
+            return None
+        return self.review.at_ply(self.ply)
+
+    def _review_summary(self) -> Optional[str]:
+        if self.review is None:
+            return None
+        done, total = self.review.progress()
+        parts = []
+        for player, name in ((1, "Black"), (-1, "White")):
+            best, moves = self.review.best_moves(player)
+            parts.append(f"{name} {best}/{moves} best, lost {self.review.total_loss(player)}")
+        text = "   ".join(parts)
+        if self.review.failed:
+            text += f"   ({len(self.review.failed)} plies failed)"
+        if done < total:
+            text += f"   (reviewing {done}/{total})"
+        return text + "   ← to browse"
+
+    def _save_record(self):
+        """Appends the finished game to the local game archive"""
+        if self.record_saved:
+            return
+        self.record_saved = True
+        b, w = self.core.score()
+        moves = [m for m in self.core.history()[:self.core.ply()] if m is not None]
+        if self.game_mode == 'pvc':
+            black, white, white_depth = "Player", "AI", self.difficulty
+        else:
+            black, white, white_depth = "Player 1", "Player 2", 0
+        record = GameRecord(moves, black, white, self.core.result(), b, w,
+                            0, white_depth, self.size)
+        try:
+            with GameRecordWriter(RECORDS_PATH) as writer:
+                writer.write(record)
+        except OSError:
+            return
+        if self.position_index is not None:
+            self.position_index.update()
 
     def _create_confetti(self):
         """Creates confetti for victory effect"""
@@ -359,8 +545,7 @@ class GameUI:
         res = self.core.result() if self.game_over_cached is None else self.game_over_cached
         # Set game over time if the game just finished
         if res != 0 and self.game_over_time is None:
-            self.game_over_time = time.time()
-            self._create_confetti()
+            self._on_game_over()
         return res != 0
 
 
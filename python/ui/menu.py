@@ -1,9 +1,9 @@
 import pygame
-import os
-from typing import Optional, Tuple
+from typing import Tuple
+
+from ui.app import App, WINDOW_SIZE
 
 
-WINDOW_SIZE = 720
 BG_COLOR = (22, 24, 27)
 MENU_COLOR = (40, 44, 52)
 TEXT_COLOR = (255, 255, 255)
@@ -13,13 +13,14 @@ BUTTON_SPACING = 20
 
 
 class MenuUI:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
-        pygame.display.set_caption("Reversi - Menu")
+    def __init__(self, app: App):
+        self.app = app
+        self.screen = app.screen
         
-        self.font = pygame.font.SysFont("segoeui", 48, bold=True)
-        self.button_font = pygame.font.SysFont("segoeui", 32)
+        self.font = app.font(48, bold=True)
+        self.button_font = app.font(32)
+        self.hint_font = app.font(18)
+        self.warning_font = app.font(14)
         
         self.selected_option = 0
         
@@ -29,75 +30,31 @@ class MenuUI:
         
         # Audio settings
         self.music_enabled = True
-        self.music_playing = False
         self.volume = 0.7  # Volume from 0.0 to 1.0
         self.dragging_volume = False
         self.volume_slider_rect = None
         
-        # Load music
-        self.music_path = self._find_music_file()
-        if self.music_path:
-            pygame.mixer.music.load(self.music_path)
-            pygame.mixer.music.set_volume(self.volume)
-        
-    def _find_music_file(self) -> Optional[str]:
-        """Searches for the Rocky Balboa music file for the game"""
-        # Possible Rocky Balboa file names
-        possible_names = [
-            "gonna_fly_now.mp3",
-            "rocky_theme.mp3",
-            "rocky.mp3",
-            "rocky_balboa.mp3",
-            "theme.mp3"
-        ]
-        
-        # Search in python directory
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        music_dir = os.path.join(base_dir, "music")
-        
-        # Create directory if not exists
-        if not os.path.exists(music_dir):
-            os.makedirs(music_dir, exist_ok=True)
+        # The track itself is loaded by the app on first play
+        self.music_path = app.music_path
         
-        # Search for files
-        for name in possible_names:
-            path = os.path.join(music_dir, name)
-            if os.path.exists(path):
-                return path
-        
-        # Also search in the project root directory
-        project_root = os.path.dirname(os.path.dirname(base_dir))
-        for name in possible_names:
-            path = os.path.join(project_root, name)
-            if os.path.exists(path):
-                return path
-        
-        return None
-    
     def _toggle_music(self):
         """Toggles music on/off"""
         self.music_enabled = not self.music_enabled
         
         if self.music_enabled and self.music_path:
-            if not self.music_playing:
-                pygame.mixer.music.set_volume(self.volume)
-                pygame.mixer.music.play(-1)  # -1 = loop
-                self.music_playing = True
+            self.app.play_music(self.volume)
         else:
-            pygame.mixer.music.stop()
-            self.music_playing = False
+            self.app.stop_music()
     
     def _update_volume(self, new_volume: float):
         """Updates the music volume"""
         self.volume = max(0.0, min(1.0, new_volume))
-        pygame.mixer.music.set_volume(self.volume)
+        self.app.set_volume(self.volume)
     
     def _start_music(self):
         """Starts the music if enabled"""
-        if self.music_enabled and self.music_path and not self.music_playing:
-            pygame.mixer.music.set_volume(self.volume)
-            pygame.mixer.music.play(-1)
-            self.music_playing = True
+        if self.music_enabled and self.music_path:
+            self.app.play_music(self.volume)
     
     def run(self) -> Tuple[bool, bool, float]:
         """
@@ -110,6 +67,8 @@ class MenuUI:
         
         num_options = 6  # Start, Mode, Difficulty, Music, Volume, Exit
         
+        pygame.display.set_caption("Reversi - Menu")
+        
         # Start music if enabled
         self._start_music()
         
@@ -222,13 +181,13 @@ class MenuUI:
                     self.dragging_volume = False
             
             self._draw()
-            pygame.display.flip()
+            self.app.present()
             clock.tick(60)
         
         # Music stays on when entering the game
         # Stop only when exiting the application
         if not start_game:
-            pygame.mixer.music.stop()
+            self.app.stop_music()
         
         return start_game, self.music_enabled, self.volume, self.game_mode, self.difficulty
     
@@ -242,7 +201,7 @@ class MenuUI:
         self.screen.blit(title, title_rect)
         
         # Hints (now at the top)
-        hint_font = pygame.font.SysFont("segoeui", 18)
+        hint_font = self.hint_font
         hints = [
             "Use ↑↓ arrows or mouse for navigation",
             "Enter or click to select, ←→ for volume"
@@ -330,8 +289,7 @@ class MenuUI:
         
         # Music warning
         if not self.music_path:
-            warning_font = pygame.font.SysFont("segoeui", 14)
-            warning = warning_font.render(
+            warning = self.warning_font.render(
                 "Rocky Balboa music file not found. Place mp3 file in music/ folder",
                 True,
                 (255, 200, 0)
@@ -0,0 +1,105 @@
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+
+
+# Builds the core library in Release mode (with LTO) and copies it next to the Python files.
+# With --pgo it builds an instrumented library, runs the reversi_bench training games,
+# then rebuilds the same build directory using the recorded profile.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYTHON_DIR = os.path.join(ROOT, "python")
+LIBRARY_NAMES = {"win32": "reversi_core.dll", "darwin": "libreversi_core.dylib"}
+
+
+def library_name() -> str:
+    return LIBRARY_NAMES.get(sys.platform, "libreversi_core.so")
+
+
+def run(args, **kwargs):
+    print("+ " + " ".join(args), flush=True)
+    subprocess.run(args, check=True, **kwargs)
+
+
+def find_output(build_dir: str, name: str) -> str:
+    """Single-config generators write into build_dir, Visual Studio into build_dir/Release"""
+    for path in (os.path.join(build_dir, name), os.path.join(build_dir, "Release", name)):
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"{name} not found in {build_dir}")
+
+
+def configure_and_build(build_dir: str, generator, options):
+    args = ["cmake", "-S", ROOT, "-B", build_dir, "-DCMAKE_BUILD_TYPE=Release"]
+    if generator:
+        args += ["-G", generator]
+    run(args + [f"-D{o}" for o in options])
+    run(["cmake", "--build", build_dir, "--config", "Release", "--parallel"])
+
+
+def copy_extension(build_dir: str):
+    """Copies the extension under the file name this interpreter imports"""
+    for config in ("", "Release"):
+        found = glob.glob(os.path.join(build_dir, config, "_reversi_native*"))
+        found = [p for p in found if p.endswith((".so", ".pyd"))]
+        if found:
+            target = os.path.join(PYTHON_DIR, "_reversi_native" + sysconfig.get_config_var("EXT_SUFFIX"))
+            shutil.copy2(found[0], target)
+            print(f"Copied {os.path.basename(found[0])} to {target}")
+            return
+    raise FileNotFoundError(f"_reversi_native not found in {build_dir}")
+
+
+def compiler_id(build_dir: str) -> str:
+    with open(os.path.join(build_dir, "CMakeCache.txt")) as f:
+        for line in f:
+            if line.startswith("CMAKE_CXX_COMPILER_ID:"):
+                return line.split("=", 1)[1].strip()
+    return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the optimised reversi_core library")
+    parser.add_argument("--build-dir", default=os.path.join(ROOT, "build", "pgo"))
+    parser.add_argument("--generator", help="CMake generator, e.g. \"Visual Studio 17 2022\" or Ninja")
+    parser.add_argument("--pgo", action="store_true", help="profile-guided build trained on reversi_bench")
+    parser.add_argument("--train-games", type=int, default=12)
+    parser.add_argument("--train-depth", type=int, default=5)
+    parser.add_argument("--no-lto", action="store_true")
+    parser.add_argument("--python-ext", action="store_true",
+                        help="also build the _reversi_native extension for this Python interpreter")
+    args = parser.parse_args()
+
+    build_dir = os.path.abspath(args.build_dir)
+    profile_dir = os.path.join(build_dir, "pgo-data")
+    options = [f"REVERSI_LTO={'OFF' if args.no_lto else 'ON'}", f"REVERSI_PGO_DIR={profile_dir}"]
+    if args.python_ext:
+        options += ["REVERSI_PYTHON_EXT=ON", f"Python3_EXECUTABLE={sys.executable}",
+                    f"Python3_INCLUDE_DIR={sysconfig.get_paths()['include']}"]
+    bench = "reversi_bench.exe" if sys.platform == "win32" else "reversi_bench"
+
+    if args.pgo:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        configure_and_build(build_dir, args.generator, options + ["REVERSI_PGO=GENERATE"])
+        run([find_output(build_dir, bench), str(args.train_games), str(args.train_depth)],
+            cwd=os.path.dirname(find_output(build_dir, library_name())))
+        if compiler_id(build_dir).endswith("Clang") and sys.platform != "win32":
+            raw = glob.glob(os.path.join(profile_dir, "*.profraw"))
+            run(["llvm-profdata", "merge", "-o", os.path.join(profile_dir, "default.profdata")] + raw)
+        configure_and_build(build_dir, args.generator, options + ["REVERSI_PGO=USE"])
+    else:
+        configure_and_build(build_dir, args.generator, options + ["REVERSI_PGO=OFF"])
+
+    run([find_output(build_dir, bench), "4", str(args.train_depth)])
+    target = os.path.join(PYTHON_DIR, library_name())
+    shutil.copy2(find_output(build_dir, library_name()), target)
+    print(f"Copied {library_name()} to {target}")
+    if args.python_ext:
+        copy_extension(build_dir)
+
+
+if __name__ == "__main__":
+    main()